@@ -1,9 +1,20 @@
 from flask import Blueprint, render_template, session, flash, redirect, url_for, request,jsonify
 from models.db import get_db_connection
-from datetime import date
+from models.stats import (
+    get_counter, get_counters, monthly_series, event_status_distribution,
+    upcoming_event_count, record_user_role_changed, leaderboard_page
+)
+from models.pagination import paginate, paginate_list
+from models.fanout import fetch_concurrently
+from models.reports import REPORTS, ReportError, enqueue, get_job, recent_jobs
+from models.search import search_organizer_requests
+from models.user import bulk_update_users, find_user_ids
+from models.organizer_requests import pending_request_ids, process_organizer_requests
+from models.volunteer_index import refresh_volunteers
+from models.notifications import forget_unread, outbox_stats
+from datetime import date, timedelta
 import functools
-from math import ceil
-from datetime import date
+import os
 
 admin_bp = Blueprint("admin", __name__, template_folder="templates")
 
@@ -17,123 +28,61 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# Pagination helper
-class Pagination:
-    def __init__(self, page, per_page, total_count):
-        self.page = page
-        self.per_page = per_page
-        self.total_count = total_count
-    
-    @property
-    def pages(self):
-        return int(ceil(self.total_count / float(self.per_page)))
-    
-    @property
-    def has_prev(self):
-        return self.page > 1
-    
-    @property
-    def has_next(self):
-        return self.page < self.pages
-    
-    def iter_pages(self, left_edge=2, left_current=2, right_current=5, right_edge=2):
-        last = 0
-        for num in range(1, self.pages + 1):
-            if num <= left_edge or \
-               (num > self.page - left_current - 1 and num < self.page + right_current) or \
-               num > self.pages - right_edge:
-                if last + 1 != num:
-                    yield None
-                yield num
-                last = num
-
 # ---------------- Dashboard ----------------
 # ---------------- Dashboard ----------------
 @admin_bp.route("/dashboard")
 def dashboard():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    # Volunteers count
-    cursor.execute("SELECT COUNT(*) AS count FROM users u JOIN roles r ON u.role_id = r.role_id WHERE r.role_name = 'volunteer'")
-    volunteers_count = cursor.fetchone()["count"]
-
-    # Participants count
-    cursor.execute("SELECT COUNT(*) AS count FROM users u JOIN roles r ON u.role_id = r.role_id WHERE r.role_name = 'participant'")
-    participants_count = cursor.fetchone()["count"]
-
-    # Total events
-    cursor.execute("SELECT COUNT(*) AS count FROM events")
-    total_events = cursor.fetchone()["count"]
-
-    # Ongoing events
-    cursor.execute("SELECT COUNT(*) AS count FROM events WHERE status = 'ongoing'")
-    ongoing_events = cursor.fetchone()["count"]
-
-    # ✅ Pagination for upcoming events
     page = request.args.get("page", 1, type=int)
-    per_page = 5
-    today = date.today()
-    cursor.execute("SELECT COUNT(*) AS count FROM events WHERE event_date >= %s AND status != 'completed'", (today,))
-    total_upcoming = cursor.fetchone()["count"]
-
-    pagination = Pagination(page, per_page, total_upcoming)
-    today = date.today()
-    cursor.execute("""
-        SELECT e.event_id, e.title, e.event_date AS date, e.status,
-               u.name AS organizer_name,
-               (SELECT COUNT(*) FROM registrations r WHERE r.event_id = e.event_id) AS participant_count
-        FROM events e
-        LEFT JOIN users u ON e.organizer_id = u.user_id
-        WHERE e.event_date >= %s AND e.status != 'completed'
-        ORDER BY e.event_date ASC
-        LIMIT %s OFFSET %s
-    """, (today, per_page, (page - 1) * per_page))
-    upcoming_events = cursor.fetchall()
-    
+    cursor_token = request.args.get("cursor")
+
+    # Independent reads run side by side on pooled connections.
+    # Headline counts come from the materialized stats (models/stats.py)
+    results = fetch_concurrently({
+        "role_counts": lambda cursor: get_counters(cursor, "users.role"),
+        "total_events": lambda cursor: get_counter(cursor, "events.total"),
+        "ongoing_events": lambda cursor: get_counter(cursor, "events.status.ongoing"),
+        # ✅ Keyset pagination for upcoming events (count comes back in the same query)
+        "pagination": lambda cursor: paginate(
+            cursor,
+            """
+            SELECT e.event_id, e.title, e.event_date, e.event_date AS date, e.status,
+                   u.name AS organizer_name,
+                   e.registered_count AS participant_count
+            FROM events e
+            LEFT JOIN users u ON e.organizer_id = u.user_id
+            """,
+            order_by=[("e.event_date", "event_date"), ("e.event_id", "event_id")],
+            where=["e.event_date >= %s", "e.status != 'completed'", "e.deleted_at IS NULL"],
+            params=[date.today()],
+            page=page, cursor_token=cursor_token,
+            per_page=5
+        ),
+        "monthly_attendance": lambda cursor: monthly_series(cursor, "registrations"),
+        "event_status_stats": event_status_distribution,
+    })
+
+    role_counts = results["role_counts"]
+    volunteers_count = role_counts.get("volunteer", 0)
+    participants_count = role_counts.get("participant", 0)
+    total_events = results["total_events"]
+    ongoing_events = results["ongoing_events"]
+    pagination = results["pagination"]
+    upcoming_events = pagination.items
 
     # 📈 Event attendance per month (line chart)
-    cursor.execute("""
-    SELECT DATE_FORMAT(r.registered_at, '%Y-%m') AS month, COUNT(*) AS count
-    FROM registrations r
-    GROUP BY DATE_FORMAT(r.registered_at, '%Y-%m')
-    ORDER BY month
-    """)
-    monthly_attendance = cursor.fetchall()
+    monthly_attendance = results["monthly_attendance"]
     attendance_labels = [row["month"] for row in monthly_attendance]
     attendance_data = [row["count"] for row in monthly_attendance]
 
     # 📊 User roles distribution (bar chart)
-    cursor.execute("""
-        SELECT r.role_name, COUNT(*) AS count
-        FROM users u
-        JOIN roles r ON u.role_id = r.role_id
-        GROUP BY r.role_name
-    """)
-    role_stats = cursor.fetchall()
-    role_labels = [row["role_name"].capitalize() for row in role_stats]
-    role_data = [row["count"] for row in role_stats]
-
-    # 📊 Event status distribution (for doughnut chart) - FIXED
-    cursor.execute("""
-        SELECT 
-            CASE 
-                WHEN event_date < CURDATE() THEN 'completed'
-                ELSE status 
-            END AS event_status,
-            COUNT(*) AS count
-        FROM events
-        GROUP BY 
-            CASE 
-                WHEN event_date < CURDATE() THEN 'completed'
-                ELSE status 
-            END
-    """)
-    event_status_stats = cursor.fetchall()
-    event_status_labels = [row["event_status"].capitalize() for row in event_status_stats]
-    event_status_data = [row["count"] for row in event_status_stats]
+    role_stats = sorted((name, count) for name, count in role_counts.items() if count)
+    role_labels = [name.capitalize() for name, _ in role_stats]
+    role_data = [count for _, count in role_stats]
 
-    conn.close()
+    # 📊 Event status distribution (for doughnut chart)
+    event_status_stats = results["event_status_stats"]
+    event_status_labels = [status.capitalize() for status in event_status_stats]
+    event_status_data = list(event_status_stats.values())
 
     return render_template(
         "admin_dashboard.html",
@@ -159,7 +108,6 @@ def dashboard():
 @admin_required
 def manage_users():
     role_filter = request.args.get('role', 'all')
-    page = request.args.get('page', 1, type=int)  # current page number
     per_page = 5  # ✅ 5 users per page
 
     conn, cursor = None, None
@@ -167,44 +115,37 @@ def manage_users():
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        # Base query
-        query = """
+        where, params = [], []
+        if role_filter != 'all':
+            where.append("r.role_name = %s")
+            params.append(role_filter.lower())
+
+        # Seek on (created_at, user_id); total comes back with the page
+        pagination = paginate(
+            cursor,
+            """
             SELECT u.*, r.role_name 
             FROM users u 
             JOIN roles r ON u.role_id = r.role_id
-        """
-        params = []
-
-        if role_filter != 'all':
-            query += " WHERE LOWER(r.role_name) = LOWER(%s)"
-            params.append(role_filter)
-
-        # Count total users for pagination
-        count_query = f"SELECT COUNT(*) as total FROM ({query}) as sub"
-        cursor.execute(count_query, params)
-        total_users = cursor.fetchone()['total']
-
-        # Add ordering + limit/offset
-        query += " ORDER BY u.created_at DESC LIMIT %s OFFSET %s"
-        params.extend([per_page, (page - 1) * per_page])
-
-        # Debugging
-        print("DEBUG: role_filter =", role_filter)
-        print("DEBUG: final query =", query, "params =", params)
-
-        cursor.execute(query, params)
-        users = cursor.fetchall()
+            """,
+            order_by=[("u.created_at", "created_at"), ("u.user_id", "user_id")],
+            where=where, params=params,
+            page=request.args.get('page', 1, type=int),
+            cursor_token=request.args.get('cursor'),
+            per_page=per_page, descending=True
+        )
+        users = pagination.items
              # 🔑 Ensure is_active is boolean for all users
         for u in users:
            u["is_active"] = (u["status"].lower() == "active")
-        total_pages = (total_users + per_page - 1) // per_page  # ceil
 
         return render_template(
             "admin_manage_users.html",
             users=users,
             current_filter=role_filter,
-            page=page,
-            total_pages=total_pages
+            page=pagination.page,
+            total_pages=pagination.pages,
+            pagination=pagination
         )
 
     except Exception as e:
@@ -214,7 +155,8 @@ def manage_users():
             users=[],
             current_filter=role_filter,
             page=1,
-            total_pages=1
+            total_pages=1,
+            pagination=paginate_list([], 1, per_page)
         )
     finally:
         if cursor:
@@ -280,34 +222,45 @@ def events():
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        # Get filter, page, and per_page from query parameters
+        # Get filter, page/cursor, and per_page from query parameters
         filter_type = request.args.get('filter', 'all')
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 5))
-        
-        # Base query
-        query = """
-            SELECT e.*, u.name as organizer_name,
-                (SELECT COUNT(*) FROM registrations r WHERE r.event_id = e.event_id) as participant_count,
-                (SELECT COUNT(*) FROM volunteer_tasks vt WHERE vt.event_id = e.event_id) as volunteer_count
-            FROM events e
-            JOIN users u ON e.organizer_id = u.user_id
-        """
+        per_page = max(1, min(int(request.args.get('per_page', 5)), 50))
+
+        # Total comes from the materialized event counters, not a COUNT(*) scan
+        if filter_type == 'upcoming':
+            total = upcoming_event_count(cursor)
+        elif filter_type == 'past':
+            total = get_counter(cursor, "events.total") - upcoming_event_count(cursor)
+        else:
+            total = get_counter(cursor, "events.total")
+
         # Apply filter
+        where = ["e.deleted_at IS NULL"]
         if filter_type == 'upcoming':
-            query += " WHERE e.event_date >= CURDATE()"
+            where.append("e.event_date >= CURDATE()")
         elif filter_type == 'past':
-            query += " WHERE e.event_date < CURDATE()"
-        
-        query += " ORDER BY e.event_date DESC"
-        cursor.execute(query)
-        all_events = cursor.fetchall()
-
-        # Pagination calculations
-        total = len(all_events)
-        total_pages = (total + per_page - 1) // per_page
-        start = (page - 1) * per_page
-        events_paginated = all_events[start:start+per_page]
+            where.append("e.event_date < CURDATE()")
+
+        # Pagination happens in SQL (keyset seek on (event_date, event_id) for
+        # Previous/Next); counts come from the events' counter-cache columns
+        pagination = paginate(
+            cursor,
+            """
+            SELECT e.*, COALESCE(u.name, 'Unknown') as organizer_name,
+                e.registered_count as participant_count
+            FROM events e
+            LEFT JOIN users u ON e.organizer_id = u.user_id
+            """,
+            order_by=[("e.event_date", "event_date"), ("e.event_id", "event_id")],
+            where=where,
+            page=request.args.get('page', 1, type=int),
+            cursor_token=request.args.get('cursor'),
+            per_page=per_page, descending=True, total=total
+        )
+        events_paginated = pagination.items
+        page, total_pages = pagination.page, pagination.pages
+        next_cursor, prev_cursor = pagination.next_cursor, pagination.prev_cursor
+
         today = date.today()
         for e in events_paginated:
             if e['event_date'] > today:
@@ -327,18 +280,15 @@ def events():
                         'location': e['location'],
                         'participants': e['participant_count'],
                         'capacity': e.get('total_tickets') or e.get('volunteer_required'),
-                        'status_display': (
-    'upcoming' if e['event_date'] > date.today() else
-    'ongoing' if e['event_date'] == date.today() else
-    'completed'
-),
-
+                        'status_display': e['status_display'],
                         'organizer': e['organizer_name']
                     } for e in events_paginated
                 ],
                 'page': page,
                 'total_pages': total_pages,
-                'total': total
+                'total': total,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
             })
 
         # Server-side render with paginated events
@@ -349,7 +299,9 @@ def events():
                 'page': page,
                 'total_pages': total_pages,
                 'per_page': per_page,
-                'total': total
+                'total': total,
+                'next_cursor': next_cursor,
+                'prev_cursor': prev_cursor
             },
             filter_type=filter_type
         )
@@ -380,62 +332,45 @@ def reports():
         page_top = int(request.args.get("page_top", 1))
         page_demo = int(request.args.get("page_demo", 1))
 
-        # User growth (last 6 months)
-        cursor.execute("""
-            SELECT DATE_FORMAT(created_at, '%Y-%m') as month, 
-                   COUNT(*) as count,
-                   SUM(COUNT(*)) OVER (ORDER BY DATE_FORMAT(created_at, '%Y-%m')) as cumulative
-            FROM users 
-            WHERE created_at >= DATE_SUB(NOW(), INTERVAL 6 MONTH)
-            GROUP BY DATE_FORMAT(created_at, '%Y-%m')
-            ORDER BY month
-        """)
-        user_growth = cursor.fetchall()
-
-        # Event stats
-        cursor.execute("SELECT status, COUNT(*) as count FROM events GROUP BY status")
-        event_stats = cursor.fetchall()
-
-        # --- Top Events (with pagination) ---
-        cursor.execute("""
-            SELECT SQL_CALC_FOUND_ROWS
-                   e.title, COUNT(r.reg_id) as participants,
-                   CASE 
-                     WHEN e.volunteer_required > 0 THEN 
-                       ROUND(COUNT(r.reg_id) / e.volunteer_required * 100, 0)
-                     ELSE 0 
-                   END as completion_rate
-            FROM events e
-            LEFT JOIN registrations r 
-                   ON e.event_id = r.event_id 
-                  AND r.status IN ('registered', 'attended')
-            GROUP BY e.event_id
-            ORDER BY participants DESC
-            LIMIT %s OFFSET %s
-        """, (per_page, (page_top - 1) * per_page))
-        top_events = cursor.fetchall()
-
-        cursor.execute("SELECT FOUND_ROWS() as total")
-        total_top = cursor.fetchone()["total"]
-        total_top_pages = (total_top + per_page - 1) // per_page
-
-        # --- User Demographics (with pagination) ---
-        # Total roles for pagination
-        cursor.execute("SELECT COUNT(*) as total FROM roles")
-        total_demo = cursor.fetchone()["total"]
-        total_demo_pages = (total_demo + per_page - 1) // per_page
-
-        # Fetch paginated data
-        cursor.execute("""
-            SELECT r.role_name, COUNT(u.user_id) as count,
-                   ROUND(COUNT(u.user_id) / (SELECT COUNT(*) FROM users) * 100, 1) as percentage
-            FROM users u
-            JOIN roles r ON u.role_id = r.role_id
-            GROUP BY r.role_name
-            ORDER BY count DESC
-            LIMIT %s OFFSET %s
-        """, (per_page, (page_demo - 1) * per_page))
-        user_demographics = cursor.fetchall()
+        # User growth (last 6 months) and event stats, from the materialized stats
+        since = (date.today().replace(day=1) - timedelta(days=150)).strftime("%Y-%m")
+        user_growth, cumulative = [], 0
+        for row in monthly_series(cursor, "users"):
+            if row["month"] >= since:
+                cumulative += int(row["count"])
+                user_growth.append({"month": row["month"], "count": int(row["count"]),
+                                    "cumulative": cumulative})
+
+        event_stats = [
+            {"status": status, "count": count}
+            for status, count in get_counters(cursor, "events.status").items()
+            if count
+        ]
+
+        # --- Top Events (ranked straight from the maintained leaderboard) ---
+        top_page = leaderboard_page(
+            cursor, page=page_top, per_page=per_page,
+            cursor_token=request.args.get("cursor_top")
+        )
+        top_events = top_page.items
+        page_top = top_page.page
+        total_top_pages = top_page.pages
+
+        # --- User Demographics (from the materialized role counters) ---
+        role_counts = get_counters(cursor, "users.role")
+        total_users = get_counter(cursor, "users.total")
+        demographics = [
+            {
+                'role_name': role_name,
+                'count': count,
+                'percentage': round(count / total_users * 100, 1) if total_users else 0
+            }
+            for role_name, count in sorted(role_counts.items(), key=lambda item: -item[1])
+            if count
+        ]
+        demo_page = paginate_list(demographics, page_demo, per_page)
+        user_demographics = demo_page.items
+        total_demo_pages = demo_page.pages
 
         return render_template(
             "admin_reports.html", 
@@ -448,6 +383,11 @@ def reports():
             total_top_pages=total_top_pages,
             page_demo=page_demo,
             total_demo_pages=total_demo_pages,
+            top_page=top_page,
+            demo_page=demo_page,
+            # background exports
+            report_kinds=REPORTS,
+            report_jobs=recent_jobs(cursor),
             # template condition
             has_user_demographics=len(user_demographics) > 0
         )
@@ -457,6 +397,8 @@ def reports():
         return render_template("admin_reports.html", 
                               user_growth=[], event_stats=[], top_events=[], user_demographics=[],
                               page_top=1, total_top_pages=1, page_demo=1, total_demo_pages=1,
+                              top_page=paginate_list([], 1, 3), demo_page=paginate_list([], 1, 3),
+                              report_kinds=REPORTS, report_jobs=[],
                               has_user_demographics=False)
     finally:
         if cursor: cursor.close()
@@ -464,162 +406,299 @@ def reports():
 
 import csv
 import io
-from flask import make_response
+import zlib
+from flask import Response, send_file
+from config import Config
+from models.db import checkout_connection
 
 # ---------------- Generate Report (Download) ----------------
-@admin_bp.route("/generate_report")
-@admin_required
-def generate_report():
-    conn, cursor = None, None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+def _stream_releaser(conn, cursor):
+    """
+    Return a callable that frees the report query's connection once, however
+    the response ends: the generator calls it when done, and the response's
+    close() calls it even if the body was never iterated.
+    """
+    released = []
+
+    def release():
+        if released:
+            return
+        released.append(True)
+        try:
+            conn.consume_results()
+        finally:
+            cursor.close()
+            conn.close()
+    return release
 
-        # Example: Get users with their roles
-        cursor.execute("""
-            SELECT u.user_id, u.name, u.email, r.role_name, u.created_at
-            FROM users u
-            JOIN roles r ON u.role_id = r.role_id
-            ORDER BY u.created_at DESC
-        """)
-        users = cursor.fetchall()
 
-        # Use StringIO as in-memory file
-        output = io.StringIO()
-        writer = csv.writer(output)
+def _stream_users_csv(cursor, compress, release):
+    """
+    Yield the users CSV chunk by chunk from an unbuffered cursor, so memory
+    stays flat and the header goes out before the first row is read.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def drain():
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return compressor.compress(data) if compressor else data
 
+    try:
         # Write header
         writer.writerow(["User ID", "Name", "Email", "Role", "Created At"])
+        yield drain()
+
+        # Write data rows, one fetchmany() chunk at a time
+        while True:
+            rows = cursor.fetchmany(Config.REPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            for user_id, name, email, role_name, created_at in rows:
+                writer.writerow([
+                    user_id, name, email,
+                    role_name, created_at.strftime("%Y-%m-%d %H:%M:%S")
+                ])
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+        if compressor:
+            yield compressor.flush()
+    finally:
+        release()
 
-        # Write data rows
-        for u in users:
-            writer.writerow([
-                u["user_id"], u["name"], u["email"],
-                u["role_name"], u["created_at"].strftime("%Y-%m-%d %H:%M:%S")
-            ])
 
-        # Prepare response
-        response = make_response(output.getvalue())
-        response.headers["Content-Disposition"] = "attachment; filename=users_report.csv"
-        response.headers["Content-Type"] = "text/csv"
-        return response
+@admin_bp.route("/generate_report")
+@admin_required
+def generate_report():
+    role_filter = request.args.get("role", "all")
+    compress = request.args.get("gzip") == "1"
+    try:
+        created_from = request.args.get("from")
+        created_to = request.args.get("to")
+        created_from = date.fromisoformat(created_from) if created_from else None
+        created_to = date.fromisoformat(created_to) if created_to else None
+    except ValueError:
+        flash("Invalid date range for report.", "danger")
+        return redirect(url_for("admin.reports"))
 
+    query = """
+        SELECT u.user_id, u.name, u.email, r.role_name, u.created_at
+        FROM users u
+        JOIN roles r ON u.role_id = r.role_id
+    """
+    conditions, params = [], []
+    if role_filter != "all":
+        conditions.append("r.role_name = %s")
+        params.append(role_filter)
+    if created_from:
+        conditions.append("u.created_at >= %s")
+        params.append(created_from)
+    if created_to:
+        conditions.append("u.created_at < %s")
+        params.append(created_to + timedelta(days=1))
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY u.created_at DESC"
+
+    # A dedicated connection with an unbuffered cursor: rows stay on the
+    # server until fetched, and the request's shared connection stays free.
+    conn, cursor = None, None
+    try:
+        conn = checkout_connection()
+        cursor = conn.cursor(buffered=False)
+        cursor.execute(query, params)
     except Exception as e:
+        if cursor: cursor.close()
+        if conn: conn.close()
         flash(f"Error generating report: {str(e)}", "danger")
         return redirect(url_for("admin.reports"))
+
+    filename = "users_report.csv.gz" if compress else "users_report.csv"
+    release = _stream_releaser(conn, cursor)
+    response = Response(
+        _stream_users_csv(cursor, compress, release),
+        mimetype="application/gzip" if compress else "text/csv"
+    )
+    response.call_on_close(release)
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
+# ---------------- Background Report Jobs ----------------
+def _job_json(job):
+    return {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "title": job["title"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "rows_written": job["rows_written"],
+        "error": job["error"],
+        "download_url": url_for("admin.download_report_job", job_id=job["job_id"])
+                        if job["status"] == "done" else None,
+    }
+
+
+@admin_bp.route("/reports/jobs", methods=["POST"])
+@admin_required
+def enqueue_report_job():
+    wants_json = request.accept_mimetypes.best == "application/json"
+    try:
+        job_id, reused = enqueue(
+            request.form.get("kind", ""), request.form, session.get("user_id")
+        )
+    except ReportError as e:
+        if wants_json:
+            return jsonify({"error": str(e)}), 400
+        flash(str(e), "danger")
+        return redirect(url_for("admin.reports"))
+    except Exception as e:
+        if wants_json:
+            return jsonify({"error": str(e)}), 500
+        flash(f"Error queueing report: {str(e)}", "danger")
+        return redirect(url_for("admin.reports"))
+
+    if wants_json:
+        return jsonify({"job_id": job_id, "reused": reused,
+                        "status_url": url_for("admin.report_job_status", job_id=job_id)}), 202
+    flash("An identical report is already available below." if reused
+          else "Report queued. It will appear below when ready.", "info")
+    return redirect(url_for("admin.reports"))
+
+
+@admin_bp.route("/reports/jobs/<int:job_id>")
+@admin_required
+def report_job_status(job_id):
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        job = get_job(cursor, job_id)
+        if not job:
+            return jsonify({"error": "Report job not found"}), 404
+        return jsonify(_job_json(job))
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+
+@admin_bp.route("/reports/jobs/<int:job_id>/download")
+@admin_required
+def download_report_job(job_id):
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        job = get_job(cursor, job_id)
     finally:
         if cursor: cursor.close()
         if conn: conn.close()
 
+    if not job or job["status"] != "done" or not os.path.exists(job["artifact_path"] or ""):
+        flash("That report is not available (yet). Try generating it again.", "warning")
+        return redirect(url_for("admin.reports"))
+
+    # conditional=True answers Range / If-None-Match requests with 206 / 304
+    return send_file(
+        job["artifact_path"],
+        mimetype="text/csv",
+        as_attachment=True,
+        download_name=f"{job['kind']}_report_{job_id}.csv",
+        conditional=True,
+        max_age=0
+    )
+
+
+# ---------------- Notification Outbox ----------------
+@admin_bp.route("/system/outbox")
+@admin_required
+def outbox_status():
+    """Depth and flush counters of the notification outbox."""
+    return jsonify(outbox_stats())
+
 
 # ---------------- Organizer Requests ----------------
 @admin_bp.route("/organizer_requests")
 @admin_required
 def organizer_requests():
     search_query = request.args.get("q", "").strip()
-
-    # pagination params
-    page_pending = request.args.get("page_pending", 1, type=int)
-    page_processed = request.args.get("page_processed", 1, type=int)
     per_page = 5  # items per page
+    conn, cursor = None, None
 
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        # ==============================
-        # Pending requests with COUNT
-        # ==============================
-        if search_query:
-            count_query = """
-                SELECT COUNT(*) as total
-                FROM organizer_requests r
-                JOIN users u ON r.user_id = u.user_id
-                WHERE (r.status IS NULL OR r.status = 'pending')
-                AND (u.name LIKE %s OR u.email LIKE %s OR r.organization LIKE %s)
-            """
-            cursor.execute(count_query, (f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"))
-            total_pending = cursor.fetchone()["total"]
-
-            cursor.execute("""
-                SELECT r.request_id, r.user_id, r.status, r.request_date, r.processed_date,
-                       r.organization, r.photo_path, r.reason,
-                       u.name, u.email, u.created_at as user_created,
-                       p.name as processed_by_name
-                FROM organizer_requests r
-                JOIN users u ON r.user_id = u.user_id
-                LEFT JOIN users p ON r.processed_by = p.user_id
-                WHERE (r.status IS NULL OR r.status = 'pending')
-                AND (u.name LIKE %s OR u.email LIKE %s OR r.organization LIKE %s)
-                ORDER BY r.request_date DESC
-                LIMIT %s OFFSET %s
-            """, (f"%{search_query}%", f"%{search_query}%", f"%{search_query}%", per_page, (page_pending - 1) * per_page))
-        else:
-            cursor.execute("SELECT COUNT(*) as total FROM organizer_requests WHERE status IS NULL OR status = 'pending'")
-            total_pending = cursor.fetchone()["total"]
-
-            cursor.execute("""
-                SELECT r.request_id, r.user_id, r.status, r.request_date, r.processed_date,
-                       r.organization, r.photo_path, r.reason,
-                       u.name, u.email, u.created_at as user_created,
-                       p.name as processed_by_name
-                FROM organizer_requests r
-                JOIN users u ON r.user_id = u.user_id
-                LEFT JOIN users p ON r.processed_by = p.user_id
-                WHERE r.status IS NULL OR r.status = 'pending'
-                ORDER BY r.request_date DESC
-                LIMIT %s OFFSET %s
-            """, (per_page, (page_pending - 1) * per_page))
-        pending_requests = cursor.fetchall()
-
-        # ==============================
-        # Processed requests with COUNT
-        # ==============================
+        page_pending = request.args.get("page_pending", 1, type=int)
+        page_processed = request.args.get("page_processed", 1, type=int)
+        request_select = """
+            SELECT r.request_id, r.user_id, r.status, r.request_date, r.processed_date,
+                   r.organization, r.photo_path, r.reason,
+                   u.name, u.name as user_name, u.email, u.created_at as user_created,
+                   p.name as processed_by_name
+            FROM organizer_requests r
+            JOIN users u ON r.user_id = u.user_id
+            LEFT JOIN users p ON r.processed_by = p.user_id
+        """
+
         if search_query:
-            count_query = """
-                SELECT COUNT(*) as total
-                FROM organizer_requests r
-                JOIN users u ON r.user_id = u.user_id
-                WHERE r.status IN ('approved', 'rejected')
-                AND (u.name LIKE %s OR u.email LIKE %s OR r.organization LIKE %s)
-            """
-            cursor.execute(count_query, (f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"))
-            total_processed = cursor.fetchone()["total"]
-
-            cursor.execute("""
-                SELECT r.request_id, r.user_id, r.status, r.request_date, r.processed_date,
-                       r.organization, r.photo_path, r.reason,
-                       u.name as user_name, u.email,
-                       p.name as processed_by_name
-                FROM organizer_requests r
-                JOIN users u ON r.user_id = u.user_id
-                LEFT JOIN users p ON r.processed_by = p.user_id
-                WHERE r.status IN ('approved', 'rejected')
-                AND (u.name LIKE %s OR u.email LIKE %s OR r.organization LIKE %s)
-                ORDER BY r.processed_date DESC
-                LIMIT %s OFFSET %s
-            """, (f"%{search_query}%", f"%{search_query}%", f"%{search_query}%", per_page, (page_processed - 1) * per_page))
+            # ==============================
+            # Search: one ranked FULLTEXT lookup feeds both sections'
+            # counts and pages; details are fetched only for shown rows
+            # ==============================
+            hits = search_organizer_requests(cursor, search_query)
+            pending_page = paginate_list(
+                [h["request_id"] for h in hits if h["status"] == "pending"],
+                page_pending, per_page
+            )
+            processed_page = paginate_list(
+                [h["request_id"] for h in hits if h["status"] in ("approved", "rejected")],
+                page_processed, per_page
+            )
+            shown_ids = pending_page.items + processed_page.items
+            details = {}
+            if shown_ids:
+                placeholders = ", ".join(["%s"] * len(shown_ids))
+                cursor.execute(
+                    request_select + f" WHERE r.request_id IN ({placeholders})", shown_ids
+                )
+                details = {row["request_id"]: row for row in cursor.fetchall()}
+            pending_page.items = [details[i] for i in pending_page.items if i in details]
+            processed_page.items = [details[i] for i in processed_page.items if i in details]
         else:
-            cursor.execute("SELECT COUNT(*) as total FROM organizer_requests WHERE status IN ('approved','rejected')")
-            total_processed = cursor.fetchone()["total"]
-
-            cursor.execute("""
-                SELECT r.request_id, r.user_id, r.status, r.request_date, r.processed_date,
-                       r.organization, r.photo_path, r.reason,
-                       u.name as user_name, u.email,
-                       p.name as processed_by_name
-                FROM organizer_requests r
-                JOIN users u ON r.user_id = u.user_id
-                LEFT JOIN users p ON r.processed_by = p.user_id
-                WHERE r.status IN ('approved', 'rejected')
-                ORDER BY r.processed_date DESC
-                LIMIT %s OFFSET %s
-            """, (per_page, (page_processed - 1) * per_page))
-        processed_requests = cursor.fetchall()
-
-        # calculate total pages
-        total_pending_pages = (total_pending + per_page - 1) // per_page
-        total_processed_pages = (total_processed + per_page - 1) // per_page
+            # ==============================
+            # Pending requests (page + total in one round-trip)
+            # ==============================
+            pending_page = paginate(
+                cursor, request_select,
+                order_by=[("r.request_date", "request_date"), ("r.request_id", "request_id")],
+                where=["(r.status IS NULL OR r.status = 'pending')"],
+                page=page_pending,
+                cursor_token=request.args.get("cursor_pending"),
+                per_page=per_page, descending=True
+            )
+
+            # ==============================
+            # Processed requests (page + total in one round-trip)
+            # ==============================
+            processed_page = paginate(
+                cursor, request_select,
+                order_by=[("r.processed_date", "processed_date"), ("r.request_id", "request_id")],
+                where=["r.status IN ('approved', 'rejected')"],
+                page=page_processed,
+                cursor_token=request.args.get("cursor_processed"),
+                per_page=per_page, descending=True
+            )
+        pending_requests = pending_page.items
+        processed_requests = processed_page.items
+
+        page_pending, total_pending_pages = pending_page.page, pending_page.pages
+        page_processed, total_processed_pages = processed_page.page, processed_page.pages
 
         return render_template(
             "admin_organizer_requests.html", 
@@ -629,7 +708,9 @@ def organizer_requests():
             page_pending=page_pending,
             total_pending_pages=total_pending_pages,
             page_processed=page_processed,
-            total_processed_pages=total_processed_pages
+            total_processed_pages=total_processed_pages,
+            pending_page=pending_page,
+            processed_page=processed_page
         )
 
     except Exception as e:
@@ -642,7 +723,9 @@ def organizer_requests():
             page_pending=1,
             total_pending_pages=0,
             page_processed=1,
-            total_processed_pages=0
+            total_processed_pages=0,
+            pending_page=paginate_list([], 1, per_page),
+            processed_page=paginate_list([], 1, per_page)
         )
     finally:
         if cursor: cursor.close()
@@ -650,6 +733,62 @@ def organizer_requests():
 
 
 
+# ==============================
+# Batch Approve / Reject Organizer Requests
+# ==============================
+@admin_bp.route("/organizer_requests/batch", methods=["POST"])
+@admin_required
+def batch_organizer_requests():
+    action = request.form.get("action")
+    search_query = request.form.get("q", "").strip()
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        if request.form.get("all_pending"):
+            if search_query:
+                request_ids = [h["request_id"] for h in search_organizer_requests(cursor, search_query)
+                               if h["status"] == "pending"]
+            else:
+                request_ids = pending_request_ids(cursor)
+        else:
+            request_ids = request.form.getlist("request_ids", type=int)
+
+        if not request_ids:
+            flash("No requests selected.", "warning")
+            return redirect(url_for("admin.organizer_requests", q=search_query or None))
+
+        results, user_ids = process_organizer_requests(
+            cursor, request_ids, action, admin_id=session.get("user_id")
+        )
+        conn.commit()
+        forget_unread(user_ids)
+
+        # 🔄 Keep the acting admin's own session in sync, as the single-request routes do
+        if session.get("user_id") in user_ids:
+            session["role"] = "organizer" if action == "approve" else "user"
+
+        decided = sum(1 for outcome in results.values() if outcome in ("approved", "rejected"))
+        skipped = len(results) - decided
+        flash(
+            f"{decided} request(s) {'approved' if action == 'approve' else 'rejected'}"
+            + (f", {skipped} skipped (already processed or missing)." if skipped else "."),
+            "success" if decided else "info"
+        )
+    except ValueError as e:
+        if conn: conn.rollback()
+        flash(str(e), "danger")
+    except Exception as e:
+        if conn: conn.rollback()
+        flash(f"Error processing requests: {str(e)}", "danger")
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+    return redirect(url_for("admin.organizer_requests", q=search_query or None))
+
+
 # ==============================
 # Approve Organizer Request
 # ==============================
@@ -669,6 +808,13 @@ def approve_organizer_request(request_id):
 
         user_id = req["user_id"]
 
+        cursor.execute("""
+            SELECT r.role_name FROM users u
+            LEFT JOIN roles r ON u.role_id = r.role_id
+            WHERE u.user_id=%s
+        """, (user_id,))
+        current_role = (cursor.fetchone() or {}).get("role_name")
+
         # Get organizer role_id
         cursor.execute("SELECT role_id FROM roles WHERE role_name='organizer'")
         role_row = cursor.fetchone()
@@ -680,6 +826,7 @@ def approve_organizer_request(request_id):
 
         # Update user role
         cursor.execute("UPDATE users SET role_id=%s WHERE user_id=%s", (role_id, user_id))
+        record_user_role_changed(cursor, current_role, "organizer")
 
         # Update request
         admin_id = session.get("user_id") if session.get("user_id") else None
@@ -760,9 +907,75 @@ def toggle_user_status(user_id):
     conn.commit()
     cursor.close()
     conn.close()
+    refresh_volunteers([user_id])
     return jsonify({"success": True, "new_status": new_status})
 
 
+@admin_bp.route("/users/bulk", methods=["POST"])
+@admin_required
+def bulk_update_users_route():
+    """
+    JSON body: {"user_ids": [...]} or {"filter": {"role": ..., "created_before": "YYYY-MM-DD"}},
+    plus "status" and/or "role". Applied in one transaction; the acting
+    admin is never changed.
+    """
+    data = request.get_json(silent=True) or {}
+    status = data.get("status") or None
+    role = data.get("role") or None
+    if status is None and role is None:
+        return jsonify({"success": False, "message": "Nothing to change"}), 400
+
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        if data.get("user_ids"):
+            try:
+                user_ids = [int(user_id) for user_id in data["user_ids"]]
+            except (TypeError, ValueError):
+                return jsonify({"success": False, "message": "Invalid user ids"}), 400
+        elif data.get("filter"):
+            user_filter = data["filter"]
+            created_before = user_filter.get("created_before") or None
+            if created_before:
+                try:
+                    created_before = date.fromisoformat(created_before)
+                except ValueError:
+                    return jsonify({"success": False, "message": "Invalid created_before date"}), 400
+            role_filter = user_filter.get("role")
+            user_ids = find_user_ids(
+                cursor,
+                role=None if role_filter in (None, "", "all") else role_filter,
+                created_before=created_before
+            )
+        else:
+            return jsonify({"success": False, "message": "No users selected"}), 400
+
+        results, affected = bulk_update_users(
+            cursor, user_ids, status=status, role=role,
+            protected_ids=[session.get("user_id")]
+        )
+        conn.commit()
+        refresh_volunteers([user_id for user_id, outcome in results.items() if outcome == "updated"])
+        return jsonify({
+            "success": True,
+            "requested": len(results),
+            "affected": affected,
+            "results": {str(user_id): outcome for user_id, outcome in results.items()}
+        })
+
+    except ValueError as e:
+        if conn: conn.rollback()
+        return jsonify({"success": False, "message": str(e)}), 400
+    except Exception as e:
+        if conn: conn.rollback()
+        return jsonify({"success": False, "message": str(e)}), 500
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+
 @admin_bp.route("/profile")
 @admin_required
 def profile():
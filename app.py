@@ -1,3 +1,4 @@
+import os
 from flask import Flask, render_template
 from models.user import create_default_admin
 from auth.routes import auth_bp
@@ -5,17 +6,32 @@ from admin.routes import admin_bp
 from organizer.routes import organizer_bp
 from volunteer.routes import volunteer_bp
 from participant.routes import participant_bp
+from models.db import init_db, get_db_connection
+from migrations import migrate
+from models.reports import recover_jobs
+from models.broadcasts import recover_broadcasts
+from models.events import recover_event_deletions
+from models.images import init_images
+from models.assets import init_assets
 
 app = Flask(__name__)
 app.secret_key = "supersecretkey"
 
+# Pooled, request-scoped DB connections
+init_db(app)
+
+# srcset filters for event images
+init_images(app)
+
+# Fingerprinted /static URLs, strong ETags, precompressed css/js
+init_assets(app)
+
 # Register Blueprints without a URL prefix
 app.register_blueprint(auth_bp, url_prefix="/auth")
 app.register_blueprint(admin_bp, url_prefix="/admin")
 app.register_blueprint(organizer_bp, url_prefix='/organizer')
 app.register_blueprint(volunteer_bp, url_prefix='/volunteer')
 app.register_blueprint(participant_bp, url_prefix='/participant')
-from models.db import get_db_connection
 @app.route("/")
 # routes.py or app.py
 @app.route("/")
@@ -25,6 +41,7 @@ def index():
     cursor.execute("""
         SELECT title, description, image_url
         FROM events
+        WHERE deleted_at IS NULL
         ORDER BY created_at DESC
         LIMIT 3
     """)
@@ -36,6 +53,23 @@ def index():
 def contact():
     return render_template("contact.html")
 
+DEBUG = True
+
+
+def in_serving_process():
+    """
+    False in the debug reloader's parent, which only watches files: the
+    child it spawns (WERKZEUG_RUN_MAIN=true) serves the app. Background
+    jobs must be recovered in that one process, or two would run them.
+    """
+    return not DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+
+
 if __name__ == "__main__":
+    migrate()
     create_default_admin()
-    app.run(debug=True)
+    if in_serving_process():
+        recover_jobs()
+        recover_broadcasts()
+        recover_event_deletions()
+    app.run(debug=DEBUG)
@@ -4,11 +4,13 @@ from flask import (
 )
 from werkzeug.security import check_password_hash, generate_password_hash
 from models.db import get_db_connection
+from models.stats import record_user_created
+from models.search import refresh_organizer_request_search
+from models.volunteer_index import refresh_volunteers
+from models.storage import StorageError, acquire, store_upload
 from captcha.image import ImageCaptcha
 import random, string, io
 from functools import wraps
-from werkzeug.utils import secure_filename
-import os, uuid
 
 
 
@@ -26,7 +28,6 @@ ADMIN_CREDENTIALS = {
     "password": "admin123"
 }
 
-UPLOAD_FOLDER = os.path.join("static", "uploads")
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
 
 def allowed_file(filename):
@@ -155,6 +156,7 @@ def signup():
                 "INSERT INTO users (name, email, password_hash, role_id) VALUES (%s, %s, %s, %s)",
                 (name, email, generate_password_hash(password), role_id)
             )
+            record_user_created(cursor, "participant")
             conn.commit()
             flash("Account created! Please login.", "success")
             return redirect(url_for("auth.login"))
@@ -174,10 +176,6 @@ def signup():
 # Organizer Signup
 # ==============================
 
-# Upload folder setup
-UPLOAD_FOLDER = os.path.join("static", "uploads")
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
 @auth_bp.route("/organizer_signup", methods=["GET", "POST"])
 def organizer_signup():
     if request.method == "POST":
@@ -191,13 +189,14 @@ def organizer_signup():
         # ✅ Hash password
         password_hash = generate_password_hash(password)
 
-        # ✅ Save uploaded photo
+        # ✅ Save uploaded photo (content-addressed, relative to static/ for templates)
         photo_path = None
         if photo and allowed_file(photo.filename):
-            filename = f"{uuid.uuid4()}_{secure_filename(photo.filename)}"
-            photo_path = os.path.join(UPLOAD_FOLDER, filename)
-            photo.save(photo_path)
-            photo_path = f"uploads/{filename}"  # relative path for templates
+            try:
+                photo_path = store_upload(photo)
+            except StorageError as e:
+                flash(str(e), "danger")
+                return render_template("organizer_signup.html")
 
         try:
             conn = get_db_connection()
@@ -212,6 +211,7 @@ def organizer_signup():
                 (name, email, password_hash, None, organization)
             )
             user_id = cursor.lastrowid
+            record_user_created(cursor, None)
 
             # 2️⃣ Insert request into organizer_requests
             cursor.execute(
@@ -221,6 +221,8 @@ def organizer_signup():
                 """,
                 (user_id, organization, photo_path, reason)
             )
+            acquire(cursor, photo_path)
+            refresh_organizer_request_search(cursor, user_id)
 
             conn.commit()
             flash("Organizer signup request submitted successfully! Pending admin approval.", "success")
@@ -314,8 +316,11 @@ def volunteer_signup():
                  ','.join(availability) if availability else None, 
                  emergency_contact, True)
             )
+            user_id = cursor.lastrowid
+            record_user_created(cursor, "volunteer")
             
             conn.commit()
+            refresh_volunteers([user_id])
             flash("Volunteer account created successfully! Please login.", "success")
             return redirect(url_for("auth.login"))
             
@@ -358,6 +363,7 @@ def participant_signup():
                 "INSERT INTO users (name, email, password_hash, role_id) VALUES (%s, %s, %s, %s)",
                 (name, email, generate_password_hash(password), role_id)
             )
+            record_user_created(cursor, "participant")
             conn.commit()
             flash("Participant account created! Please login.", "success")
             return redirect(url_for("auth.login"))
@@ -16,6 +16,60 @@ class Config:
     DB_PASS = os.getenv("DB_PASS", "")
     DB_NAME = os.getenv("DB_NAME", "ems")
 
+    # Connection pool settings
+    DB_POOL_NAME = os.getenv("DB_POOL_NAME", "ems_pool")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))          # max 32 (mysql-connector limit)
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))    # seconds to wait for a free connection
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # Query instrumentation
+    DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200))
+    DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", 10))
+
+    # Concurrent page queries (models/fanout.py)
+    DB_FANOUT_WORKERS = int(os.getenv("DB_FANOUT_WORKERS", 4))       # keep below DB_POOL_SIZE
+    DB_FANOUT_DEADLINE = float(os.getenv("DB_FANOUT_DEADLINE", 5))    # seconds per page
+
+    # Volunteer typeahead (models/volunteer_index.py)
+    VOLUNTEER_INDEX_TTL = int(os.getenv("VOLUNTEER_INDEX_TTL", 300))  # seconds between full rebuilds
+
+    # Event image variants (models/images.py)
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))   # background resize/encode threads
+
+    # Upload storage (models/storage.py)
+    UPLOAD_GC_GRACE = int(os.getenv("UPLOAD_GC_GRACE", 3600))                       # seconds before an unreferenced file may go
+    UPLOAD_REJECTED_RETENTION_DAYS = int(os.getenv("UPLOAD_REJECTED_RETENTION_DAYS", 30))  # keep rejected applicants' photos
+
+    # Notification outbox (models/notifications.py)
+    NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", 200))              # rows per executemany
+    NOTIFY_FLUSH_INTERVAL_MS = int(os.getenv("NOTIFY_FLUSH_INTERVAL_MS", 20))  # max wait for a batch to fill
+    NOTIFY_MAX_QUEUE = int(os.getenv("NOTIFY_MAX_QUEUE", 50000))              # oldest dropped beyond this
+    NOTIFY_UNREAD_CACHE_TTL = int(os.getenv("NOTIFY_UNREAD_CACHE_TTL", 30))   # seconds a badge count is reused
+
+    # Live notification stream (models/notification_stream.py)
+    NOTIFY_STREAM_POLL_MS = int(os.getenv("NOTIFY_STREAM_POLL_MS", 2000))      # shared poller interval
+    NOTIFY_STREAM_HEARTBEAT = int(os.getenv("NOTIFY_STREAM_HEARTBEAT", 15))   # seconds between keep-alives
+    NOTIFY_STREAM_QUEUE = int(os.getenv("NOTIFY_STREAM_QUEUE", 100))          # pending events per client
+
+    # Event broadcasts (models/broadcasts.py)
+    BROADCAST_WORKERS = int(os.getenv("BROADCAST_WORKERS", 2))            # background fan-out threads
+    BROADCAST_CHUNK_SIZE = int(os.getenv("BROADCAST_CHUNK_SIZE", 1000))   # recipients per INSERT ... SELECT
+    BROADCAST_MAX_ATTEMPTS = int(os.getenv("BROADCAST_MAX_ATTEMPTS", 5))  # then the broadcast is marked failed
+
+    # Event deletion (models/events.py)
+    EVENT_DELETE_WORKERS = int(os.getenv("EVENT_DELETE_WORKERS", 1))          # background purge threads
+    EVENT_DELETE_CHUNK_SIZE = int(os.getenv("EVENT_DELETE_CHUNK_SIZE", 1000)) # rows per purge transaction
+    EVENT_DELETE_PAUSE_MS = int(os.getenv("EVENT_DELETE_PAUSE_MS", 10))       # sleep between chunks
+
+    # Reports
+    REPORT_CHUNK_SIZE = int(os.getenv("REPORT_CHUNK_SIZE", 1000))   # rows per fetchmany() when exporting
+    REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", 2))             # background report threads
+    REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", 900))       # seconds a finished report is reused
+    REPORT_ARTIFACT_DIR = os.getenv(
+        "REPORT_ARTIFACT_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance", "reports")
+    )
+
     # Helper: MySQL URI (if needed for SQLAlchemy, optional)
     SQLALCHEMY_DATABASE_URI = (
         f"mysql+mysqlconnector://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
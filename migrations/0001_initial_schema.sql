@@ -0,0 +1,95 @@
+-- Base schema for the Event Management System.
+-- Secondary indexes live in 0002 so existing databases pick them up too.
+
+CREATE TABLE IF NOT EXISTS roles (
+    role_id     INT AUTO_INCREMENT PRIMARY KEY,
+    role_name   VARCHAR(50) NOT NULL,
+    UNIQUE KEY uq_roles_role_name (role_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id             INT AUTO_INCREMENT PRIMARY KEY,
+    name                VARCHAR(100) NOT NULL,
+    email               VARCHAR(150) NOT NULL,
+    password_hash       VARCHAR(255) NOT NULL,
+    role_id             INT NULL,
+    organization        VARCHAR(150) NULL,
+    phone               VARCHAR(20) NULL,
+    bio                 TEXT NULL,
+    profile_picture     VARCHAR(255) NULL,
+    skills              VARCHAR(255) NULL,
+    availability        VARCHAR(255) NULL,
+    emergency_contact   VARCHAR(100) NULL,
+    is_volunteer        BOOLEAN NOT NULL DEFAULT FALSE,
+    status              VARCHAR(20) NOT NULL DEFAULT 'active',
+    created_at          TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_users_role FOREIGN KEY (role_id) REFERENCES roles (role_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS organizer_requests (
+    request_id      INT AUTO_INCREMENT PRIMARY KEY,
+    user_id         INT NOT NULL,
+    organization    VARCHAR(150) NULL,
+    photo_path      VARCHAR(255) NULL,
+    reason          TEXT NULL,
+    status          VARCHAR(20) NULL DEFAULT 'pending',
+    request_date    TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    processed_date  DATETIME NULL,
+    processed_by    INT NULL,
+    CONSTRAINT fk_organizer_requests_user FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+    CONSTRAINT fk_organizer_requests_admin FOREIGN KEY (processed_by) REFERENCES users (user_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS events (
+    event_id            INT AUTO_INCREMENT PRIMARY KEY,
+    organizer_id        INT NULL,
+    title               VARCHAR(200) NOT NULL,
+    description         TEXT NULL,
+    event_date          DATE NOT NULL,
+    event_time          TIME NULL,
+    location            VARCHAR(255) NULL,
+    category            VARCHAR(50) NULL,
+    total_tickets       INT NULL,
+    volunteer_required  INT NOT NULL DEFAULT 0,
+    image_url           VARCHAR(255) NULL,
+    status              VARCHAR(20) NOT NULL DEFAULT 'upcoming',
+    created_at          TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_events_organizer FOREIGN KEY (organizer_id) REFERENCES users (user_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS registrations (
+    reg_id          INT AUTO_INCREMENT PRIMARY KEY,
+    event_id        INT NOT NULL,
+    participant_id  INT NOT NULL,
+    status          VARCHAR(20) NOT NULL DEFAULT 'registered',
+    ticket_count    INT NOT NULL DEFAULT 1,
+    registered_at   TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_registrations_event FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE,
+    CONSTRAINT fk_registrations_participant FOREIGN KEY (participant_id) REFERENCES users (user_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS volunteer_tasks (
+    task_id             INT AUTO_INCREMENT PRIMARY KEY,
+    task_description    TEXT NOT NULL,
+    volunteer_id        INT NOT NULL,
+    event_id            INT NULL,
+    hours_contributed   DECIMAL(6,2) NOT NULL DEFAULT 0,
+    status              VARCHAR(20) NOT NULL DEFAULT 'assigned',
+    created_at          TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at          TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+    CONSTRAINT fk_volunteer_tasks_volunteer FOREIGN KEY (volunteer_id) REFERENCES users (user_id) ON DELETE CASCADE,
+    CONSTRAINT fk_volunteer_tasks_event FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS notifications (
+    notif_id    INT AUTO_INCREMENT PRIMARY KEY,
+    user_id     INT NOT NULL,
+    event_id    INT NULL,
+    message     TEXT NOT NULL,
+    is_read     BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_notifications_user FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+    CONSTRAINT fk_notifications_event FOREIGN KEY (event_id) REFERENCES events (event_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO roles (role_name) VALUES ('admin'), ('organizer'), ('participant'), ('volunteer');
@@ -0,0 +1,16 @@
+-- Indexes for the predicates the blueprints filter, join and count on.
+-- InnoDB drops the implicit foreign-key indexes once these cover them.
+
+CREATE INDEX idx_registrations_event ON registrations (event_id);
+CREATE UNIQUE INDEX uq_registrations_participant_event ON registrations (participant_id, event_id);
+
+CREATE INDEX idx_volunteer_tasks_volunteer_status ON volunteer_tasks (volunteer_id, status);
+CREATE INDEX idx_volunteer_tasks_event ON volunteer_tasks (event_id);
+
+CREATE INDEX idx_events_organizer_date ON events (organizer_id, event_date);
+CREATE INDEX idx_events_date_status ON events (event_date, status);
+
+CREATE INDEX idx_notifications_user_read_created ON notifications (user_id, is_read, created_at);
+
+CREATE UNIQUE INDEX uq_users_email ON users (email);
+CREATE INDEX idx_users_volunteer_status ON users (is_volunteer, status);
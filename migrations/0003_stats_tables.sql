@@ -0,0 +1,16 @@
+-- Summary tables for models/stats.py.
+-- Backfill existing data with: python -m models.stats rebuild
+
+CREATE TABLE IF NOT EXISTS stat_counters (
+    name        VARCHAR(100) PRIMARY KEY,
+    value       BIGINT NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS stat_buckets (
+    metric      VARCHAR(100) NOT NULL,
+    period      ENUM('day', 'month') NOT NULL,
+    bucket      DATE NOT NULL,
+    value       BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, period, bucket)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
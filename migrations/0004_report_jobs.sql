@@ -0,0 +1,22 @@
+-- Background report jobs for models/reports.py.
+-- Finished files live under Config.REPORT_ARTIFACT_DIR; rows here track them.
+
+CREATE TABLE IF NOT EXISTS report_jobs (
+    job_id          INT AUTO_INCREMENT PRIMARY KEY,
+    kind            VARCHAR(50) NOT NULL,
+    params          TEXT NOT NULL,
+    params_hash     CHAR(64) NOT NULL,
+    status          ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+    progress        TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    rows_written    INT NOT NULL DEFAULT 0,
+    artifact_path   VARCHAR(255) NULL,
+    error           TEXT NULL,
+    requested_by    INT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at      DATETIME NULL,
+    finished_at     DATETIME NULL,
+    CONSTRAINT fk_report_jobs_user FOREIGN KEY (requested_by) REFERENCES users (user_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE INDEX idx_report_jobs_lookup ON report_jobs (kind, params_hash, status, finished_at);
+CREATE INDEX idx_report_jobs_status ON report_jobs (status);
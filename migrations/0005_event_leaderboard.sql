@@ -0,0 +1,18 @@
+-- Ranked participant counts per event for the admin "Top Events" panel.
+-- Maintained by models/stats.py; counts registrations in LEADERBOARD_STATUSES.
+
+CREATE TABLE IF NOT EXISTS event_leaderboard (
+    event_id        INT PRIMARY KEY,
+    participants    INT NOT NULL DEFAULT 0,
+    CONSTRAINT fk_event_leaderboard_event FOREIGN KEY (event_id) REFERENCES events (event_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE INDEX idx_event_leaderboard_rank ON event_leaderboard (participants, event_id);
+
+INSERT IGNORE INTO event_leaderboard (event_id, participants)
+SELECT e.event_id, COUNT(r.reg_id)
+FROM events e
+LEFT JOIN registrations r
+       ON r.event_id = e.event_id
+      AND r.status IN ('registered', 'attended')
+GROUP BY e.event_id;
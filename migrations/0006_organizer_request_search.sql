@@ -0,0 +1,11 @@
+-- Full-text search for the admin organizer-request list (see models/search.py).
+-- search_text denormalizes applicant name, email and organization so one
+-- n-gram FULLTEXT index covers all three.
+
+ALTER TABLE organizer_requests ADD COLUMN search_text TEXT NULL;
+
+UPDATE organizer_requests r
+JOIN users u ON r.user_id = u.user_id
+SET r.search_text = CONCAT_WS(' ', u.name, u.email, r.organization);
+
+CREATE FULLTEXT INDEX ft_organizer_requests_search ON organizer_requests (search_text) WITH PARSER ngram;
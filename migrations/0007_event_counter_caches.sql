@@ -0,0 +1,19 @@
+-- Denormalized per-event counts, maintained by models/stats.py hooks.
+-- Check or repair drift with: python -m models.stats reconcile [--fix]
+
+ALTER TABLE events
+    ADD COLUMN registered_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN tickets_sold INT NOT NULL DEFAULT 0,
+    ADD COLUMN volunteer_count INT NOT NULL DEFAULT 0;
+
+UPDATE events e
+LEFT JOIN (
+    SELECT event_id, COUNT(*) AS n, SUM(ticket_count) AS tickets
+    FROM registrations GROUP BY event_id
+) reg ON reg.event_id = e.event_id
+LEFT JOIN (
+    SELECT event_id, COUNT(*) AS n FROM volunteer_tasks GROUP BY event_id
+) vt ON vt.event_id = e.event_id
+SET e.registered_count = COALESCE(reg.n, 0),
+    e.tickets_sold = COALESCE(reg.tickets, 0),
+    e.volunteer_count = COALESCE(vt.n, 0);
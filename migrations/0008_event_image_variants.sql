@@ -0,0 +1,6 @@
+-- Resized WebP/JPEG copies of events.image_url, written by models/images.py:
+-- {"width": w, "height": h, "webp": {"320": url, ...}, "jpeg": {...}}
+-- NULL until generated; fill existing rows with: python -m models.images backfill
+
+ALTER TABLE events
+    ADD COLUMN image_variants TEXT NULL;
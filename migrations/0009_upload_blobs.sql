@@ -0,0 +1,13 @@
+-- Content-addressed uploads (models/storage.py): one row per stored file,
+-- with the number of rows (events, users, organizer_requests) pointing at it.
+-- Counts are repaired by: python -m models.storage gc
+
+CREATE TABLE upload_blobs (
+    path        VARCHAR(255) NOT NULL PRIMARY KEY,
+    sha256      CHAR(64) NOT NULL,
+    size_bytes  BIGINT NOT NULL DEFAULT 0,
+    ref_count   INT NOT NULL DEFAULT 0,
+    created_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_upload_blobs_sha (sha256),
+    INDEX idx_upload_blobs_refs (ref_count)
+);
@@ -0,0 +1,31 @@
+-- Event broadcasts (models/broadcasts.py): one row per "notify everyone on
+-- this event" job. Workers insert the notifications chunk by chunk and
+-- record how far they got in last_user_id, so a retry resumes there; the
+-- unique (broadcast_id, user_id) key makes re-running a chunk a no-op.
+
+CREATE TABLE IF NOT EXISTS notification_broadcasts (
+    broadcast_id    INT AUTO_INCREMENT PRIMARY KEY,
+    event_id        INT NOT NULL,
+    kind            VARCHAR(30) NOT NULL,
+    message         TEXT NOT NULL,
+    status          ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+    last_user_id    INT NOT NULL DEFAULT 0,
+    sent            INT NOT NULL DEFAULT 0,
+    attempts        INT NOT NULL DEFAULT 0,
+    error           TEXT NULL,
+    created_by      INT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at      DATETIME NULL,
+    finished_at     DATETIME NULL,
+    CONSTRAINT fk_notification_broadcasts_user FOREIGN KEY (created_by) REFERENCES users (user_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE INDEX idx_notification_broadcasts_event ON notification_broadcasts (event_id, kind, status);
+CREATE INDEX idx_notification_broadcasts_status ON notification_broadcasts (status);
+
+ALTER TABLE notifications ADD COLUMN broadcast_id INT NULL;
+CREATE UNIQUE INDEX uq_notifications_broadcast_user ON notifications (broadcast_id, user_id);
+
+-- Recipient scans walk each event's participants / volunteers in user_id order
+CREATE INDEX idx_registrations_event_participant ON registrations (event_id, participant_id);
+CREATE INDEX idx_volunteer_tasks_event_volunteer ON volunteer_tasks (event_id, volunteer_id);
@@ -0,0 +1,16 @@
+-- Per-user unread notification count, maintained by the notification
+-- write paths (models/notifications.py) so the navbar badge never counts.
+-- Check or repair drift with: python -m models.notifications reconcile [--fix]
+
+ALTER TABLE users ADD COLUMN unread_notifications INT NOT NULL DEFAULT 0;
+
+UPDATE users u
+JOIN (
+    SELECT user_id, COUNT(*) AS n FROM notifications
+    WHERE is_read = FALSE GROUP BY user_id
+) unread ON unread.user_id = u.user_id
+SET u.unread_notifications = unread.n;
+
+-- Keyset pages of a user's feed, all or unread only, newest first
+CREATE INDEX idx_notifications_user_id ON notifications (user_id, notif_id);
+CREATE INDEX idx_notifications_user_read_id ON notifications (user_id, is_read, notif_id);
@@ -0,0 +1,24 @@
+-- Soft-deleted events and their background purge jobs (models/events.py).
+-- An event with deleted_at set is hidden everywhere; its registrations,
+-- volunteer tasks and notifications are removed in chunks, then the row.
+
+ALTER TABLE events ADD COLUMN deleted_at DATETIME NULL;
+CREATE INDEX idx_events_deleted ON events (deleted_at);
+
+CREATE TABLE IF NOT EXISTS event_deletions (
+    event_id        INT PRIMARY KEY,
+    organizer_id    INT NULL,
+    requested_by    INT NULL,
+    status          ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+    stage           VARCHAR(30) NULL,
+    progress        TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    rows_deleted    INT NOT NULL DEFAULT 0,
+    total_rows      INT NULL,
+    error           TEXT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at      DATETIME NULL,
+    finished_at     DATETIME NULL,
+    CONSTRAINT fk_event_deletions_user FOREIGN KEY (requested_by) REFERENCES users (user_id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE INDEX idx_event_deletions_status ON event_deletions (status);
@@ -0,0 +1,9 @@
+-- Event search for the organizer and participant event lists (see models/search.py).
+-- One n-gram FULLTEXT index over everything searchable, and one over the
+-- title alone so title matches can be ranked above the rest.
+
+CREATE FULLTEXT INDEX ft_events_search ON events (title, description, location, category) WITH PARSER ngram;
+CREATE FULLTEXT INDEX ft_events_title ON events (title) WITH PARSER ngram;
+
+-- Category filter and facet
+CREATE INDEX idx_events_category_date ON events (category, event_date);
@@ -0,0 +1,149 @@
+"""
+Versioned schema migrations.
+
+Each ``NNNN_name.sql`` file in this package is one migration. Applied
+versions are recorded in ``schema_migrations`` together with a SHA-256
+checksum of the file, so startup only runs new files and refuses to
+continue if an applied file was edited afterwards.
+
+    python -m migrations            # apply pending migrations
+    python -m migrations status     # list applied / pending versions
+"""
+import os
+import re
+import hashlib
+
+from mysql.connector import Error, errorcode
+from models.db import get_db_connection
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+_FILENAME_RE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+# Re-running a statement against a database that already has the object
+# is not an error: older installs created some of these by hand.
+_ALREADY_APPLIED_ERRORS = {
+    errorcode.ER_DUP_KEYNAME,
+    errorcode.ER_TABLE_EXISTS_ERROR,
+    errorcode.ER_DUP_FIELDNAME,
+}
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, "rb") as f:
+            self.source = f.read()
+        self.checksum = hashlib.sha256(self.source).hexdigest()
+
+    def statements(self):
+        lines = [
+            line for line in self.source.decode("utf-8").splitlines()
+            if not line.strip().startswith("--")
+        ]
+        return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+
+def discover():
+    """Return all migrations in this package ordered by version."""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = _FILENAME_RE.match(filename)
+        if match:
+            migrations.append(Migration(
+                int(match.group(1)), match.group(2),
+                os.path.join(MIGRATIONS_DIR, filename)
+            ))
+    return migrations
+
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version     INT PRIMARY KEY,
+            name        VARCHAR(100) NOT NULL,
+            checksum    CHAR(64) NOT NULL,
+            applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB
+    """)
+
+
+def _applied_versions(cursor):
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def status():
+    """Return (migration, applied) pairs for every known migration."""
+    conn = get_db_connection()
+    if conn is None:
+        raise MigrationError("No DB connection.")
+    cursor = conn.cursor()
+    try:
+        _ensure_version_table(cursor)
+        applied = _applied_versions(cursor)
+        return [(m, m.version in applied) for m in discover()]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def migrate(verbose=True):
+    """
+    Apply every pending migration in version order and return the list of
+    versions applied. A named lock keeps concurrent workers from racing.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise MigrationError("No DB connection.")
+    cursor = conn.cursor()
+    applied_now = []
+    try:
+        cursor.execute("SELECT GET_LOCK('ems_schema_migrations', 60)")
+        if cursor.fetchone()[0] != 1:
+            raise MigrationError("Timed out waiting for the migration lock.")
+
+        _ensure_version_table(cursor)
+        applied = _applied_versions(cursor)
+
+        for migration in discover():
+            if migration.version in applied:
+                if applied[migration.version] != migration.checksum:
+                    raise MigrationError(
+                        f"Checksum mismatch for applied migration "
+                        f"{migration.version:04d}_{migration.name}; "
+                        f"add a new migration instead of editing it."
+                    )
+                continue
+
+            for statement in migration.statements():
+                try:
+                    cursor.execute(statement)
+                except Error as e:
+                    if e.errno not in _ALREADY_APPLIED_ERRORS:
+                        conn.rollback()
+                        raise MigrationError(
+                            f"Migration {migration.version:04d}_{migration.name} failed: {e}"
+                        ) from e
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, migration.checksum)
+            )
+            conn.commit()
+            applied_now.append(migration.version)
+            if verbose:
+                print(f"✅ Applied migration {migration.version:04d}_{migration.name}")
+
+        if verbose and not applied_now:
+            print("ℹ️ Schema is up to date. Skipping migrations.")
+        return applied_now
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('ems_schema_migrations')")
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
@@ -0,0 +1,28 @@
+import sys
+import argparse
+
+from migrations import MigrationError, migrate, status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m migrations",
+                                     description="Manage the EMS database schema.")
+    parser.add_argument("command", nargs="?", default="upgrade",
+                        choices=["upgrade", "status"])
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "status":
+            for migration, applied in status():
+                state = "applied" if applied else "pending"
+                print(f"{migration.version:04d}_{migration.name:<30} {state:<8} {migration.checksum[:12]}")
+        else:
+            migrate()
+    except MigrationError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
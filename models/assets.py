@@ -0,0 +1,206 @@
+"""
+Static asset delivery: fingerprinted URLs, strong ETags and precompressed files.
+
+``init_assets(app)`` does three things:
+
+* every ``url_for('static', filename=...)`` gets ``?v=<content hash>``
+  appended, and the ``asset_url`` template filter does the same for
+  ``/static/...`` URLs stored in the database (event images, profile
+  pictures). A URL whose ``v`` matches the file's current hash, or a
+  content-addressed upload (models/storage.py), is served with
+  ``Cache-Control: public, max-age=31536000, immutable``;
+* everything else under /static is served with ``Cache-Control: no-cache``
+  and a strong, content-derived ETag, so a revalidation costs a 304;
+* if the client accepts it, a ``.br`` or ``.gz`` sibling written by the
+  build step is sent instead of the original, with ``Content-Encoding``:
+
+    python -m models.assets build   # precompress static/css and static/js
+
+Brotli output needs the optional ``brotli`` package; without it only
+``.gz`` files are written.
+"""
+import os
+import re
+import sys
+import gzip
+import hashlib
+import mimetypes
+import threading
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+PRECOMPRESS_DIRS = ("css", "js")
+PRECOMPRESS_EXTENSIONS = {".css", ".js", ".svg", ".json"}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+FINGERPRINT_LENGTH = 12
+
+# Encodings in order of preference: (Accept-Encoding token, file suffix)
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Uploads named after their own SHA-256 (blobs and their image variants) never change
+_CONTENT_ADDRESSED_RE = re.compile(r"^uploads/(blobs/[0-9a-f]{2}/|events/variants/)[0-9a-f]{64}[._]")
+
+
+# -------------------------------
+# Content hashes
+# -------------------------------
+_hash_cache = {}
+_hash_cache_lock = threading.Lock()
+
+
+def _file_hash(path):
+    """SHA-256 of a file, cached until its mtime or size changes; None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _hash_cache_lock:
+        hit = _hash_cache.get(path)
+        if hit and hit[0] == key:
+            return hit[1]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _hash_cache_lock:
+        _hash_cache[path] = (key, value)
+    return value
+
+
+def _static_path(filename):
+    return safe_join(STATIC_DIR, filename)
+
+
+def fingerprint(filename):
+    """Short content hash of static/``filename``, or None if it doesn't exist."""
+    path = _static_path(filename)
+    digest = _file_hash(path) if path else None
+    return digest[:FINGERPRINT_LENGTH] if digest else None
+
+
+def asset_url(url):
+    """Append ``?v=<hash>`` to a ``/static/...`` URL; other URLs pass through."""
+    if not url or not url.startswith("/static/") or "?" in url:
+        return url
+    filename = url[len("/static/"):]
+    if _CONTENT_ADDRESSED_RE.match(filename):
+        return url  # already immutable by name
+    version = fingerprint(filename)
+    return f"{url}?v={version}" if version else url
+
+
+# -------------------------------
+# Serving
+# -------------------------------
+def _accepted_encodings():
+    header = request.headers.get("Accept-Encoding", "")
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+def serve_static(filename):
+    """Replacement for Flask's static view; see the module docstring."""
+    path = _static_path(filename)
+    if not path or not os.path.isfile(path):
+        abort(404)
+    digest = _file_hash(path)
+
+    immutable = bool(_CONTENT_ADDRESSED_RE.match(filename)) or (
+        request.args.get("v") == digest[:FINGERPRINT_LENGTH]
+    )
+
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    body, encoding = path, None
+    accepted = _accepted_encodings()
+    for token, suffix in _ENCODINGS:
+        candidate = path + suffix
+        if token in accepted and os.path.isfile(candidate) \
+                and os.path.getmtime(candidate) >= os.path.getmtime(path):
+            body, encoding = candidate, token
+            break
+
+    # Strong ETag per representation: same content, different encoding, different bytes
+    etag = digest if encoding is None else f"{digest}-{encoding}"
+    response = send_file(
+        body, mimetype=mimetype, etag=etag, conditional=True,
+        max_age=IMMUTABLE_MAX_AGE if immutable else None,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if os.path.isfile(path + ".gz") or os.path.isfile(path + ".br"):
+        response.vary.add("Accept-Encoding")
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+    return response
+
+
+def init_assets(app):
+    """Fingerprint static URLs and serve /static through serve_static."""
+    @app.url_defaults
+    def _fingerprint_static(endpoint, values):
+        if endpoint == "static" and "filename" in values and "v" not in values:
+            if not _CONTENT_ADDRESSED_RE.match(values["filename"]):
+                version = fingerprint(values["filename"])
+                if version:
+                    values["v"] = version
+
+    app.view_functions["static"] = serve_static
+    app.add_template_filter(asset_url, "asset_url")
+
+
+# -------------------------------
+# Build step
+# -------------------------------
+def precompress(directories=PRECOMPRESS_DIRS):
+    """Write .gz (and .br when brotli is installed) next to each text asset."""
+    written = 0
+    for directory in directories:
+        for root, _, files in os.walk(os.path.join(STATIC_DIR, directory)):
+            for name in files:
+                if os.path.splitext(name)[1] not in PRECOMPRESS_EXTENSIONS:
+                    continue
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    data = f.read()
+                outputs = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+                if brotli is not None:
+                    outputs.append((".br", brotli.compress(data, quality=11)))
+                for suffix, compressed in outputs:
+                    target = path + suffix
+                    if len(compressed) >= len(data):
+                        if os.path.exists(target):
+                            os.remove(target)  # a stale sibling would be served
+                        continue
+                    with open(target + ".part", "wb") as out:
+                        out.write(compressed)
+                    os.replace(target + ".part", target)
+                    written += 1
+                    print(f"✅ {os.path.relpath(target, STATIC_DIR)} "
+                          f"({len(data)} -> {len(compressed)} bytes)")
+    if brotli is None:
+        print("ℹ️ brotli not installed; wrote .gz files only")
+    return written
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        print("usage: python -m models.assets build")
+        sys.exit(2)
+    precompress()
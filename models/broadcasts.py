@@ -0,0 +1,260 @@
+"""
+Event broadcasts: one notification to everyone on an event.
+
+An organizer editing or deleting an event only records a row in
+``notification_broadcasts`` (migrations/0010) in its own transaction; a
+background worker then writes the notifications for every participant
+with an active registration and every volunteer with a task on the
+event. Recipients never pass through Python: each chunk of
+``Config.BROADCAST_CHUNK_SIZE`` users is one ``INSERT IGNORE ... SELECT``
+over ``registrations`` and ``volunteer_tasks`` in user_id order, committed
+on its own so ``notifications`` is never locked for long.
+
+Retries are idempotent. The worker stores the last user_id it committed,
+so it resumes there, and ``notifications`` has a unique
+(broadcast_id, user_id) key, so re-running a chunk adds nothing. A failed
+chunk is retried with backoff up to ``Config.BROADCAST_MAX_ATTEMPTS``
+times; broadcasts left behind by a stopped process are picked up by
+``recover_broadcasts()`` at startup.
+
+An ``event_deleted`` broadcast goes out for a soft-deleted event and
+then starts its purge (models/events.py), which waits for it because the
+recipients are found through the registrations it removes. Its
+notifications carry no event_id, so they outlive the event.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from models.db import get_db_connection, checkout_connection
+from models.events import start_event_deletion
+
+EVENT_UPDATED = "event_updated"
+EVENT_DELETED = "event_deleted"
+
+# Each branch is cut to one chunk so the UNION stays chunk-sized however big the event is
+_NEXT_BOUNDARY = """
+    SELECT MAX(user_id) AS upper_id FROM (
+        (SELECT participant_id AS user_id FROM registrations
+         WHERE event_id = %s AND status IN ('registered', 'attended') AND participant_id > %s
+         ORDER BY participant_id LIMIT %s)
+        UNION
+        (SELECT volunteer_id FROM volunteer_tasks
+         WHERE event_id = %s AND volunteer_id > %s
+         ORDER BY volunteer_id LIMIT %s)
+        ORDER BY user_id LIMIT %s
+    ) AS chunk
+"""
+
+_INSERT_CHUNK = """
+    INSERT IGNORE INTO notifications (user_id, event_id, message, is_read, created_at, broadcast_id)
+    SELECT recipients.user_id, %s, %s, FALSE, NOW(), %s FROM (
+        SELECT participant_id AS user_id FROM registrations
+        WHERE event_id = %s AND status IN ('registered', 'attended')
+          AND participant_id > %s AND participant_id <= %s
+        UNION
+        SELECT volunteer_id FROM volunteer_tasks
+        WHERE event_id = %s AND volunteer_id > %s AND volunteer_id <= %s
+    ) AS recipients
+"""
+
+
+class BroadcastError(Exception):
+    pass
+
+
+# -------------------------------
+# Queueing (request side)
+# -------------------------------
+def broadcast_event(cursor, event_id, kind, message, created_by=None):
+    """
+    Record a broadcast in the caller's transaction and return its id, to
+    hand to ``start_broadcast`` after commit. An update broadcast that is
+    still queued for the same event just takes the newer message (returns
+    None: it is already on its way), so a burst of edits sends one round;
+    likewise a second delete of an event being deleted.
+    """
+    if kind not in (EVENT_UPDATED, EVENT_DELETED):
+        raise BroadcastError(f"Unknown broadcast kind '{kind}'.")
+
+    if kind == EVENT_UPDATED:
+        cursor.execute("""
+            UPDATE notification_broadcasts SET message = %s
+            WHERE event_id = %s AND kind = %s AND status = 'queued' AND last_user_id = 0
+        """, (message, event_id, kind))
+        if cursor.rowcount:
+            return None
+    else:
+        cursor.execute("""
+            SELECT 1 FROM notification_broadcasts
+            WHERE event_id = %s AND kind = %s AND status IN ('queued', 'running')
+        """, (event_id, kind))
+        if cursor.fetchone():
+            return None  # a repeated delete; the first one is under way
+        # Updates not started yet are moot once the event is going away
+        cursor.execute("""
+            UPDATE notification_broadcasts
+            SET status = 'done', error = 'superseded by deletion', finished_at = NOW()
+            WHERE event_id = %s AND kind = %s AND status = 'queued'
+        """, (event_id, EVENT_UPDATED))
+
+    cursor.execute("""
+        INSERT INTO notification_broadcasts (event_id, kind, message, created_by)
+        VALUES (%s, %s, %s, %s)
+    """, (event_id, kind, message, created_by))
+    return cursor.lastrowid
+
+
+def start_broadcast(broadcast_id):
+    """Hand a committed broadcast to the workers; None is ignored."""
+    if broadcast_id:
+        _get_executor().submit(_run_broadcast, broadcast_id)
+
+
+# -------------------------------
+# Worker pool
+# -------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.BROADCAST_WORKERS,
+                    thread_name_prefix="broadcast-worker"
+                )
+    return _executor
+
+
+def _retry_later(broadcast_id, attempts):
+    delay = min(2 ** attempts, 60)
+    timer = threading.Timer(delay, start_broadcast, args=(broadcast_id,))
+    timer.daemon = True
+    timer.start()
+    return delay
+
+
+def _fan_out(conn, cursor, broadcast):
+    """Insert the notifications chunk by chunk from last_user_id on; returns rows added."""
+    broadcast_id, event_id = broadcast["broadcast_id"], broadcast["event_id"]
+    notification_event_id = None if broadcast["kind"] == EVENT_DELETED else event_id
+    chunk = Config.BROADCAST_CHUNK_SIZE
+    lower, added = broadcast["last_user_id"], 0
+    while True:
+        cursor.execute(_NEXT_BOUNDARY, (event_id, lower, chunk, event_id, lower, chunk, chunk))
+        upper = cursor.fetchone()["upper_id"]
+        if upper is None:
+            return added
+        cursor.execute(_INSERT_CHUNK, (
+            notification_event_id, broadcast["message"], broadcast_id,
+            event_id, lower, upper, event_id, lower, upper
+        ))
+        inserted = cursor.rowcount
+        if inserted:
+            # Exactly the rows this chunk added: the chunk commits or retries as a whole
+            cursor.execute("""
+                UPDATE users u
+                JOIN notifications n ON n.user_id = u.user_id
+                SET u.unread_notifications = u.unread_notifications + 1
+                WHERE n.broadcast_id = %s AND n.user_id > %s AND n.user_id <= %s
+            """, (broadcast_id, lower, upper))
+        cursor.execute("""
+            UPDATE notification_broadcasts SET last_user_id = %s, sent = sent + %s
+            WHERE broadcast_id = %s
+        """, (upper, inserted, broadcast_id))
+        conn.commit()
+        added += inserted
+        lower = upper
+
+
+def _run_broadcast(broadcast_id):
+    """Claim a queued broadcast and deliver it; runs on a worker thread."""
+    conn = checkout_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            UPDATE notification_broadcasts
+            SET status = 'running', attempts = attempts + 1, started_at = COALESCE(started_at, NOW())
+            WHERE broadcast_id = %s AND status = 'queued'
+        """, (broadcast_id,))
+        conn.commit()
+        if cursor.rowcount != 1:
+            return  # another worker claimed it, or it is finished
+
+        cursor.execute("""
+            SELECT broadcast_id, event_id, kind, message, last_user_id, attempts
+            FROM notification_broadcasts WHERE broadcast_id = %s
+        """, (broadcast_id,))
+        broadcast = cursor.fetchone()
+
+        # An update to an event deleted meanwhile is moot
+        live_only = "AND deleted_at IS NULL" if broadcast["kind"] == EVENT_UPDATED else ""
+        cursor.execute(f"SELECT 1 FROM events WHERE event_id = %s {live_only}", (broadcast["event_id"],))
+        added = _fan_out(conn, cursor, broadcast) if cursor.fetchone() else 0
+
+        cursor.execute("""
+            UPDATE notification_broadcasts SET status = 'done', error = NULL, finished_at = NOW()
+            WHERE broadcast_id = %s
+        """, (broadcast_id,))
+        conn.commit()
+        print(f"✅ Broadcast {broadcast_id} ({broadcast['kind']}, event {broadcast['event_id']}): "
+              f"{added} notification(s)")
+        if broadcast["kind"] == EVENT_DELETED:
+            start_event_deletion(broadcast["event_id"])
+    except Exception as e:
+        try:
+            conn.rollback()
+            cursor.execute("SELECT attempts FROM notification_broadcasts WHERE broadcast_id = %s",
+                           (broadcast_id,))
+            attempts = cursor.fetchone()["attempts"]
+            final = attempts >= Config.BROADCAST_MAX_ATTEMPTS
+            cursor.execute("""
+                UPDATE notification_broadcasts SET status = %s, error = %s,
+                       finished_at = IF(%s, NOW(), NULL)
+                WHERE broadcast_id = %s
+            """, ("failed" if final else "queued", str(e)[:1000], final, broadcast_id))
+            conn.commit()
+            if final:
+                print(f"❌ Broadcast {broadcast_id} failed after {attempts} attempt(s): {e}")
+                cursor.execute("SELECT kind, event_id FROM notification_broadcasts WHERE broadcast_id = %s",
+                               (broadcast_id,))
+                row = cursor.fetchone()
+                if row["kind"] == EVENT_DELETED:
+                    start_event_deletion(row["event_id"])  # don't keep a deleted event around for good
+            else:
+                delay = _retry_later(broadcast_id, attempts)
+                print(f"❌ Broadcast {broadcast_id} failed, retrying in {delay}s: {e}")
+        except Exception:
+            print(f"❌ Broadcast {broadcast_id} failed: {e}")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def recover_broadcasts():
+    """
+    Re-queue broadcasts left 'running' by a previous process and hand
+    every queued one to the workers. Call once at startup.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise BroadcastError("No DB connection.")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE notification_broadcasts SET status = 'queued' WHERE status = 'running'")
+        cursor.execute("SELECT broadcast_id FROM notification_broadcasts WHERE status = 'queued' ORDER BY broadcast_id")
+        pending = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    for broadcast_id in pending:
+        start_broadcast(broadcast_id)
+    if pending:
+        print(f"ℹ️ Resumed {len(pending)} notification broadcast(s)")
+    return pending
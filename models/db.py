@@ -1,23 +1,253 @@
-import mysql.connector
-from mysql.connector import Error
+import re
+import time
+import logging
+import threading
+from collections import Counter
+
+from mysql.connector import Error, pooling
+from flask import g, has_app_context, has_request_context, request
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """
+    Return the shared connection pool, creating it on first use.
+    MySQLConnectionPool opens all of its connections up front, so
+    creating the pool doubles as the warm-up step.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=Config.DB_POOL_NAME,
+                    pool_size=Config.DB_POOL_SIZE,
+                    pool_reset_session=True,
+                    host=Config.DB_HOST,
+                    port=Config.DB_PORT,
+                    user=Config.DB_USER,
+                    password=Config.DB_PASS,
+                    database=Config.DB_NAME
+                )
+                print(f"✅ Database pool '{Config.DB_POOL_NAME}' ready ({Config.DB_POOL_SIZE} connections)")
+    return _pool
+
+
+def checkout_connection(timeout=None):
+    """
+    Borrow a connection from the pool, waiting up to ``timeout`` (default
+    DB_POOL_TIMEOUT) seconds for one to be returned. The connection is pinged first so a
+    socket dropped by the server is reconnected instead of handed out.
+    Calling close() on it returns it to the pool.
+    """
+    pool = _get_pool()
+    deadline = time.monotonic() + (Config.DB_POOL_TIMEOUT if timeout is None else timeout)
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except pooling.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+    if Config.DB_POOL_PRE_PING:
+        try:
+            conn.ping(reconnect=True, attempts=2, delay=0)
+        except Error:
+            conn.close()
+            raise
+    return conn
+
+
+# -------------------------------
+# Query instrumentation
+# -------------------------------
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^'\\]|\\.)*'"), "?"),               # string literals
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),               # numeric literals
+    (re.compile(r"%s"), "?"),                              # driver placeholders
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),   # IN (...) lists of any length
+    (re.compile(r"\s+"), " "),
+]
+
+
+def fingerprint(statement):
+    """Normalize a SQL statement so repeated executions group together."""
+    if isinstance(statement, (bytes, bytearray)):
+        statement = statement.decode("utf-8", "replace")
+    for pattern, repl in _FINGERPRINT_RULES:
+        statement = pattern.sub(repl, statement)
+    return statement.strip()
+
+
+def query_log():
+    """The current request's list of recorded queries, or None outside a request."""
+    if not has_request_context():
+        return None
+    if "db_queries" not in g:
+        g.db_queries = []
+    return g.db_queries
+
+
+class _InstrumentedCursor:
+    """
+    Cursor wrapper that records each statement's fingerprint, duration
+    and row count on flask.g for the current request. Worker threads
+    without a request context pass the request's ``log`` list explicitly.
+    """
+
+    def __init__(self, cursor, log=None):
+        self._cursor = cursor
+        self._entry = None
+        self._log = log
+
+    def _record(self, statement, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._entry = {
+            "fingerprint": fingerprint(statement),
+            "ms": elapsed_ms,
+            "rows": self._cursor.rowcount,
+        }
+        log = self._log if self._log is not None else query_log()
+        if log is not None:
+            log.append(self._entry)
+        if elapsed_ms >= Config.DB_SLOW_QUERY_MS:
+            logger.warning("Slow query (%.1f ms, %s rows): %s",
+                           elapsed_ms, self._cursor.rowcount, self._entry["fingerprint"])
+
+    def _update_rows(self):
+        if self._entry is not None:
+            self._entry["rows"] = self._cursor.rowcount
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, params, *args, **kwargs)
+        finally:
+            self._record(operation, started)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._record(operation, started)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        self._update_rows()
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        self._update_rows()
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._update_rows()
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def record_query_stats(response):
+    """
+    after_request hook: attach X-DB-Queries / X-DB-Time headers and warn
+    about fingerprints repeated often enough to look like an N+1 loop.
+    """
+    queries = g.get("db_queries") or []
+    total_ms = sum(q["ms"] for q in queries)
+    response.headers["X-DB-Queries"] = str(len(queries))
+    response.headers["X-DB-Time"] = f"{total_ms:.1f}ms"
+
+    repeated = Counter(q["fingerprint"] for q in queries)
+    for statement, count in repeated.items():
+        if count > Config.DB_N_PLUS_ONE_THRESHOLD:
+            logger.warning("Possible N+1 on %s %s: %d executions of %s",
+                           request.method, request.path, count, statement)
+    return response
+
+
+def instrument_cursor(cursor, log=None):
+    """Wrap a raw cursor so its statements are recorded like request cursors."""
+    return _InstrumentedCursor(cursor, log)
+
+
+class _RequestConnection:
+    """
+    Proxy handed to route code for the request-scoped connection.
+    close() is a no-op so the existing ``conn.close()`` calls leave the
+    connection available to later helpers; the teardown handler returns
+    it to the pool.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def close(self):
+        pass
+
+    def cursor(self, *args, **kwargs):
+        return _InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
 def get_db_connection():
     """
-    Create and return a new database connection.
-    Caller must close it after use.
+    Return a database connection.
+    Inside a request every call shares one pooled connection stored on
+    flask.g; outside one (startup scripts, CLI) the caller gets its own
+    pooled connection and must close it after use.
     """
     try:
-        conn = mysql.connector.connect(
-            host=Config.DB_HOST,
-            port=Config.DB_PORT,
-            user=Config.DB_USER,
-            password=Config.DB_PASS,
-            database=Config.DB_NAME
-        )
-        if conn.is_connected():
-            print("✅ Database connected successfully")
-            return conn
+        if has_app_context():
+            if "db_conn" not in g:
+                g.db_conn = checkout_connection()
+            return _RequestConnection(g.db_conn)
+        return checkout_connection()
     except Error as e:
         print(f"❌ Database connection error: {e}")
         return None
+
+
+def release_db_connection(exc=None):
+    """Return the request's connection to the pool, discarding uncommitted work."""
+    conn = g.pop("db_conn", None)
+    if conn is None:
+        return
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except Error as e:
+        print(f"❌ Database rollback error: {e}")
+    finally:
+        conn.close()
+
+
+def init_db(app):
+    """Register the request hooks and warm up the pool at startup."""
+    app.teardown_appcontext(release_db_connection)
+    app.after_request(record_query_stats)
+    try:
+        _get_pool()
+    except Error as e:
+        print(f"❌ Database pool warm-up failed: {e}")
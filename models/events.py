@@ -0,0 +1,273 @@
+"""
+Event deletion.
+
+Deleting an event is two steps. ``soft_delete_event`` runs in the
+organizer's request: it stamps ``events.deleted_at`` (migrations/0012),
+which hides the event everywhere, takes it out of the dashboard stats
+and records an ``event_deletions`` job. A background worker then purges
+the event's ``registrations``, ``volunteer_tasks`` and ``notifications``
+in chunks of ``Config.EVENT_DELETE_CHUNK_SIZE`` rows, one short
+transaction per chunk, so a 50k-registration event never holds locks
+that stall registrations for other events. Finally it deletes the event
+row and its uploaded image (when no other row uses the same file).
+
+Progress (stage, rows deleted, percentage) is kept on the job row for
+``get_deletion``. If the event has a pending cancellation broadcast
+(models/broadcasts.py), the purge starts only after it has gone out,
+since the broadcast finds its recipients through those registrations.
+"""
+import json
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from models.db import get_db_connection, checkout_connection
+from models.notifications import bump_unread_many, forget_unread
+from models.storage import reclaim, release, remove_files
+from models.stats import record_event_deleted, record_registration, record_task
+
+
+class EventDeletionError(Exception):
+    pass
+
+
+# -------------------------------
+# Request side
+# -------------------------------
+def soft_delete_event(cursor, event, requested_by=None):
+    """
+    Hide ``event`` (a row dict from ``SELECT * FROM events``) and queue its
+    purge, in the caller's transaction. Returns False if it was already
+    deleted. Call ``start_event_deletion`` after commit.
+    """
+    cursor.execute(
+        "UPDATE events SET deleted_at = NOW() WHERE event_id = %s AND deleted_at IS NULL",
+        (event["event_id"],)
+    )
+    if cursor.rowcount != 1:
+        return False
+    record_event_deleted(cursor, event["event_date"], event["status"] or "upcoming")
+    # Off the Top Events board now; the row would only go at the purge's end
+    cursor.execute("DELETE FROM event_leaderboard WHERE event_id = %s", (event["event_id"],))
+    cursor.execute("""
+        INSERT INTO event_deletions (event_id, organizer_id, requested_by)
+        VALUES (%s, %s, %s)
+    """, (event["event_id"], event["organizer_id"], requested_by))
+    return True
+
+
+def get_deletion(cursor, event_id, organizer_id=None):
+    """The purge job of ``event_id`` as a dict (optionally only if ``organizer_id`` owns it), or None."""
+    sql = """
+        SELECT event_id, status, stage, progress, rows_deleted, total_rows, error,
+               created_at, started_at, finished_at
+        FROM event_deletions WHERE event_id = %s
+    """
+    params = [event_id]
+    if organizer_id is not None:
+        sql += " AND organizer_id = %s"
+        params.append(organizer_id)
+    cursor.execute(sql, params)
+    return cursor.fetchone()
+
+
+# -------------------------------
+# Worker pool
+# -------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.EVENT_DELETE_WORKERS,
+                    thread_name_prefix="event-delete-worker"
+                )
+    return _executor
+
+
+def start_event_deletion(event_id):
+    """Hand a committed deletion to the workers."""
+    _get_executor().submit(_run_deletion, event_id)
+
+
+# -------------------------------
+# Purge
+# -------------------------------
+def _purge_registrations(cursor, event_id, chunk_size):
+    cursor.execute("""
+        SELECT reg_id, status, DATE(registered_at) AS day FROM registrations
+        WHERE event_id = %s ORDER BY reg_id LIMIT %s FOR UPDATE
+    """, (event_id, chunk_size))
+    rows = cursor.fetchall()
+    if rows:
+        _delete_ids(cursor, "registrations", "reg_id", [row["reg_id"] for row in rows])
+        # The event's own counters went with the soft delete; only the global ones remain
+        for (status, day), n in Counter((row["status"], row["day"]) for row in rows).items():
+            record_registration(cursor, status, day, delta=-n)
+    return len(rows), ()
+
+
+def _purge_tasks(cursor, event_id, chunk_size):
+    cursor.execute("""
+        SELECT task_id, status FROM volunteer_tasks
+        WHERE event_id = %s ORDER BY task_id LIMIT %s FOR UPDATE
+    """, (event_id, chunk_size))
+    rows = cursor.fetchall()
+    if rows:
+        _delete_ids(cursor, "volunteer_tasks", "task_id", [row["task_id"] for row in rows])
+        for status, n in Counter(row["status"] for row in rows).items():
+            record_task(cursor, status, delta=-n)
+    return len(rows), ()
+
+
+def _purge_notifications(cursor, event_id, chunk_size):
+    cursor.execute("""
+        SELECT notif_id, user_id, is_read FROM notifications
+        WHERE event_id = %s ORDER BY notif_id LIMIT %s FOR UPDATE
+    """, (event_id, chunk_size))
+    rows = cursor.fetchall()
+    unread = Counter(row["user_id"] for row in rows if not row["is_read"])
+    if rows:
+        _delete_ids(cursor, "notifications", "notif_id", [row["notif_id"] for row in rows])
+        bump_unread_many(cursor, {user_id: -n for user_id, n in unread.items()})
+    return len(rows), unread
+
+
+# (stage, table, chunk function) in the order they are purged
+STAGES = (
+    ("registrations", "registrations", _purge_registrations),
+    ("volunteer_tasks", "volunteer_tasks", _purge_tasks),
+    ("notifications", "notifications", _purge_notifications),
+)
+
+
+def _delete_ids(cursor, table, key, ids):
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(f"DELETE FROM {table} WHERE {key} IN ({placeholders})", ids)
+
+
+def _variant_paths(raw):
+    try:
+        variants = json.loads(raw) if raw else {}
+    except (TypeError, ValueError):
+        return []
+    return [url for fmt in ("webp", "jpeg") for url in (variants.get(fmt) or {}).values()]
+
+
+def _broadcast_pending(cursor, event_id):
+    cursor.execute("""
+        SELECT 1 FROM notification_broadcasts
+        WHERE event_id = %s AND kind = 'event_deleted' AND status IN ('queued', 'running')
+        LIMIT 1
+    """, (event_id,))
+    return cursor.fetchone() is not None
+
+
+def _run_deletion(event_id):
+    """Purge a soft-deleted event chunk by chunk; runs on a worker thread."""
+    conn = checkout_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        if _broadcast_pending(cursor, event_id):
+            conn.commit()
+            return  # the broadcast starts us again once everyone has been told
+        cursor.execute("""
+            UPDATE event_deletions
+            SET status = 'running', started_at = COALESCE(started_at, NOW()), error = NULL
+            WHERE event_id = %s AND status = 'queued'
+        """, (event_id,))
+        conn.commit()
+        if cursor.rowcount != 1:
+            return  # another worker claimed it, or it is finished
+
+        cursor.execute("SELECT rows_deleted FROM event_deletions WHERE event_id = %s", (event_id,))
+        deleted = cursor.fetchone()["rows_deleted"]
+        remaining = 0
+        for _, table, _ in STAGES:
+            cursor.execute(f"SELECT COUNT(*) AS n FROM {table} WHERE event_id = %s", (event_id,))
+            remaining += cursor.fetchone()["n"]
+        total = deleted + remaining
+        cursor.execute("UPDATE event_deletions SET total_rows = %s WHERE event_id = %s", (total, event_id))
+        conn.commit()
+
+        chunk_size = Config.EVENT_DELETE_CHUNK_SIZE
+        pause = Config.EVENT_DELETE_PAUSE_MS / 1000.0
+        for stage, _, purge in STAGES:
+            while True:
+                n, unread = purge(cursor, event_id, chunk_size)
+                deleted += n
+                cursor.execute("""
+                    UPDATE event_deletions SET stage = %s, rows_deleted = %s, progress = %s
+                    WHERE event_id = %s
+                """, (stage, deleted, min(99, deleted * 100 // total) if total else 99, event_id))
+                conn.commit()
+                forget_unread(unread)
+                if n < chunk_size:
+                    break
+                if pause:
+                    time.sleep(pause)  # let queued writers on the same tables in
+
+        # Only the row itself is left; its image goes too unless something else shares the file
+        cursor.execute("SELECT image_url, image_variants FROM events WHERE event_id = %s FOR UPDATE",
+                       (event_id,))
+        event = cursor.fetchone()
+        files = []
+        if event:
+            cursor.execute("DELETE FROM events WHERE event_id = %s", (event_id,))
+            release(cursor, event["image_url"])
+            files = reclaim(cursor, event["image_url"], _variant_paths(event["image_variants"]))
+        cursor.execute("""
+            UPDATE event_deletions
+            SET status = 'done', stage = 'done', progress = 100, rows_deleted = %s, finished_at = NOW()
+            WHERE event_id = %s
+        """, (deleted, event_id))
+        conn.commit()
+        removed = remove_files(files)
+        print(f"✅ Event {event_id} purged: {deleted} row(s), {removed} file(s)")
+    except Exception as e:
+        print(f"❌ Deleting event {event_id} failed: {e}")
+        try:
+            conn.rollback()
+            cursor.execute("""
+                UPDATE event_deletions SET status = 'failed', error = %s, finished_at = NOW()
+                WHERE event_id = %s
+            """, (str(e)[:1000], event_id))
+            conn.commit()
+        except Exception:
+            pass
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def recover_event_deletions():
+    """
+    Re-queue purges left 'running' by a previous process or 'failed', and
+    hand every queued one to the workers (each resumes where it stopped:
+    finished chunks are gone). Call once at startup.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise EventDeletionError("No DB connection.")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE event_deletions SET status = 'queued' WHERE status IN ('running', 'failed')")
+        cursor.execute("SELECT event_id FROM event_deletions WHERE status = 'queued' ORDER BY created_at")
+        pending = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    for event_id in pending:
+        start_event_deletion(event_id)
+    if pending:
+        print(f"ℹ️ Resumed {len(pending)} event deletion(s)")
+    return pending
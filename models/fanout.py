@@ -0,0 +1,127 @@
+"""
+Run a page's independent read queries concurrently.
+
+Dashboards issue many small queries that don't depend on each other.
+Declaring them together lets each run on its own pooled connection, so
+the page waits for the slowest query instead of the sum of all of them:
+
+    results = fetch_concurrently({
+        "total_events": Query("SELECT COUNT(*) AS n FROM events WHERE organizer_id = %s",
+                              (user_id,), one=True),
+        "recent_events": Query("SELECT ... LIMIT 5", (user_id,)),
+        "roles": lambda cursor: get_counters(cursor, "users.role"),
+    })
+
+Each entry is a Query or a callable taking a ``dictionary=True`` cursor.
+The whole batch shares one deadline (Config.DB_FANOUT_DEADLINE), which
+is also set as the server-side MAX_EXECUTION_TIME of every statement.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from mysql.connector import pooling
+from config import Config
+from models.db import checkout_connection, get_db_connection, instrument_cursor, query_log
+
+
+class FanoutTimeout(Exception):
+    pass
+
+
+class Query:
+    """A single SELECT; ``one=True`` returns fetchone() instead of fetchall()."""
+
+    def __init__(self, sql, params=(), one=False):
+        self.sql = sql
+        self.params = params
+        self.one = one
+
+    def __call__(self, cursor):
+        cursor.execute(self.sql, self.params)
+        return cursor.fetchone() if self.one else cursor.fetchall()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Returned by a worker that found the pool exhausted
+_NO_CONNECTION = object()
+
+# How long a worker waits for a free pooled connection before the query
+# is handed back to run on the request's own connection
+CHECKOUT_TIMEOUT = 0.25  # seconds
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.DB_FANOUT_WORKERS,
+                    thread_name_prefix="db-fanout"
+                )
+    return _executor
+
+
+def _run(task, deadline, log):
+    try:
+        conn = checkout_connection(timeout=CHECKOUT_TIMEOUT)
+    except pooling.PoolError:
+        return _NO_CONNECTION
+    cursor = None
+    try:
+        cursor = instrument_cursor(conn.cursor(dictionary=True), log)
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            raise FanoutTimeout("Deadline passed before the query started.")
+        # Reset when the connection goes back to the pool (pool_reset_session)
+        cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (remaining_ms,))
+        return task(cursor)
+    finally:
+        if cursor:
+            cursor.close()
+        conn.close()
+
+
+def fetch_concurrently(queries, deadline=None):
+    """
+    Run every entry of ``queries`` ({key: Query | callable}) and return
+    {key: result}. Raises FanoutTimeout if the batch isn't done within
+    ``deadline`` seconds, or re-raises the first query error.
+
+    Entries that can't get a pooled connection in time fall back to the
+    request's own connection, one after another, so a busy pool slows a
+    page down rather than failing it.
+    """
+    deadline_at = time.monotonic() + (Config.DB_FANOUT_DEADLINE if deadline is None else deadline)
+    log = query_log()
+    executor = _get_executor()
+    futures = {
+        key: executor.submit(_run, task, deadline_at, log)
+        for key, task in queries.items()
+    }
+
+    done, pending = wait(futures.values(), timeout=max(0, deadline_at - time.monotonic()))
+    if pending:
+        slow = sorted(key for key, future in futures.items() if future in pending)
+        raise FanoutTimeout(f"Queries still running at the page deadline: {', '.join(slow)}")
+
+    results, fallback = {}, []
+    for key, future in futures.items():
+        result = future.result()
+        if result is _NO_CONNECTION:
+            fallback.append(key)
+        else:
+            results[key] = result
+
+    if fallback:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            for key in fallback:
+                results[key] = queries[key](cursor)
+        finally:
+            cursor.close()
+    return results
@@ -0,0 +1,222 @@
+"""
+Event image variants.
+
+An uploaded event image is decoded once on a background worker and
+written out as WebP and JPEG at each of ``VARIANT_WIDTHS`` (never wider
+than the original) under ``static/uploads/events/variants/``. Their URLs
+are stored as JSON in ``events.image_variants`` (migrations/0008); until
+that is filled in, templates keep showing the original ``image_url``.
+
+Templates render them with the ``event_picture`` macro from
+``_images.html``, which emits ``<picture>`` with a WebP source and a
+JPEG ``srcset`` so the browser downloads the smallest file that fits.
+
+    python -m models.images backfill   # generate variants for existing events
+"""
+import os
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+from config import Config
+from models.assets import asset_url
+from models.db import get_db_connection
+
+VARIANT_WIDTHS = (320, 640, 1280)
+FORMATS = {
+    # format -> (extension, Pillow save options)
+    "webp": ("webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+VARIANT_DIR = os.path.join(STATIC_DIR, "uploads", "events", "variants")
+
+
+# -------------------------------
+# Variant generation
+# -------------------------------
+def _source_path(image_url):
+    """Filesystem path of a ``/static/...`` image URL, or None if it isn't one."""
+    if not image_url or not image_url.startswith("/static/"):
+        return None
+    path = os.path.normpath(os.path.join(STATIC_DIR, image_url[len("/static/"):]))
+    return path if path.startswith(STATIC_DIR + os.sep) else None
+
+
+def build_variants(source_path, out_dir=VARIANT_DIR, widths=VARIANT_WIDTHS):
+    """
+    Decode ``source_path`` once and write every width/format variant.
+    Returns the dict stored in ``events.image_variants``:
+    {"width": w, "height": h, "webp": {"320": url, ...}, "jpeg": {...}}.
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    os.makedirs(out_dir, exist_ok=True)
+
+    with Image.open(source_path) as original:
+        # Let the JPEG decoder downscale by a power of two while decoding,
+        # keeping both sides >= the largest width in case EXIF rotates it
+        original.draft("RGB", (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(original)
+        image.load()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+    width, height = image.size
+
+    targets = sorted({w for w in widths if w < width} | {min(width, max(widths))}, reverse=True)
+    variants = {"width": width, "height": height}
+    current = image
+    for target in targets:
+        # Each size is resampled from the previous (larger) one, not the original
+        if target < current.width:
+            current = current.resize(
+                (target, max(1, round(current.height * target / current.width))),
+                Image.LANCZOS
+            )
+        for fmt, (ext, options) in FORMATS.items():
+            frame = current
+            if fmt == "jpeg" and frame.mode == "RGBA":
+                frame = Image.new("RGB", frame.size, (255, 255, 255))
+                frame.paste(current, mask=current.getchannel("A"))
+            filename = f"{stem}_{target}.{ext}"
+            partial = os.path.join(out_dir, filename + ".part")
+            frame.save(partial, format=fmt.upper(), **options)
+            os.replace(partial, os.path.join(out_dir, filename))
+            relative = os.path.relpath(os.path.join(out_dir, filename), STATIC_DIR)
+            variants.setdefault(fmt, {})[str(target)] = "/static/" + relative.replace(os.sep, "/")
+    return variants
+
+
+def process_event_image(event_id, image_url):
+    """Generate variants for one event and store them; runs on a worker thread."""
+    source = _source_path(image_url)
+    if not source or not os.path.exists(source):
+        print(f"ℹ️ Event {event_id}: no local image to process ({image_url})")
+        return None
+
+    conn = None
+    cursor = None
+    try:
+        variants = build_variants(source)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        # Only if the event still shows this image; a newer upload has its own job
+        cursor.execute(
+            "UPDATE events SET image_variants = %s WHERE event_id = %s AND image_url = %s",
+            (json.dumps(variants, sort_keys=True), event_id, image_url)
+        )
+        conn.commit()
+        print(f"✅ Event {event_id}: image variants ready")
+        return variants
+    except Exception as e:
+        print(f"❌ Event {event_id}: image processing failed: {e}")
+        if conn:
+            conn.rollback()
+        return None
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+# -------------------------------
+# Worker pool
+# -------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.IMAGE_WORKERS,
+                    thread_name_prefix="image-worker"
+                )
+    return _executor
+
+
+def enqueue_event_image(event_id, image_url):
+    """Queue variant generation for an event's (new) image. Call after commit."""
+    if image_url:
+        _get_executor().submit(process_event_image, event_id, image_url)
+
+
+# -------------------------------
+# Template helpers
+# -------------------------------
+def parse_variants(raw):
+    """``events.image_variants`` (JSON text or dict) -> dict, or None."""
+    if not raw:
+        return None
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode("utf-8")
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return None
+    return raw if isinstance(raw, dict) and raw.get("jpeg") else None
+
+
+def srcset(urls_by_width):
+    """{"320": url, ...} -> "url 320w, ..." smallest first."""
+    return ", ".join(
+        f"{asset_url(url)} {width}w"
+        for width, url in sorted((urls_by_width or {}).items(), key=lambda item: int(item[0]))
+    )
+
+
+def default_src(urls_by_width, preferred=VARIANT_WIDTHS[1]):
+    """The variant closest to ``preferred`` width, for the plain ``src``."""
+    if not urls_by_width:
+        return None
+    width = min(urls_by_width, key=lambda w: abs(int(w) - preferred))
+    return asset_url(urls_by_width[width])
+
+
+def init_images(app):
+    """Register the template filters used by ``_images.html``."""
+    app.add_template_filter(parse_variants, "image_variants")
+    app.add_template_filter(srcset, "srcset")
+    app.add_template_filter(default_src, "default_src")
+
+
+# -------------------------------
+# Backfill
+# -------------------------------
+def backfill():
+    """Generate variants for every event that has an image but none yet."""
+    conn = get_db_connection()
+    if conn is None:
+        print("❌ No DB connection.")
+        return 0
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT event_id, image_url FROM events
+            WHERE image_url IS NOT NULL AND image_url <> '' AND image_variants IS NULL
+              AND deleted_at IS NULL
+            ORDER BY event_id
+        """)
+        pending = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+    done = sum(1 for event in pending
+               if process_event_image(event["event_id"], event["image_url"]))
+    print(f"ℹ️ Processed {done} of {len(pending)} event image(s)")
+    return done
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        print("usage: python -m models.images backfill")
+        sys.exit(2)
+    backfill()
@@ -0,0 +1,130 @@
+"""
+Live notification push (Server-Sent Events).
+
+Every open ``/organizer/notifications/stream`` connection subscribes to
+one process-wide ``NotificationHub``. A single poller thread, running
+only while someone is subscribed, checks the database every
+``Config.NOTIFY_STREAM_POLL_MS`` for notifications newer than the last id
+it saw (a primary-key range scan limited to the subscribed users) and
+reads their unread counters, then fans both out to the subscribers'
+queues. So a thousand open tabs cost one small query per tick, not a
+thousand.
+"""
+import queue
+import threading
+import time
+
+from config import Config
+from models.db import checkout_connection
+from models.notifications import remember_unread
+
+POLL_BATCH = 500  # notifications per query when catching up
+
+
+class NotificationHub:
+    """Subscriber registry plus the shared poller thread."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._subscribers = {}         # user_id -> set of queues
+        self._last_unread = {}         # user_id -> count last pushed
+        self._lock = threading.Lock()
+        self._thread = None
+        self._high_water = None        # newest notif_id already delivered
+
+    def subscribe(self, user_id, unread=None):
+        events = queue.Queue(maxsize=Config.NOTIFY_STREAM_QUEUE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(events)
+            if unread is not None:
+                self._last_unread[user_id] = unread
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="notification-poller", daemon=True
+                )
+                self._thread.start()
+        return events
+
+    def unsubscribe(self, user_id, events):
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(events)
+                if not queues:
+                    del self._subscribers[user_id]
+                    self._last_unread.pop(user_id, None)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(queues) for queues in self._subscribers.values())
+
+    def _publish(self, user_id, kind, data):
+        with self._lock:
+            queues = list(self._subscribers.get(user_id, ()))
+        for events in queues:
+            try:
+                events.put_nowait((kind, data))
+            except queue.Full:
+                pass  # a stalled client; its counter event will catch it up
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                user_ids = list(self._subscribers)
+                if not user_ids:
+                    self._thread = None
+                    self._high_water = None  # nobody is waiting for what happens meanwhile
+                    return
+            try:
+                self._poll(user_ids)
+            except Exception as e:
+                print(f"❌ Notification poll failed: {e}")
+
+    def _poll(self, user_ids):
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        conn = checkout_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT COALESCE(MAX(notif_id), 0) AS top FROM notifications")
+            top = cursor.fetchone()["top"]
+            if self._high_water is None:
+                self._high_water = top  # subscribers start from "now"
+            while self._high_water < top:
+                cursor.execute(f"""
+                    SELECT notif_id, user_id, event_id, message, created_at FROM notifications
+                    WHERE notif_id > %s AND notif_id <= %s AND user_id IN ({placeholders})
+                    ORDER BY notif_id LIMIT %s
+                """, [self._high_water, top] + user_ids + [POLL_BATCH])
+                rows = cursor.fetchall()
+                for row in rows:
+                    self._publish(row["user_id"], "notification", {
+                        "id": row["notif_id"],
+                        "event_id": row["event_id"],
+                        "message": row["message"],
+                        "created_at": row["created_at"].strftime("%Y-%m-%d %H:%M")
+                        if row["created_at"] else None,
+                    })
+                self._high_water = rows[-1]["notif_id"] if len(rows) == POLL_BATCH else top
+
+            cursor.execute(
+                f"SELECT user_id, unread_notifications FROM users WHERE user_id IN ({placeholders})",
+                user_ids
+            )
+            counts = cursor.fetchall()
+            conn.commit()  # end the snapshot so the next tick sees new rows
+        finally:
+            cursor.close()
+            conn.close()
+
+        for row in counts:
+            user_id, unread = row["user_id"], int(row["unread_notifications"])
+            remember_unread(user_id, unread)
+            with self._lock:
+                changed = self._last_unread.get(user_id) != unread
+                self._last_unread[user_id] = unread
+            if changed:
+                self._publish(user_id, "unread", {"count": unread})
+
+
+hub = NotificationHub(interval=Config.NOTIFY_STREAM_POLL_MS / 1000.0)
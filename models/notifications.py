@@ -0,0 +1,409 @@
+"""
+Notification writes.
+
+``notify`` either inserts the row in the caller's own transaction (pass
+its cursor; the caller commits) or, without a cursor, hands it to an
+in-process write-behind outbox. A single background flusher drains the
+outbox with one ``executemany`` per batch: as soon as
+``Config.NOTIFY_BATCH_SIZE`` messages are waiting, or
+``Config.NOTIFY_FLUSH_INTERVAL_MS`` after the first one arrived. So a
+request that sends a notification never opens a connection or waits for
+a commit of its own.
+
+The outbox is drained at interpreter exit; ``outbox_stats()`` reports the
+queue depth and flush counters (served at /admin/system/outbox).
+
+Every write path also keeps ``users.unread_notifications`` (migrations/0011)
+in step in the same transaction, so the navbar badge reads one cached
+number instead of counting; ``unread_count`` serves it from a small
+in-process cache. Drift is checked and repaired with:
+
+    python -m models.notifications reconcile [--fix]
+"""
+import sys
+import time
+import atexit
+import threading
+from collections import Counter, deque
+from datetime import datetime
+
+from config import Config
+from models.db import get_db_connection, checkout_connection
+from models.user import BULK_CHUNK_SIZE
+
+_INSERT = """
+    INSERT INTO notifications (user_id, event_id, message, is_read, created_at)
+    VALUES (%s, %s, %s, FALSE, %s)
+"""
+
+
+class NotificationOutbox:
+    """Bounded in-memory queue of notification rows plus its flusher thread."""
+
+    def __init__(self, batch_size, interval, max_queue):
+        self.batch_size = batch_size
+        self.interval = interval          # seconds to wait for a batch to fill
+        self.max_queue = max_queue
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._writing = 0
+        # Counters for outbox_stats()
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failures = 0
+        self.last_flush_ms = None
+        self.last_error = None
+
+    def put(self, row):
+        with self._cond:
+            if len(self._items) >= self.max_queue:
+                self._items.popleft()  # oldest first; the DB must be down for a while
+                self.dropped += 1
+            self._items.append(row)
+            self.enqueued += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=self._run, name="notification-flusher", daemon=True
+                )
+                self._thread.start()
+            # First item starts the flusher's linger timer; a full batch cuts it short
+            if len(self._items) == 1 or len(self._items) >= self.batch_size:
+                self._cond.notify_all()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._items and not self._stopping:
+                self._cond.wait()
+            if not self._items:
+                return None
+            # Linger briefly so a burst goes out as one statement
+            deadline = time.monotonic() + self.interval
+            while len(self._items) < self.batch_size and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [self._items.popleft() for _ in range(min(self.batch_size, len(self._items)))]
+            self._writing = len(batch)
+            return batch
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        conn = checkout_connection()
+        cursor = conn.cursor()
+        per_user = Counter(row[0] for row in batch)
+        try:
+            cursor.executemany(_INSERT, batch)
+            bump_unread_many(cursor, per_user)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+        forget_unread(per_user)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    def _run(self):
+        backoff = 0.1
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+                with self._cond:
+                    self.flushed += len(batch)
+                    self.batches += 1
+                    self._writing = 0
+                    self._cond.notify_all()
+                backoff = 0.1
+            except Exception as e:
+                with self._cond:
+                    self.failures += 1
+                    self.last_error = str(e)
+                    self._writing = 0
+                    if self._stopping:
+                        self.dropped += len(batch)
+                        print(f"❌ Dropped {len(batch)} notification(s) at shutdown: {e}")
+                        self._cond.notify_all()
+                        continue
+                    # Put the batch back in front, in order, and retry after a pause
+                    self._items.extendleft(reversed(batch))
+                print(f"❌ Notification flush failed, retrying in {backoff:.1f}s: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 5.0)
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far is written; False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._items:
+                self._cond.notify_all()
+            while self._items or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=5.0):
+        """Drain the queue (one attempt per batch) and stop the flusher."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        if self._items:
+            print(f"❌ {len(self._items)} notification(s) not written at shutdown")
+
+    def stats(self):
+        with self._cond:
+            return {
+                "depth": len(self._items) + self._writing,
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "failures": self.failures,
+                "last_flush_ms": round(self.last_flush_ms, 1) if self.last_flush_ms is not None else None,
+                "last_error": self.last_error,
+            }
+
+
+_outbox = NotificationOutbox(
+    batch_size=Config.NOTIFY_BATCH_SIZE,
+    interval=Config.NOTIFY_FLUSH_INTERVAL_MS / 1000.0,
+    max_queue=Config.NOTIFY_MAX_QUEUE,
+)
+atexit.register(_outbox.close)
+
+
+# -------------------------------
+# Unread counters
+# -------------------------------
+_unread_cache = {}
+_unread_cache_lock = threading.Lock()
+
+
+def bump_unread(cursor, user_id, delta=1):
+    """Adjust one user's unread counter on the caller's cursor."""
+    cursor.execute("""
+        UPDATE users SET unread_notifications = GREATEST(unread_notifications + %s, 0)
+        WHERE user_id = %s
+    """, (delta, user_id))
+
+
+def bump_unread_many(cursor, deltas):
+    """bump_unread for a {user_id: delta} mapping in one executemany."""
+    rows = [(delta, user_id) for user_id, delta in deltas.items() if delta]
+    if rows:
+        cursor.executemany("""
+            UPDATE users SET unread_notifications = GREATEST(unread_notifications + %s, 0)
+            WHERE user_id = %s
+        """, rows)
+
+
+def remember_unread(user_id, count):
+    with _unread_cache_lock:
+        _unread_cache[user_id] = (count, time.monotonic() + Config.NOTIFY_UNREAD_CACHE_TTL)
+
+
+def forget_unread(user_ids):
+    """Drop cached counts; call after committing a change to them."""
+    with _unread_cache_lock:
+        for user_id in user_ids:
+            _unread_cache.pop(user_id, None)
+
+
+def unread_count(user_id):
+    """The user's unread notification count, cached for NOTIFY_UNREAD_CACHE_TTL seconds."""
+    with _unread_cache_lock:
+        hit = _unread_cache.get(user_id)
+        if hit and hit[1] > time.monotonic():
+            return hit[0]
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT unread_notifications FROM users WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    count = int(row[0]) if row else 0
+    remember_unread(user_id, count)
+    return count
+
+
+# -------------------------------
+# Read / clear
+# -------------------------------
+def mark_read(cursor, user_id, notif_ids):
+    """Mark some of the user's notifications read; the caller commits. Returns how many changed."""
+    notif_ids = [int(i) for i in notif_ids]
+    if not notif_ids:
+        return 0
+    placeholders = ", ".join(["%s"] * len(notif_ids))
+    cursor.execute(f"""
+        UPDATE notifications SET is_read = TRUE
+        WHERE user_id = %s AND is_read = FALSE AND notif_id IN ({placeholders})
+    """, [user_id] + notif_ids)
+    changed = cursor.rowcount
+    if changed:
+        bump_unread(cursor, user_id, -changed)
+    return changed
+
+
+def mark_all_read(conn, cursor, user_id, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Mark every unread notification of the user read, ``chunk_size`` rows
+    per committed statement so a large backlog never holds its locks for
+    long. Returns the number of rows changed.
+    """
+    total = 0
+    while True:
+        cursor.execute("""
+            UPDATE notifications SET is_read = TRUE
+            WHERE user_id = %s AND is_read = FALSE
+            LIMIT %s
+        """, (user_id, chunk_size))
+        changed = cursor.rowcount
+        if changed:
+            bump_unread(cursor, user_id, -changed)
+        conn.commit()
+        total += changed
+        if changed < chunk_size:
+            break
+    forget_unread([user_id])
+    return total
+
+
+def clear_all(conn, cursor, user_id, chunk_size=BULK_CHUNK_SIZE):
+    """Delete all of the user's notifications in committed chunks; returns rows deleted."""
+    total = 0
+    while True:
+        # Lock the chunk first so the unread ones are counted exactly once
+        cursor.execute("""
+            SELECT notif_id, is_read FROM notifications
+            WHERE user_id = %s ORDER BY notif_id LIMIT %s FOR UPDATE
+        """, (user_id, chunk_size))
+        rows = cursor.fetchall()
+        if not rows:
+            conn.commit()
+            break
+        ids = [row["notif_id"] if isinstance(row, dict) else row[0] for row in rows]
+        unread = sum(1 for row in rows if not (row["is_read"] if isinstance(row, dict) else row[1]))
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"DELETE FROM notifications WHERE notif_id IN ({placeholders})", ids)
+        if unread:
+            bump_unread(cursor, user_id, -unread)
+        conn.commit()
+        total += len(ids)
+        if len(ids) < chunk_size:
+            break
+    forget_unread([user_id])
+    return total
+
+
+def forget_event_notifications(cursor, event_id):
+    """Take an event's unread notifications out of the counters before they are deleted."""
+    cursor.execute("""
+        SELECT user_id, COUNT(*) AS n FROM notifications
+        WHERE event_id = %s AND is_read = FALSE GROUP BY user_id
+    """, (event_id,))
+    rows = cursor.fetchall()
+    deltas = {}
+    for row in rows:
+        user_id, n = (row["user_id"], row["n"]) if isinstance(row, dict) else row
+        deltas[user_id] = -int(n)
+    bump_unread_many(cursor, deltas)
+
+
+# -------------------------------
+# Public API
+# -------------------------------
+def notify(user_id, message, event_id=None, cursor=None):
+    """
+    Send ``message`` to ``user_id``. With ``cursor`` the row is written in
+    that transaction (commits or rolls back with the caller's change);
+    without one it is queued for the background flusher.
+    """
+    if cursor is not None:
+        cursor.execute(_INSERT, (user_id, event_id, message, datetime.now()))
+        bump_unread(cursor, user_id)
+    else:
+        _outbox.put((user_id, event_id, message, datetime.now()))
+
+
+def flush_notifications(timeout=5.0):
+    return _outbox.flush(timeout)
+
+
+def outbox_stats():
+    return _outbox.stats()
+
+
+# -------------------------------
+# Reconcile unread counters
+# -------------------------------
+_UNREAD_DRIFT_SQL = """
+    SELECT u.user_id, u.unread_notifications AS cached, COALESCE(n.unread, 0) AS actual
+    FROM users u
+    LEFT JOIN (
+        SELECT user_id, COUNT(*) AS unread FROM notifications
+        WHERE is_read = FALSE GROUP BY user_id
+    ) n ON n.user_id = u.user_id
+    WHERE u.unread_notifications <> COALESCE(n.unread, 0)
+"""
+
+
+def reconcile_unread(fix=False):
+    """
+    Compare every user's unread counter with the notifications table.
+    Returns {user_id: (cached, actual)} and, with ``fix``, corrects them.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise RuntimeError("No DB connection.")
+    cursor = conn.cursor()
+    try:
+        cursor.execute(_UNREAD_DRIFT_SQL + (" FOR UPDATE" if fix else ""))
+        drift = {user_id: (int(cached), int(actual)) for user_id, cached, actual in cursor.fetchall()}
+        if fix and drift:
+            cursor.executemany(
+                "UPDATE users SET unread_notifications = %s WHERE user_id = %s",
+                [(actual, user_id) for user_id, (_, actual) in drift.items()]
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    forget_unread(drift)
+    return drift
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["reconcile"] or sys.argv[2:] not in ([], ["--fix"]):
+        print("usage: python -m models.notifications reconcile [--fix]")
+        sys.exit(2)
+    fix = sys.argv[2:] == ["--fix"]
+    drift = reconcile_unread(fix=fix)
+    for user_id, (old, new) in sorted(drift.items()):
+        print(f"  user {user_id}: {old} -> {new}")
+    if fix:
+        print(f"✅ Unread counters reconciled ({len(drift)} users repaired)")
+    elif drift:
+        print(f"❌ {len(drift)} users have drifted unread counters; run with --fix to repair")
+        sys.exit(1)
+    else:
+        print("✅ Unread counters match")
@@ -0,0 +1,128 @@
+"""
+Batch processing of organizer requests.
+
+Approving or rejecting many requests resolves the organizer role once
+and touches ``users``, ``organizer_requests`` and ``notifications``
+with set-based statements, chunked by ``BULK_CHUNK_SIZE`` ids, all on
+the caller's cursor so the whole batch commits or rolls back together.
+"""
+from models.stats import bump
+from models.user import BULK_CHUNK_SIZE, chunked
+
+DECISIONS = {
+    "approve": ("approved", "🎉 Your organizer request has been approved. You can now create events."),
+    "reject": ("rejected", "Your organizer request was not approved. Please contact an admin for details."),
+}
+
+
+def pending_request_ids(cursor):
+    """Ids of every request still waiting for a decision, oldest first."""
+    cursor.execute("""
+        SELECT request_id FROM organizer_requests
+        WHERE status IS NULL OR status = 'pending'
+        ORDER BY request_date, request_id
+    """)
+    return [row["request_id"] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+
+
+def process_organizer_requests(cursor, request_ids, decision, admin_id=None,
+                               chunk_size=BULK_CHUNK_SIZE):
+    """
+    Approve or reject every pending request in ``request_ids``.
+
+    Returns (results, user_ids): results maps each requested id to
+    'approved' / 'rejected', 'already_processed' or 'not_found';
+    user_ids are the applicants whose requests were decided.
+    Raises ValueError for an unknown decision or a missing organizer role.
+    """
+    if decision not in DECISIONS:
+        raise ValueError(f"Unknown decision '{decision}'.")
+    new_status, message = DECISIONS[decision]
+
+    role_id = None
+    if decision == "approve":
+        cursor.execute("SELECT role_id FROM roles WHERE role_name = 'organizer'")
+        row = cursor.fetchone()
+        if not row:
+            raise ValueError("Organizer role not found in roles table.")
+        role_id = row["role_id"] if isinstance(row, dict) else row[0]
+
+    request_ids = list(dict.fromkeys(int(request_id) for request_id in request_ids))
+    results = {request_id: "not_found" for request_id in request_ids}
+    decided_users = []
+
+    for chunk in chunked(request_ids, chunk_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+
+        # Lock the rows so a concurrent single approve/reject can't double-process them
+        cursor.execute(f"""
+            SELECT request_id, user_id, status FROM organizer_requests
+            WHERE request_id IN ({placeholders})
+            FOR UPDATE
+        """, chunk)
+        pending, user_ids = [], []
+        for row in cursor.fetchall():
+            request_id, user_id, status = (
+                (row["request_id"], row["user_id"], row["status"]) if isinstance(row, dict) else row
+            )
+            if status in (None, "pending"):
+                pending.append(request_id)
+                user_ids.append(user_id)
+            else:
+                results[request_id] = "already_processed"
+        if not pending:
+            continue
+
+        pending_marks = ", ".join(["%s"] * len(pending))
+        user_ids = list(dict.fromkeys(user_ids))
+        user_marks = ", ".join(["%s"] * len(user_ids))
+
+        if role_id is not None:
+            # Role counters: count users by their current role before switching it
+            cursor.execute(f"""
+                SELECT r.role_name, COUNT(*) AS n
+                FROM users u LEFT JOIN roles r ON u.role_id = r.role_id
+                WHERE u.user_id IN ({user_marks}) AND (u.role_id IS NULL OR u.role_id <> %s)
+                GROUP BY r.role_name
+            """, user_ids + [role_id])
+            moves = [
+                (row["role_name"], row["n"]) if isinstance(row, dict) else row
+                for row in cursor.fetchall()
+            ]
+            cursor.execute(
+                f"UPDATE users SET role_id = %s WHERE user_id IN ({user_marks})",
+                [role_id] + user_ids
+            )
+            for old_role, n in moves:
+                if old_role:
+                    bump(cursor, f"users.role.{old_role}", -n)
+                bump(cursor, "users.role.organizer", n)
+
+        cursor.execute(f"""
+            UPDATE organizer_requests
+            SET status = %s, processed_date = NOW(), processed_by = %s
+            WHERE request_id IN ({pending_marks})
+        """, [new_status, admin_id] + pending)
+
+        cursor.execute(f"""
+            INSERT INTO notifications (user_id, message, is_read, created_at)
+            SELECT user_id, %s, FALSE, NOW()
+            FROM organizer_requests
+            WHERE request_id IN ({pending_marks})
+        """, [message] + pending)
+        # One notification per request, so a user with several gets several
+        cursor.execute(f"""
+            UPDATE users u
+            JOIN (
+                SELECT user_id, COUNT(*) AS n FROM organizer_requests
+                WHERE request_id IN ({pending_marks})
+                GROUP BY user_id
+            ) added ON added.user_id = u.user_id
+            SET u.unread_notifications = u.unread_notifications + added.n
+        """, pending)
+
+        for request_id in pending:
+            results[request_id] = new_status
+        decided_users.extend(user_ids)
+
+    return results, decided_users
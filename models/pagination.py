@@ -0,0 +1,279 @@
+"""
+Keyset (seek) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort key of the row a
+page starts after, the page number it leads to, the direction and the
+total row count once known, so the next query can seek straight to it
+through an index instead of scanning past OFFSET rows, and never has to
+count again.
+
+Typical use from a route (the DB cursor must be ``dictionary=True``):
+
+    page = paginate(
+        cursor,
+        "SELECT u.*, r.role_name FROM users u JOIN roles r ON u.role_id = r.role_id",
+        order_by=[("u.created_at", "created_at"), ("u.user_id", "user_id")],
+        where=["r.role_name = %s"], params=[role],
+        page=request.args.get("page", 1, type=int),
+        cursor_token=request.args.get("cursor"),
+        per_page=5, descending=True,
+    )
+
+and in the template ``render_pagination(endpoint, page)`` from
+``_pagination.html``.
+"""
+import re
+import json
+import time
+import base64
+import binascii
+import threading
+from math import ceil
+
+
+def encode_cursor(values):
+    """Serialize a dict of sort-key values into an opaque cursor token."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, key_length=None):
+    """
+    Return the dict stored in ``token``, or None if it is missing or
+    malformed. With ``key_length``, also None unless it is a seek cursor as
+    ``paginate`` writes them: that many scalar ``key`` values, an int
+    ``page`` and an int (or absent) ``total``, so an edited or stale token
+    falls back to plain page numbers instead of failing the query.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, dict):
+        return None
+    if key_length is not None:
+        key = values.get("key")
+        if not (isinstance(key, list) and len(key) == key_length
+                and all(isinstance(v, (str, int, float)) for v in key)):
+            return None
+        for name, required in (("page", True), ("total", False)):
+            value = values.get(name)
+            if value is None and not required:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool) or value < (1 if required else 0):
+                return None
+    return values
+
+
+# -------------------------------
+# Page result
+# -------------------------------
+class Page:
+    """
+    One page of results. ``total`` may be None when the caller asked for
+    no count; templates then only get Previous/Next links.
+    """
+
+    def __init__(self, items, page, per_page, total=None, has_next=None,
+                 next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self._has_next = has_next
+
+    @property
+    def total_count(self):
+        return self.total or 0
+
+    @property
+    def pages(self):
+        if self.total is None:
+            return None
+        return int(ceil(self.total / float(self.per_page)))
+
+    @property
+    def total_pages(self):
+        return self.pages
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        if self._has_next is not None:
+            return self._has_next
+        return self.pages is not None and self.page < self.pages
+
+    @property
+    def offset(self):
+        return (self.page - 1) * self.per_page
+
+    def iter_pages(self, left_edge=2, left_current=2, right_current=5, right_edge=2):
+        if self.pages is None:
+            return
+        last = 0
+        for num in range(1, self.pages + 1):
+            if num <= left_edge or \
+               (num > self.page - left_current - 1 and num < self.page + right_current) or \
+               num > self.pages - right_edge:
+                if last + 1 != num:
+                    yield None
+                yield num
+                last = num
+
+
+def paginate_list(items, page, per_page):
+    """Page over an already-materialized (small) list."""
+    page = max(1, page)
+    start = (page - 1) * per_page
+    return Page(items[start:start + per_page], page, per_page, total=len(items))
+
+
+# -------------------------------
+# Cached totals
+# -------------------------------
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+COUNT_CACHE_TTL = 30  # seconds
+
+
+def cached_count(cursor, sql, params, ttl=COUNT_CACHE_TTL):
+    """Run ``SELECT COUNT(*) FROM (sql)`` at most once per ``ttl`` seconds per query."""
+    key = (sql, tuple(params))
+    now = time.monotonic()
+    with _count_cache_lock:
+        hit = _count_cache.get(key)
+        if hit and hit[1] > now:
+            return hit[0]
+    cursor.execute(f"SELECT COUNT(*) AS total FROM ({sql}) AS sub", list(params))
+    total = cursor.fetchone()["total"]
+    with _count_cache_lock:
+        _count_cache[key] = (total, now + ttl)
+    return total
+
+
+# -------------------------------
+# Query pagination
+# -------------------------------
+_SELECT_RE = re.compile(r"^\s*SELECT\s", re.IGNORECASE)
+
+
+def _seek_condition(order_by, key, op):
+    """
+    Lexicographic "row after key" predicate, expanded into OR/AND form so
+    MySQL can use a range scan on the leading index column:
+    (a > x) OR (a = x AND b > y) ...
+    """
+    clauses, params = [], []
+    for i, (column, _) in enumerate(order_by):
+        parts = [f"{order_by[j][0]} = %s" for j in range(i)] + [f"{column} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(key[:i] + [key[i]])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def paginate(cursor, select, order_by, where=None, params=None, *, page=1,
+             per_page=10, cursor_token=None, descending=False, group_by=None,
+             total="window", seekable=True):
+    """
+    Fetch one page of ``select`` and return a Page.
+
+    select    -- "SELECT ... FROM ... [JOIN ...]" with no WHERE/ORDER BY and
+                 no bare leading ``*`` (qualify it, e.g. ``e.*``).
+    order_by  -- [(sql_expression, row_key), ...]; the last entry must be
+                 unique (usually the primary key) and none may be NULL.
+    where     -- list of SQL conditions ANDed together.
+    params    -- placeholder values for ``select`` and ``where``, in order.
+    total     -- "window": COUNT(*) OVER() in the same round-trip,
+                 "exact":  separate COUNT(*) query,
+                 "cached": separate COUNT(*) cached for COUNT_CACHE_TTL,
+                 int:      a total the caller already knows (e.g. from stats),
+                 None:     don't count; only Previous/Next are offered.
+    seekable  -- False when ordering by an aggregate; pages then always use
+                 LIMIT/OFFSET (still with a single-round-trip total).
+
+    A cursor token always wins over ``page``; numbered page links carry
+    no cursor and fall back to OFFSET.
+    """
+    where = list(where or [])
+    params = list(params or [])
+    seek = decode_cursor(cursor_token, len(order_by)) if seekable else None
+    known_total = total if isinstance(total, int) else None
+
+    if seek:
+        page = int(seek.get("page", page))
+        if seek.get("total") is not None:
+            known_total = int(seek["total"])
+    page = max(1, int(page or 1))
+
+    base_where = list(where)
+    base_params = list(params)
+    backwards = bool(seek) and seek.get("dir") == "prev"
+    if seek:
+        op = "<" if descending != backwards else ">"
+        condition, seek_params = _seek_condition(order_by, list(seek["key"]), op)
+        where.append(condition)
+        params.extend(seek_params)
+        offset = 0
+    else:
+        offset = (page - 1) * per_page
+
+    use_window = total == "window" and known_total is None and not seek
+    sql = _SELECT_RE.sub("SELECT COUNT(*) OVER() AS _total_rows, ", select, count=1) \
+        if use_window else select
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if group_by:
+        sql += f" GROUP BY {group_by}"
+    direction = "DESC" if descending != backwards else "ASC"
+    sql += " ORDER BY " + ", ".join(f"{column} {direction}" for column, _ in order_by)
+    sql += " LIMIT %s OFFSET %s"
+
+    # One extra row tells us whether another page exists without counting
+    cursor.execute(sql, params + [per_page + 1, offset])
+    rows = cursor.fetchall()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    if use_window:
+        known_total = rows[0]["_total_rows"] if rows else (0 if page == 1 else None)
+        for row in rows:
+            row.pop("_total_rows", None)
+    if known_total is None and total in ("exact", "cached", "window"):
+        # Window total is unavailable past the end; fall back to a count
+        count_sql = select
+        if base_where:
+            count_sql += " WHERE " + " AND ".join(base_where)
+        if group_by:
+            count_sql += f" GROUP BY {group_by}"
+        if total == "exact":
+            cursor.execute(f"SELECT COUNT(*) AS total FROM ({count_sql}) AS sub", base_params)
+            known_total = cursor.fetchone()["total"]
+        else:
+            known_total = cached_count(cursor, count_sql, base_params)
+
+    has_next = True if backwards else has_more
+    next_cursor = prev_cursor = None
+    if seekable and rows:
+        if has_next:
+            next_cursor = encode_cursor({
+                "key": [rows[-1][k] for _, k in order_by],
+                "page": page + 1, "dir": "next", "total": known_total,
+            })
+        if page > 1:
+            prev_cursor = encode_cursor({
+                "key": [rows[0][k] for _, k in order_by],
+                "page": page - 1, "dir": "prev", "total": known_total,
+            })
+
+    return Page(rows, page, per_page, total=known_total, has_next=has_next,
+                next_cursor=next_cursor, prev_cursor=prev_cursor)
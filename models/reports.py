@@ -0,0 +1,343 @@
+"""
+Background report jobs.
+
+Heavy exports run on a small in-process worker pool instead of the
+request thread. Each request for a report becomes a row in
+``report_jobs`` (see migrations/0004); a worker streams the query into a
+CSV under ``Config.REPORT_ARTIFACT_DIR`` and records progress as it goes,
+so the admin UI can poll the job and download the file once it is done.
+
+Asking again for the same report with the same parameters within
+``Config.REPORT_CACHE_TTL`` seconds returns the existing job (queued,
+running or finished) instead of computing it a second time.
+"""
+import os
+import csv
+import json
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from config import Config
+from models.db import get_db_connection, checkout_connection
+
+
+class ReportError(Exception):
+    pass
+
+
+# -------------------------------
+# Report definitions
+# -------------------------------
+# select    -- SELECT ... FROM ... [JOIN ...] without WHERE
+# where     -- optional condition always applied
+# filters   -- {param: SQL condition}; only these params are accepted
+# group_by / order_by -- appended after the WHERE clause
+REPORTS = {
+    "users": {
+        "title": "Users",
+        "header": ["User ID", "Name", "Email", "Role", "Status", "Created At"],
+        "select": """
+            SELECT u.user_id, u.name, u.email, COALESCE(r.role_name, 'pending'),
+                   u.status, u.created_at
+            FROM users u
+            LEFT JOIN roles r ON u.role_id = r.role_id
+        """,
+        "filters": {
+            "role": "r.role_name = %s",
+            "from": "u.created_at >= %s",
+            "to": "u.created_at < %s + INTERVAL 1 DAY",
+        },
+        "order_by": "u.created_at DESC, u.user_id DESC",
+    },
+    "events": {
+        "title": "Events with registrations",
+        "header": ["Event ID", "Title", "Date", "Status", "Organizer",
+                   "Registrations", "Tickets"],
+        "select": """
+            SELECT e.event_id, e.title, e.event_date, e.status,
+                   COALESCE(u.name, 'Unknown'),
+                   COUNT(r.reg_id), COALESCE(SUM(r.ticket_count), 0)
+            FROM events e
+            LEFT JOIN users u ON e.organizer_id = u.user_id
+            LEFT JOIN registrations r
+                   ON r.event_id = e.event_id
+                  AND r.status IN ('registered', 'attended')
+        """,
+        "where": "e.deleted_at IS NULL",
+        "filters": {
+            "status": "e.status = %s",
+            "from": "e.event_date >= %s",
+            "to": "e.event_date <= %s",
+        },
+        "group_by": "e.event_id",
+        "order_by": "e.event_date DESC, e.event_id DESC",
+    },
+    "volunteer_hours": {
+        "title": "Volunteer hours",
+        "header": ["Volunteer ID", "Name", "Email", "Tasks", "Completed Tasks", "Hours"],
+        "select": """
+            SELECT u.user_id, u.name, u.email,
+                   COUNT(t.task_id),
+                   SUM(t.status = 'completed'),
+                   COALESCE(SUM(t.hours_contributed), 0)
+            FROM volunteer_tasks t
+            JOIN users u ON t.volunteer_id = u.user_id
+        """,
+        "filters": {
+            "from": "t.created_at >= %s",
+            "to": "t.created_at < %s + INTERVAL 1 DAY",
+        },
+        "group_by": "u.user_id",
+        "order_by": "COALESCE(SUM(t.hours_contributed), 0) DESC, u.user_id",
+    },
+}
+
+_DATE_PARAMS = {"from", "to"}
+
+
+def normalize_params(kind, params):
+    """
+    Keep only the filters ``kind`` understands, drop blanks and validate
+    dates, so equivalent requests hash the same. Raises ReportError.
+    """
+    if kind not in REPORTS:
+        raise ReportError(f"Unknown report '{kind}'.")
+    clean = {}
+    for name in REPORTS[kind]["filters"]:
+        value = (params.get(name) or "").strip()
+        if not value or value == "all":
+            continue
+        if name in _DATE_PARAMS:
+            try:
+                value = date.fromisoformat(value).isoformat()
+            except ValueError:
+                raise ReportError(f"Invalid date for '{name}': {value}")
+        clean[name] = value
+    return clean
+
+
+def _params_hash(kind, params):
+    raw = json.dumps([kind, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _build_query(kind, params):
+    report = REPORTS[kind]
+    sql = report["select"]
+    conditions = [report["where"]] if report.get("where") else []
+    conditions += [report["filters"][name] for name in params]
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if report.get("group_by"):
+        sql += " GROUP BY " + report["group_by"]
+    return sql, list(params.values())
+
+
+# -------------------------------
+# Worker pool
+# -------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.REPORT_WORKERS,
+                    thread_name_prefix="report-worker"
+                )
+    return _executor
+
+
+def _submit(job_id):
+    _get_executor().submit(_run_job, job_id)
+
+
+def _artifact_path(job_id, kind, params_hash):
+    return os.path.join(Config.REPORT_ARTIFACT_DIR, f"{kind}_{params_hash[:12]}_{job_id}.csv")
+
+
+def _run_job(job_id):
+    """Claim a queued job and write its CSV; runs on a worker thread."""
+    # Progress updates go through their own connection: the data
+    # connection is busy streaming an unbuffered result set.
+    conn = checkout_connection()
+    cursor = conn.cursor(dictionary=True)
+    data_conn, data_cursor, partial = None, None, None
+    try:
+        cursor.execute("""
+            UPDATE report_jobs SET status = 'running', started_at = NOW(), progress = 0
+            WHERE job_id = %s AND status = 'queued'
+        """, (job_id,))
+        conn.commit()
+        if cursor.rowcount != 1:
+            return  # another worker claimed it, or it was never queued
+
+        cursor.execute("SELECT kind, params, params_hash FROM report_jobs WHERE job_id = %s", (job_id,))
+        job = cursor.fetchone()
+        kind, params = job["kind"], json.loads(job["params"])
+        sql, args = _build_query(kind, params)
+
+        cursor.execute(f"SELECT COUNT(*) AS total FROM ({sql}) AS sub", args)
+        total = cursor.fetchone()["total"]
+
+        path = _artifact_path(job_id, kind, job["params_hash"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        data_conn = checkout_connection()
+        data_cursor = data_conn.cursor(buffered=False)
+        data_cursor.execute(sql + " ORDER BY " + REPORTS[kind]["order_by"], args)
+
+        written = 0
+        # A temp file of this run's own, so nothing else can write into it
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(REPORTS[kind]["header"])
+            while True:
+                rows = data_cursor.fetchmany(Config.REPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                written += len(rows)
+                cursor.execute(
+                    "UPDATE report_jobs SET progress = %s, rows_written = %s WHERE job_id = %s",
+                    (min(99, written * 100 // total) if total else 99, written, job_id)
+                )
+                conn.commit()
+        os.replace(partial, path)
+        partial = None
+
+        cursor.execute("""
+            UPDATE report_jobs
+            SET status = 'done', progress = 100, rows_written = %s,
+                artifact_path = %s, finished_at = NOW()
+            WHERE job_id = %s
+        """, (written, path, job_id))
+        conn.commit()
+        print(f"✅ Report job {job_id} ({kind}) finished: {written} rows")
+    except Exception as e:
+        print(f"❌ Report job {job_id} failed: {e}")
+        try:
+            conn.rollback()
+            cursor.execute("""
+                UPDATE report_jobs SET status = 'failed', error = %s, finished_at = NOW()
+                WHERE job_id = %s
+            """, (str(e)[:1000], job_id))
+            conn.commit()
+        except Exception:
+            pass
+    finally:
+        if partial and os.path.exists(partial):
+            os.remove(partial)
+        if data_cursor:
+            data_cursor.close()
+        if data_conn:
+            data_conn.close()
+        cursor.close()
+        conn.close()
+
+
+# -------------------------------
+# Public API
+# -------------------------------
+def enqueue(kind, params, requested_by=None):
+    """
+    Queue ``kind`` with ``params`` and return (job_id, reused). A matching
+    job that is still pending, or finished within REPORT_CACHE_TTL with
+    its file on disk, is returned instead of queueing a new one.
+    """
+    params = normalize_params(kind, params)
+    params_hash = _params_hash(kind, params)
+
+    conn = get_db_connection()
+    if conn is None:
+        raise ReportError("No DB connection.")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT job_id, status, artifact_path
+            FROM report_jobs
+            WHERE kind = %s AND params_hash = %s
+              AND (status IN ('queued', 'running')
+                   OR (status = 'done' AND finished_at >= NOW() - INTERVAL %s SECOND))
+            ORDER BY job_id DESC
+            LIMIT 1
+        """, (kind, params_hash, Config.REPORT_CACHE_TTL))
+        existing = cursor.fetchone()
+        if existing and (existing["status"] != "done"
+                         or os.path.exists(existing["artifact_path"] or "")):
+            return existing["job_id"], True
+
+        cursor.execute("""
+            INSERT INTO report_jobs (kind, params, params_hash, requested_by)
+            VALUES (%s, %s, %s, %s)
+        """, (kind, json.dumps(params, sort_keys=True), params_hash, requested_by))
+        job_id = cursor.lastrowid
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    _submit(job_id)
+    return job_id, False
+
+
+def get_job(cursor, job_id):
+    """Return the job row as a dict (params decoded), or None."""
+    cursor.execute("""
+        SELECT job_id, kind, params, status, progress, rows_written,
+               artifact_path, error, created_at, started_at, finished_at
+        FROM report_jobs WHERE job_id = %s
+    """, (job_id,))
+    job = cursor.fetchone()
+    if job:
+        job["params"] = json.loads(job["params"])
+        job["title"] = REPORTS.get(job["kind"], {}).get("title", job["kind"])
+    return job
+
+
+def recent_jobs(cursor, limit=10):
+    cursor.execute("""
+        SELECT job_id, kind, params, status, progress, rows_written, error,
+               created_at, finished_at
+        FROM report_jobs
+        ORDER BY job_id DESC
+        LIMIT %s
+    """, (limit,))
+    jobs = cursor.fetchall()
+    for job in jobs:
+        job["params"] = json.loads(job["params"])
+        job["title"] = REPORTS.get(job["kind"], {}).get("title", job["kind"])
+    return jobs
+
+
+def recover_jobs():
+    """
+    Re-queue jobs left 'running' by a previous process and hand every
+    queued job to the workers. Call once at startup.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise ReportError("No DB connection.")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE report_jobs SET status = 'queued' WHERE status = 'running'")
+        cursor.execute("SELECT job_id FROM report_jobs WHERE status = 'queued' ORDER BY job_id")
+        pending = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    for job_id in pending:
+        _submit(job_id)
+    if pending:
+        print(f"ℹ️ Resumed {len(pending)} report job(s)")
+    return pending
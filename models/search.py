@@ -0,0 +1,288 @@
+"""
+Full-text search over organizer requests and events.
+
+``organizer_requests.search_text`` holds the applicant's name, email and
+organization and carries an n-gram FULLTEXT index (migrations/0006).
+Because the index stores every 2-character slice of the text, a BOOLEAN
+MODE phrase ("term") matches wherever the term appears as a substring,
+so that is what selects rows; natural language mode only ranks them
+(on its own it ORs the bigrams, so "music" would match anything that
+contains "mu" or "ic").
+
+When no request contains every term, a typo is likely: the natural
+language MATCH then only proposes candidates, and a request is kept if
+each term is close to one of its words (difflib ratio of at least
+``FUZZY_MIN_RATIO``), so "jazz nigth" still finds "Jazz Night Ltd".
+
+Write paths that change any of those fields call
+``refresh_organizer_request_search`` in their own transaction.
+
+Events are searched through n-gram FULLTEXT indexes on their own columns
+(migrations/0013), which InnoDB keeps current on every write, so there
+is nothing to refresh. ``search_events`` serves both the organizer's and
+the participant's event lists: ranked matches, filters and facet counts.
+"""
+import re
+import difflib
+import threading
+import time
+from datetime import date
+
+from models.pagination import paginate
+
+# Top matches kept per search; pages and counts are cut from this list
+SEARCH_LIMIT = 500
+
+# Shorter than the server's ngram_token_size (2): nothing to MATCH on
+_MIN_FULLTEXT_LENGTH = 2
+
+# How alike a misspelt term and a word must be for the fuzzy fallback
+FUZZY_MIN_RATIO = 0.75
+
+
+def _boolean_terms(query):
+    """
+    'jazz night' -> '+"jazz" +"night"' for a BOOLEAN MODE MATCH: every term
+    must occur. Terms too short for the index are dropped; '' if none is left.
+    """
+    terms = (term.replace('"', "") for term in query.split())
+    return " ".join(f'+"{term}"' for term in terms if len(term) >= _MIN_FULLTEXT_LENGTH)
+
+
+def refresh_organizer_request_search(cursor, user_id):
+    """Recompute search_text for every request made by ``user_id``."""
+    cursor.execute("""
+        UPDATE organizer_requests r
+        JOIN users u ON r.user_id = u.user_id
+        SET r.search_text = CONCAT_WS(' ', u.name, u.email, r.organization)
+        WHERE r.user_id = %s
+    """, (user_id,))
+
+
+def _close_to(term, words):
+    """True if ``term`` occurs in, or is a near-miss of, one of ``words``."""
+    return any(term in word or difflib.SequenceMatcher(None, term, word).ratio() >= FUZZY_MIN_RATIO
+               for word in words)
+
+
+def search_organizer_requests(cursor, query, limit=SEARCH_LIMIT):
+    """
+    Return [{'request_id', 'status', 'score'}, ...] for requests matching
+    ``query``, best match first: requests containing every term, or if
+    there are none, near misses of them. ``status`` is 'pending' for
+    requests that have none yet. The DB cursor must be ``dictionary=True``.
+    """
+    query = " ".join(query.split())
+    if not query:
+        return []
+
+    terms = _boolean_terms(query)
+    if not terms:
+        cursor.execute("""
+            SELECT request_id, COALESCE(status, 'pending') AS status, 0 AS score
+            FROM organizer_requests
+            WHERE search_text LIKE %s
+            ORDER BY request_id DESC
+            LIMIT %s
+        """, (f"%{query}%", limit))
+        return cursor.fetchall()
+
+    cursor.execute("""
+        SELECT request_id, COALESCE(status, 'pending') AS status,
+               MATCH(search_text) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score
+        FROM organizer_requests
+        WHERE MATCH(search_text) AGAINST (%s IN BOOLEAN MODE)
+        ORDER BY score DESC, request_id DESC
+        LIMIT %s
+    """, (query, terms, limit))
+    hits = cursor.fetchall()
+    if hits:
+        return hits
+
+    # Fuzzy fallback: the bigram OR of natural language mode proposes, the terms decide
+    cursor.execute("""
+        SELECT request_id, COALESCE(status, 'pending') AS status, search_text,
+               MATCH(search_text) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score
+        FROM organizer_requests
+        WHERE MATCH(search_text) AGAINST (%s IN NATURAL LANGUAGE MODE)
+        ORDER BY score DESC, request_id DESC
+        LIMIT %s
+    """, (query, query, limit))
+    wanted = [term.lower() for term in query.split() if len(term) >= _MIN_FULLTEXT_LENGTH]
+    for row in cursor.fetchall():
+        words = re.findall(r"\w+", (row.pop("search_text") or "").lower())
+        if all(_close_to(term, words) for term in wanted):
+            hits.append(row)
+    return hits
+
+
+# -------------------------------
+# Events
+# -------------------------------
+_EVENT_COLUMNS = """
+    e.event_id, e.organizer_id, e.title, e.description, e.location, e.category,
+    e.event_date, e.event_time, e.status, e.total_tickets, e.image_url,
+    e.registered_count AS participant_count
+"""
+
+# A hit in the title counts this much more than one elsewhere
+TITLE_WEIGHT = 2
+
+# Selects: every term as a phrase. Ranks: natural language relevance
+_EVENT_MATCH = "MATCH(e.title, e.description, e.location, e.category) AGAINST (%s IN BOOLEAN MODE)"
+_EVENT_SCORE = ("(MATCH(e.title, e.description, e.location, e.category) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+                f" + {TITLE_WEIGHT} * MATCH(e.title) AGAINST (%s IN NATURAL LANGUAGE MODE))")
+
+# {param: SQL condition}; each facet ignores its own filter
+_EVENT_FILTERS = {
+    "category": "e.category = %s",
+    "organizer": "e.organizer_id = %s",
+    "from": "e.event_date >= %s",
+    "to": "e.event_date <= %s",
+}
+_EVENT_WHEN = {
+    "upcoming": "e.event_date >= CURDATE()",
+    "past": "e.event_date < CURDATE()",
+}
+
+# facet -> (SELECT value, label, count ... FROM, extra condition, GROUP BY)
+_EVENT_FACETS = {
+    "category": (
+        "SELECT e.category AS value, e.category AS label, COUNT(*) AS count FROM events e",
+        "e.category IS NOT NULL AND e.category <> ''",
+        "e.category",
+    ),
+    "organizer": (
+        "SELECT e.organizer_id AS value, u.name AS label, COUNT(*) AS count "
+        "FROM events e JOIN users u ON u.user_id = e.organizer_id",
+        None,
+        "e.organizer_id, u.name",
+    ),
+}
+FACET_LIMIT = 50
+FACET_CACHE_TTL = 30  # seconds the shared (all-organizer) counts are reused
+
+_facet_cache = {}
+_facet_cache_lock = threading.Lock()
+
+
+class EventSearch:
+    """What ``search_events`` found: ``page`` (a Page of events), ``facets`` and ``params``."""
+
+    def __init__(self, page, facets, params):
+        self.page = page
+        self.facets = facets
+        self.params = params
+
+    @property
+    def ranked(self):
+        """True when the page is ordered by relevance rather than by date."""
+        return bool(_boolean_terms(self.params.get("q", "")))
+
+
+def event_search_params(args):
+    """
+    The search form's fields (q, category, organizer, from, to, when) from
+    ``args`` (e.g. request.args), with blanks, "all" and invalid values
+    dropped, ready for ``search_events`` and for pagination links.
+    """
+    params = {}
+    query = " ".join((args.get("q") or "").split())
+    if query:
+        params["q"] = query
+    category = (args.get("category") or "").strip()
+    if category and category != "all":
+        params["category"] = category
+    organizer = (args.get("organizer") or "").strip()
+    if organizer.isdigit():
+        params["organizer"] = int(organizer)
+    for name in ("from", "to"):
+        try:
+            params[name] = date.fromisoformat((args.get(name) or "").strip()).isoformat()
+        except ValueError:
+            pass
+    when = args.get("when")
+    if when in _EVENT_WHEN:
+        params["when"] = when
+    return params
+
+
+def _event_conditions(params, organizer_id, skip=None):
+    """WHERE conditions and their values for ``params``, leaving out the ``skip`` filter."""
+    where, values = ["e.deleted_at IS NULL"], []
+    if organizer_id is not None:
+        where.append("e.organizer_id = %s")
+        values.append(organizer_id)
+    query = params.get("q")
+    terms = _boolean_terms(query or "")
+    if terms:
+        where.append(_EVENT_MATCH)
+        values.append(terms)
+    elif query:
+        where.append("(e.title LIKE %s OR e.location LIKE %s OR e.category LIKE %s)")
+        values.extend([f"%{query}%"] * 3)
+    for name, condition in _EVENT_FILTERS.items():
+        if name != skip and name in params:
+            where.append(condition)
+            values.append(params[name])
+    if "when" in params:
+        where.append(_EVENT_WHEN[params["when"]])
+    return where, values
+
+
+def _facet(cursor, name, params, organizer_id):
+    select, extra, group_by = _EVENT_FACETS[name]
+    where, values = _event_conditions(params, organizer_id, skip=name)
+    if extra:
+        where.append(extra)
+    sql = (f"{select} WHERE {' AND '.join(where)} GROUP BY {group_by} "
+           f"ORDER BY count DESC, label LIMIT {FACET_LIMIT}")
+    if organizer_id is not None:
+        # An organizer's own list is small, and must show their edits at once
+        cursor.execute(sql, values)
+        return cursor.fetchall()
+    key = (sql, tuple(values))
+    now = time.monotonic()
+    with _facet_cache_lock:
+        hit = _facet_cache.get(key)
+        if hit and hit[1] > now:
+            return hit[0]
+    cursor.execute(sql, values)
+    counts = cursor.fetchall()
+    with _facet_cache_lock:
+        _facet_cache[key] = (counts, now + FACET_CACHE_TTL)
+    return counts
+
+
+def search_events(cursor, params, *, organizer_id=None, facets=("category",),
+                  page=1, per_page=20, cursor_token=None, newest_first=False):
+    """
+    Search live (not deleted) events and return an EventSearch.
+
+    params       -- from ``event_search_params``.
+    organizer_id -- only this organizer's events (the organizer's own list).
+    facets       -- names from ("category", "organizer") to count; each is
+                    [{'value', 'label', 'count'}, ...] for the matching events
+                    under every filter except its own, biggest first.
+
+    With a query the page is ranked by relevance (title hits first, then
+    newest); without one it is ordered by date and keyset-paginated. The
+    DB cursor must be ``dictionary=True``.
+    """
+    where, values = _event_conditions(params, organizer_id)
+    if _boolean_terms(params.get("q", "")):
+        result = paginate(
+            cursor, f"SELECT {_EVENT_COLUMNS}, {_EVENT_SCORE} AS score FROM events e",
+            order_by=[("score", "score"), ("e.event_date", "event_date"), ("e.event_id", "event_id")],
+            where=where, params=[params["q"], params["q"]] + values,
+            page=page, per_page=per_page, descending=True, seekable=False,
+        )
+    else:
+        result = paginate(
+            cursor, f"SELECT {_EVENT_COLUMNS} FROM events e",
+            order_by=[("e.event_date", "event_date"), ("e.event_id", "event_id")],
+            where=where, params=values,
+            page=page, per_page=per_page, cursor_token=cursor_token, descending=newest_first,
+        )
+    counts = {name: _facet(cursor, name, params, organizer_id) for name in facets}
+    return EventSearch(result, counts, params)
@@ -0,0 +1,464 @@
+"""
+Materialized platform statistics.
+
+Aggregates the admin dashboard used to recompute on every view are kept
+pre-computed in two summary tables (see migrations/0003):
+
+    stat_counters   name -> value            e.g. users.role.volunteer
+    stat_buckets    (metric, period, bucket) e.g. registrations / month / 2025-09-01
+
+and the per-event participant ranking behind the admin "Top Events" panel
+is kept in ``event_leaderboard`` (see migrations/0005). Each event row also
+caches its own ``registered_count``, ``tickets_sold`` and ``volunteer_count``
+(migrations/0007) so listings read plain columns.
+
+Write paths call the ``record_*`` helpers with their own cursor so the
+counters change in the same transaction as the rows they describe.
+``python -m models.stats rebuild`` recomputes everything from the base
+tables for backfill and drift repair; ``python -m models.stats reconcile``
+checks the per-event columns and ``reconcile --fix`` repairs them.
+"""
+import sys
+from datetime import date, datetime
+
+from models.db import get_db_connection
+from models.pagination import paginate
+
+
+# -------------------------------
+# Low-level counter updates
+# -------------------------------
+def _as_date(value):
+    if value is None:
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def bump(cursor, name, delta=1):
+    """Add ``delta`` to a named counter, creating it if needed."""
+    cursor.execute("""
+        INSERT INTO stat_counters (name, value) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+    """, (name, delta))
+
+
+def bump_bucket(cursor, metric, day=None, delta=1, monthly=True):
+    """Add ``delta`` to the daily (and by default monthly) bucket for ``day``."""
+    day = _as_date(day)
+    rows = [(metric, "day", day, delta)]
+    if monthly:
+        rows.append((metric, "month", day.replace(day=1), delta))
+    cursor.executemany("""
+        INSERT INTO stat_buckets (metric, period, bucket, value) VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+    """, rows)
+
+
+# -------------------------------
+# Event leaderboard
+# -------------------------------
+# Registrations in these states count towards an event's participants
+LEADERBOARD_STATUSES = ("registered", "attended")
+
+
+def bump_leaderboard(cursor, event_id, delta=1):
+    cursor.execute("""
+        INSERT INTO event_leaderboard (event_id, participants) VALUES (%s, GREATEST(%s, 0))
+        ON DUPLICATE KEY UPDATE participants = GREATEST(participants + %s, 0)
+    """, (event_id, delta, delta))
+
+
+def leaderboard_page(cursor, page=1, per_page=10, cursor_token=None):
+    """
+    One page of events ranked by participants (ties by newest event),
+    read straight off the rank index. Adds ``completion_rate``: participants
+    as a percentage of ``volunteer_required``.
+    """
+    result = paginate(
+        cursor,
+        """
+        SELECT lb.event_id, lb.participants, e.title, e.volunteer_required
+        FROM event_leaderboard lb
+        JOIN events e ON e.event_id = lb.event_id AND e.deleted_at IS NULL
+        """,
+        order_by=[("lb.participants", "participants"), ("lb.event_id", "event_id")],
+        page=page, per_page=per_page, cursor_token=cursor_token,
+        descending=True, total=get_counter(cursor, "events.total")
+    )
+    for row in result.items:
+        required = row["volunteer_required"] or 0
+        row["completion_rate"] = round(row["participants"] / required * 100) if required > 0 else 0
+    return result
+
+
+# -------------------------------
+# Per-event counter caches
+# -------------------------------
+def bump_event_registrations(cursor, event_id, delta=1, tickets=1):
+    cursor.execute("""
+        UPDATE events
+        SET registered_count = GREATEST(registered_count + %s, 0),
+            tickets_sold = GREATEST(tickets_sold + %s, 0)
+        WHERE event_id = %s
+    """, (delta, delta * tickets, event_id))
+
+
+def bump_event_volunteers(cursor, event_id, delta=1):
+    cursor.execute("""
+        UPDATE events SET volunteer_count = GREATEST(volunteer_count + %s, 0)
+        WHERE event_id = %s
+    """, (delta, event_id))
+
+
+# -------------------------------
+# Write-path hooks
+# -------------------------------
+def record_user_created(cursor, role_name, created_at=None):
+    bump(cursor, "users.total")
+    if role_name:
+        bump(cursor, f"users.role.{role_name}")
+    bump_bucket(cursor, "users", created_at)
+
+
+def record_user_role_changed(cursor, old_role, new_role):
+    if old_role == new_role:
+        return
+    if old_role:
+        bump(cursor, f"users.role.{old_role}", -1)
+    if new_role:
+        bump(cursor, f"users.role.{new_role}")
+
+
+def record_event_created(cursor, event_date, status="upcoming", delta=1, event_id=None):
+    bump(cursor, "events.total", delta)
+    if event_id is not None and delta > 0:
+        cursor.execute(
+            "INSERT IGNORE INTO event_leaderboard (event_id, participants) VALUES (%s, 0)",
+            (event_id,)
+        )
+    bump(cursor, f"events.status.{status}", delta)
+    bump_bucket(cursor, f"events.by_date.{status}", event_date, delta, monthly=False)
+
+
+def record_event_deleted(cursor, event_date, status="upcoming"):
+    record_event_created(cursor, event_date, status, delta=-1)
+
+
+def record_event_changed(cursor, old_date, old_status, new_date, new_status):
+    if _as_date(old_date) == _as_date(new_date) and old_status == new_status:
+        return
+    record_event_deleted(cursor, old_date, old_status)
+    record_event_created(cursor, new_date, new_status)
+
+
+def record_registration(cursor, status="registered", registered_at=None, delta=1,
+                        event_id=None, tickets=1):
+    bump(cursor, "registrations.total", delta)
+    bump(cursor, f"registrations.status.{status}", delta)
+    bump_bucket(cursor, "registrations", registered_at, delta)
+    if event_id is not None:
+        bump_event_registrations(cursor, event_id, delta, tickets)
+        if status in LEADERBOARD_STATUSES:
+            bump_leaderboard(cursor, event_id, delta)
+
+
+def record_registrations_removed_for_event(cursor, event_id):
+    """Take an event's registrations out of the counters before they are deleted."""
+    cursor.execute("""
+        SELECT status, DATE(registered_at) AS day, COUNT(*) AS n
+        FROM registrations
+        WHERE event_id = %s
+        GROUP BY status, DATE(registered_at)
+    """, (event_id,))
+    for row in cursor.fetchall():
+        status, day, n = (row["status"], row["day"], row["n"]) if isinstance(row, dict) else row
+        record_registration(cursor, status, day, delta=-n)
+
+
+def record_task(cursor, status="assigned", delta=1, event_id=None):
+    bump(cursor, "tasks.total", delta)
+    bump(cursor, f"tasks.status.{status}", delta)
+    if event_id:
+        bump_event_volunteers(cursor, event_id, delta)
+
+
+def record_task_moved(cursor, old_event_id, new_event_id):
+    if str(old_event_id or "") == str(new_event_id or ""):
+        return
+    if old_event_id:
+        bump_event_volunteers(cursor, old_event_id, -1)
+    if new_event_id:
+        bump_event_volunteers(cursor, new_event_id)
+
+
+def record_task_status_changed(cursor, old_status, new_status):
+    if old_status == new_status:
+        return
+    bump(cursor, f"tasks.status.{old_status}", -1)
+    bump(cursor, f"tasks.status.{new_status}")
+
+
+def record_tasks_removed_for_event(cursor, event_id):
+    """Take an event's volunteer tasks out of the counters before they are deleted."""
+    cursor.execute("""
+        SELECT status, COUNT(*) AS n FROM volunteer_tasks
+        WHERE event_id = %s GROUP BY status
+    """, (event_id,))
+    for row in cursor.fetchall():
+        status, n = (row["status"], row["n"]) if isinstance(row, dict) else row
+        record_task(cursor, status, delta=-n)
+
+
+# -------------------------------
+# Reads
+# -------------------------------
+def get_counters(cursor, prefix):
+    """Return {suffix: value} for every counter named ``prefix.<suffix>``."""
+    cursor.execute(
+        "SELECT name, value FROM stat_counters WHERE name LIKE %s",
+        (prefix + ".%",)
+    )
+    rows = cursor.fetchall()
+    return {
+        (row["name"] if isinstance(row, dict) else row[0])[len(prefix) + 1:]:
+        int(row["value"] if isinstance(row, dict) else row[1])
+        for row in rows
+    }
+
+
+def get_counter(cursor, name):
+    cursor.execute("SELECT value FROM stat_counters WHERE name = %s", (name,))
+    row = cursor.fetchone()
+    if not row:
+        return 0
+    return int(row["value"] if isinstance(row, dict) else row[0])
+
+
+def monthly_series(cursor, metric):
+    """Return [{'month': 'YYYY-MM', 'count': n}, ...] for a bucketed metric."""
+    cursor.execute("""
+        SELECT DATE_FORMAT(bucket, '%Y-%m') AS month, value AS count
+        FROM stat_buckets
+        WHERE metric = %s AND period = 'month' AND value <> 0
+        ORDER BY bucket
+    """, (metric,))
+    return cursor.fetchall()
+
+
+def upcoming_event_count(cursor):
+    """Number of events dated today or later, from the future date buckets."""
+    cursor.execute("""
+        SELECT COALESCE(SUM(value), 0) AS count
+        FROM stat_buckets
+        WHERE metric LIKE 'events.by\\_date.%' AND period = 'day' AND bucket >= CURDATE()
+    """)
+    row = cursor.fetchone()
+    return int(row["count"] if isinstance(row, dict) else row[0])
+
+
+def event_status_distribution(cursor):
+    """
+    Events by display status: anything dated before today counts as
+    'completed', otherwise the stored status. Only future date buckets
+    are read; the past is derived from the running total.
+    """
+    total = get_counter(cursor, "events.total")
+    cursor.execute("""
+        SELECT SUBSTRING(metric, 16) AS status, SUM(value) AS count
+        FROM stat_buckets
+        WHERE metric LIKE 'events.by\\_date.%' AND period = 'day' AND bucket >= CURDATE()
+        GROUP BY metric
+    """)
+    distribution = {}
+    for row in cursor.fetchall():
+        count = int(row["count"] if isinstance(row, dict) else row[1])
+        status = row["status"] if isinstance(row, dict) else row[0]
+        if count:
+            distribution[status] = distribution.get(status, 0) + count
+    completed = total - sum(distribution.values()) + distribution.pop("completed", 0)
+    if completed:
+        distribution["completed"] = completed
+    return distribution
+
+
+# -------------------------------
+# Rebuild (backfill / drift repair)
+# -------------------------------
+_REBUILD_STATEMENTS = [
+    "DELETE FROM stat_counters",
+    "DELETE FROM stat_buckets",
+    """INSERT INTO stat_counters (name, value)
+       SELECT 'users.total', COUNT(*) FROM users""",
+    """INSERT INTO stat_counters (name, value)
+       SELECT CONCAT('users.role.', r.role_name), COUNT(*)
+       FROM users u JOIN roles r ON u.role_id = r.role_id
+       GROUP BY r.role_name""",
+    """INSERT INTO stat_counters (name, value)
+       SELECT 'events.total', COUNT(*) FROM events WHERE deleted_at IS NULL""",
+    """INSERT INTO stat_counters (name, value)
+       SELECT CONCAT('events.status.', status), COUNT(*) FROM events
+       WHERE deleted_at IS NULL GROUP BY status""",
+    """INSERT INTO stat_counters (name, value)
+       SELECT 'registrations.total', COUNT(*) FROM registrations""",
+    """INSERT INTO stat_counters (name, value)
+       SELECT CONCAT('registrations.status.', status), COUNT(*) FROM registrations GROUP BY status""",
+    """INSERT INTO stat_counters (name, value)
+       SELECT 'tasks.total', COUNT(*) FROM volunteer_tasks""",
+    """INSERT INTO stat_counters (name, value)
+       SELECT CONCAT('tasks.status.', status), COUNT(*) FROM volunteer_tasks GROUP BY status""",
+    """INSERT INTO stat_buckets (metric, period, bucket, value)
+       SELECT 'users', 'day', DATE(created_at), COUNT(*) FROM users GROUP BY DATE(created_at)""",
+    """INSERT INTO stat_buckets (metric, period, bucket, value)
+       SELECT 'users', 'month', DATE_FORMAT(created_at, '%Y-%m-01'), COUNT(*)
+       FROM users GROUP BY DATE_FORMAT(created_at, '%Y-%m-01')""",
+    """INSERT INTO stat_buckets (metric, period, bucket, value)
+       SELECT 'registrations', 'day', DATE(registered_at), COUNT(*)
+       FROM registrations GROUP BY DATE(registered_at)""",
+    """INSERT INTO stat_buckets (metric, period, bucket, value)
+       SELECT 'registrations', 'month', DATE_FORMAT(registered_at, '%Y-%m-01'), COUNT(*)
+       FROM registrations GROUP BY DATE_FORMAT(registered_at, '%Y-%m-01')""",
+    """INSERT INTO stat_buckets (metric, period, bucket, value)
+       SELECT CONCAT('events.by_date.', status), 'day', event_date, COUNT(*)
+       FROM events WHERE deleted_at IS NULL GROUP BY status, event_date""",
+    "DELETE FROM event_leaderboard",
+    """INSERT INTO event_leaderboard (event_id, participants)
+       SELECT e.event_id, COUNT(r.reg_id)
+       FROM events e
+       LEFT JOIN registrations r
+              ON r.event_id = e.event_id
+             AND r.status IN ('registered', 'attended')
+       WHERE e.deleted_at IS NULL
+       GROUP BY e.event_id""",
+]
+
+
+def rebuild():
+    """
+    Recompute every counter and bucket from the base tables in one
+    transaction. Returns {counter: (old, new)} for counters that drifted.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise RuntimeError("No DB connection.")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT name, value FROM stat_counters")
+        before = {name: int(value) for name, value in cursor.fetchall()}
+
+        for statement in _REBUILD_STATEMENTS:
+            cursor.execute(statement)
+
+        cursor.execute("SELECT name, value FROM stat_counters")
+        after = {name: int(value) for name, value in cursor.fetchall()}
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    return {
+        name: (before.get(name, 0), after.get(name, 0))
+        for name in set(before) | set(after)
+        if before.get(name, 0) != after.get(name, 0)
+    }
+
+
+# -------------------------------
+# Reconcile per-event counter caches
+# -------------------------------
+_EVENT_COUNTS_SQL = """
+    SELECT e.event_id,
+           e.registered_count, COALESCE(reg.n, 0) AS actual_registered,
+           e.tickets_sold, COALESCE(reg.tickets, 0) AS actual_tickets,
+           e.volunteer_count, COALESCE(vt.n, 0) AS actual_volunteers
+    FROM events e
+    LEFT JOIN (
+        SELECT event_id, COUNT(*) AS n, SUM(ticket_count) AS tickets
+        FROM registrations GROUP BY event_id
+    ) reg ON reg.event_id = e.event_id
+    LEFT JOIN (
+        SELECT event_id, COUNT(*) AS n FROM volunteer_tasks GROUP BY event_id
+    ) vt ON vt.event_id = e.event_id
+"""
+
+_EVENT_COUNTS_DRIFT = """
+    WHERE e.registered_count <> COALESCE(reg.n, 0)
+       OR e.tickets_sold <> COALESCE(reg.tickets, 0)
+       OR e.volunteer_count <> COALESCE(vt.n, 0)
+"""
+
+
+def reconcile(fix=False):
+    """
+    Compare every event's cached counts with the base tables. Returns
+    {event_id: {column: (cached, actual)}} for drifted events and, with
+    ``fix``, overwrites the cached values in one transaction.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise RuntimeError("No DB connection.")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(_EVENT_COUNTS_SQL + _EVENT_COUNTS_DRIFT + (" FOR UPDATE" if fix else ""))
+        rows = cursor.fetchall()
+        drift = {
+            row["event_id"]: {
+                column: (int(row[column]), int(row[actual]))
+                for column, actual in (("registered_count", "actual_registered"),
+                                       ("tickets_sold", "actual_tickets"),
+                                       ("volunteer_count", "actual_volunteers"))
+                if int(row[column]) != int(row[actual])
+            }
+            for row in rows
+        }
+
+        if fix and rows:
+            cursor.executemany("""
+                UPDATE events
+                SET registered_count = %s, tickets_sold = %s, volunteer_count = %s
+                WHERE event_id = %s
+            """, [
+                (row["actual_registered"], row["actual_tickets"], row["actual_volunteers"], row["event_id"])
+                for row in rows
+            ])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return drift
+
+
+_USAGE = "usage: python -m models.stats rebuild | reconcile [--fix]"
+
+if __name__ == "__main__":
+    command = sys.argv[1:2]
+    if command == ["rebuild"] and len(sys.argv) == 2:
+        drift = rebuild()
+        for name, (old, new) in sorted(drift.items()):
+            print(f"  {name}: {old} -> {new}")
+        print(f"✅ Stats rebuilt ({len(drift)} counters corrected)")
+    elif command == ["reconcile"] and sys.argv[2:] in ([], ["--fix"]):
+        fix = sys.argv[2:] == ["--fix"]
+        drift = reconcile(fix=fix)
+        for event_id, columns in sorted(drift.items()):
+            changes = ", ".join(f"{c}: {old} -> {new}" for c, (old, new) in columns.items())
+            print(f"  event {event_id}: {changes}")
+        if fix:
+            print(f"✅ Event counters reconciled ({len(drift)} events repaired)")
+        elif drift:
+            print(f"❌ {len(drift)} events have drifted counters; run with --fix to repair")
+            sys.exit(1)
+        else:
+            print("✅ Event counters are consistent")
+    else:
+        print(_USAGE)
+        sys.exit(1)
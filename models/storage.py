@@ -0,0 +1,333 @@
+"""
+Content-addressed upload storage.
+
+Every uploaded file is stored once, under the SHA-256 of its bytes:
+``static/uploads/blobs/ab/abcdef....jpg``. Uploading the same picture
+twice yields the same path, so nothing is duplicated and nothing is
+overwritten. ``upload_blobs`` (migrations/0009) keeps a reference count
+per blob; write paths call ``acquire`` when a row starts pointing at a
+blob and ``release`` when it stops, in the same transaction.
+
+Files are only ever deleted by the garbage collector, which re-derives
+the references from the tables in ``REFERENCES`` (so a missed hook can
+never delete a file in use), repairs the counts, and removes unreferenced
+files older than ``Config.UPLOAD_GC_GRACE`` seconds:
+
+    python -m models.storage gc [--delete]   # dry run unless --delete
+    python -m models.storage adopt           # move legacy uploads into the blob store
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+
+from config import Config
+from models.db import get_db_connection
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+UPLOADS_DIR = os.path.join(STATIC_DIR, "uploads")
+BLOB_DIR = os.path.join(UPLOADS_DIR, "blobs")
+IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+_CHUNK = 64 * 1024
+
+# (table, column, primary key) holding upload paths, relative to static/ or as /static/ URLs
+REFERENCES = [
+    ("events", "image_url", "event_id"),
+    ("users", "profile_picture", "user_id"),
+    ("organizer_requests", "photo_path", "request_id"),
+]
+
+
+class StorageError(Exception):
+    pass
+
+
+def normalize(path):
+    """'/static/uploads/x.jpg' or 'uploads/x.jpg' -> 'uploads/x.jpg'; None for anything else."""
+    if not path or "://" in path:
+        return None
+    path = path.lstrip("/")
+    if path.startswith("static/"):
+        path = path[len("static/"):]
+    return path if path.startswith("uploads/") and ".." not in path.split("/") else None
+
+
+def _extension(filename):
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in (filename or "") else ""
+    return "jpg" if ext == "jpeg" else ext
+
+
+# -------------------------------
+# Storing
+# -------------------------------
+def store_file(stream, filename, allowed_extensions=IMAGE_EXTENSIONS):
+    """
+    Copy ``stream`` into the blob store and return its path relative to
+    static/ (e.g. ``uploads/blobs/ab/ab12....jpg``). An identical file
+    already stored is reused. Raises StorageError for a disallowed type
+    or a file that cannot be written.
+    """
+    ext = _extension(filename)
+    if ext not in {_extension("x." + e) for e in allowed_extensions}:
+        raise StorageError(f"File type '.{ext}' is not allowed.")
+
+    try:
+        os.makedirs(BLOB_DIR, exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=BLOB_DIR, suffix=".part")
+    except OSError as e:
+        raise StorageError(f"Could not store the upload: {e}") from e
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(_CHUNK)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+        sha = digest.hexdigest()
+        relative = f"uploads/blobs/{sha[:2]}/{sha}.{ext}"
+        target = os.path.join(STATIC_DIR, relative)
+        if os.path.exists(target):
+            os.remove(partial)
+            os.utime(target)  # fresh again, so a pending GC grace period restarts
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(partial, target)
+        return relative
+    except BaseException as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        if isinstance(e, OSError):
+            raise StorageError(f"Could not store the upload: {e}") from e
+        raise
+
+
+def store_upload(file_storage, allowed_extensions=IMAGE_EXTENSIONS):
+    """store_file for a werkzeug FileStorage from request.files."""
+    return store_file(file_storage.stream, file_storage.filename, allowed_extensions)
+
+
+# -------------------------------
+# Reference counting
+# -------------------------------
+def _is_blob(path):
+    return path is not None and path.startswith("uploads/blobs/")
+
+
+def acquire(cursor, path):
+    """Count one more reference to ``path`` (a no-op for non-blob paths)."""
+    path = normalize(path)
+    if not _is_blob(path):
+        return
+    full = os.path.join(STATIC_DIR, path)
+    size = os.path.getsize(full) if os.path.exists(full) else 0
+    cursor.execute("""
+        INSERT INTO upload_blobs (sha256, path, size_bytes, ref_count)
+        VALUES (%s, %s, %s, 1)
+        ON DUPLICATE KEY UPDATE ref_count = ref_count + 1
+    """, (os.path.splitext(os.path.basename(path))[0], path, size))
+
+
+def release(cursor, path):
+    """Drop one reference to ``path``; the file stays until the next GC."""
+    path = normalize(path)
+    if not _is_blob(path):
+        return
+    cursor.execute(
+        "UPDATE upload_blobs SET ref_count = GREATEST(ref_count - 1, 0) WHERE path = %s",
+        (path,)
+    )
+
+
+def replace(cursor, old_path, new_path):
+    """acquire(new) + release(old), skipping both when nothing changed."""
+    if normalize(old_path) == normalize(new_path):
+        return
+    acquire(cursor, new_path)
+    release(cursor, old_path)
+
+
+def reclaim(cursor, path, derived=()):
+    """
+    After ``release``: if nothing references the blob at ``path`` any more,
+    forget it and return the files to remove once the caller has committed
+    (the blob plus ``derived`` files such as its image variants). Blobs
+    still in use, or younger than UPLOAD_GC_GRACE (an upload of the same
+    bytes may be in flight), are left to the GC and [] is returned.
+    """
+    path = normalize(path)
+    if not _is_blob(path):
+        return []
+    cursor.execute("SELECT ref_count FROM upload_blobs WHERE path = %s FOR UPDATE", (path,))
+    row = cursor.fetchone()
+    count = (row["ref_count"] if isinstance(row, dict) else row[0]) if row else 0
+    full = os.path.join(STATIC_DIR, path)
+    if count > 0 or (os.path.exists(full) and os.path.getmtime(full) > time.time() - Config.UPLOAD_GC_GRACE):
+        return []
+    cursor.execute("DELETE FROM upload_blobs WHERE path = %s", (path,))
+    files = [full]
+    for extra in derived:
+        extra = normalize(extra)
+        if extra:
+            files.append(os.path.join(STATIC_DIR, extra))
+    return files
+
+
+def remove_files(files):
+    """Delete the files ``reclaim`` returned; missing ones are ignored."""
+    removed = 0
+    for full in files:
+        try:
+            os.remove(full)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+# -------------------------------
+# Garbage collection
+# -------------------------------
+def _referenced_paths(cursor):
+    """Count references per normalized path across REFERENCES and image variants."""
+    counts = {}
+    for table, column, _ in REFERENCES:
+        cursor.execute(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL AND {column} <> ''")
+        for (value,) in cursor.fetchall():
+            path = normalize(value)
+            if path:
+                counts[path] = counts.get(path, 0) + 1
+    cursor.execute("SELECT image_variants FROM events WHERE image_variants IS NOT NULL")
+    for (raw,) in cursor.fetchall():
+        try:
+            variants = json.loads(raw)
+        except (TypeError, ValueError):
+            continue
+        for fmt in ("webp", "jpeg"):
+            for url in (variants.get(fmt) or {}).values():
+                path = normalize(url)
+                if path:
+                    counts[path] = counts.get(path, 0) + 1
+    return counts
+
+
+def _expire_rejected_photos(cursor):
+    """Forget applicant photos of requests rejected more than the retention period ago."""
+    cursor.execute("""
+        UPDATE organizer_requests SET photo_path = NULL
+        WHERE status = 'rejected' AND photo_path IS NOT NULL
+          AND processed_date < NOW() - INTERVAL %s DAY
+    """, (Config.UPLOAD_REJECTED_RETENTION_DAYS,))
+    return cursor.rowcount
+
+
+def collect_garbage(delete=False):
+    """
+    Find upload files nothing refers to and, with ``delete``, remove them.
+    Also resets upload_blobs.ref_count to the real reference counts.
+    Returns (files, bytes) found (or removed).
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise StorageError("No DB connection.")
+    cursor = conn.cursor()
+    try:
+        if delete:
+            expired = _expire_rejected_photos(cursor)
+            if expired:
+                print(f"ℹ️ Released {expired} photo(s) of rejected organizer requests")
+        referenced = _referenced_paths(cursor)
+
+        # Repair drifted counts: the tables are the source of truth
+        cursor.execute("SELECT path, ref_count FROM upload_blobs")
+        drifted = [(referenced.get(path, 0), path) for path, count in cursor.fetchall()
+                   if referenced.get(path, 0) != count]
+        if drifted:
+            cursor.executemany("UPDATE upload_blobs SET ref_count = %s WHERE path = %s", drifted)
+            print(f"ℹ️ Corrected {len(drifted)} blob reference count(s)")
+
+        cutoff = time.time() - Config.UPLOAD_GC_GRACE
+        garbage = []
+        for root, _, files in os.walk(UPLOADS_DIR):
+            for name in files:
+                full = os.path.join(root, name)
+                path = os.path.relpath(full, STATIC_DIR).replace(os.sep, "/")
+                if path in referenced or os.path.getmtime(full) > cutoff:
+                    continue  # in use, or young enough to belong to an upload in flight
+                garbage.append((path, full, os.path.getsize(full)))
+
+        total = sum(size for _, _, size in garbage)
+        for path, full, size in garbage:
+            print(f"{'🗑️ ' if delete else ''}{path} ({size} bytes)")
+            if delete:
+                os.remove(full)
+        if delete and garbage:
+            blob_paths = [(path,) for path, _, _ in garbage if _is_blob(path)]
+            if blob_paths:
+                cursor.executemany("DELETE FROM upload_blobs WHERE path = %s", blob_paths)
+        conn.commit()
+        verb = "Removed" if delete else "Would remove"
+        print(f"✅ {verb} {len(garbage)} unreferenced file(s), {total} bytes")
+        return len(garbage), total
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def adopt_legacy_uploads():
+    """
+    Move files referenced by REFERENCES that are not in the blob store yet
+    into it (deduplicating identical copies) and point the rows at the blobs.
+    The old files are left for ``gc`` to remove; existing image variants
+    keep working since they are separate files.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise StorageError("No DB connection.")
+    cursor = conn.cursor()
+    moved = 0
+    try:
+        for table, column, key in REFERENCES:
+            cursor.execute(f"""
+                SELECT {key}, {column} FROM {table}
+                WHERE {column} IS NOT NULL AND {column} <> '' AND {column} NOT LIKE %s
+            """, ("%uploads/blobs/%",))
+            for row_id, value in cursor.fetchall():
+                path = normalize(value)
+                full = os.path.join(STATIC_DIR, path) if path else None
+                if not full or not os.path.exists(full):
+                    continue
+                with open(full, "rb") as f:
+                    blob = store_file(f, full, allowed_extensions={_extension(full)})
+                # Keep each column's existing style: absolute /static/ URL or static-relative
+                new_value = "/static/" + blob if value.startswith("/") else blob
+                cursor.execute(f"UPDATE {table} SET {column} = %s WHERE {key} = %s",
+                               (new_value, row_id))
+                acquire(cursor, blob)
+                moved += 1
+        conn.commit()
+        print(f"✅ Moved {moved} upload reference(s) into the blob store")
+        return moved
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["gc"]:
+        collect_garbage(delete="--delete" in args)
+    elif args[:1] == ["adopt"]:
+        adopt_legacy_uploads()
+    else:
+        print("usage: python -m models.storage gc [--delete] | adopt")
+        sys.exit(2)
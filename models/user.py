@@ -1,5 +1,9 @@
 from werkzeug.security import generate_password_hash, check_password_hash
 from models.db import get_db_connection
+from models.stats import record_user_created, bump
+
+USER_STATUSES = ("active", "inactive")
+BULK_CHUNK_SIZE = 500  # user ids per UPDATE ... IN (...)
 
 
 # -------------------------------
@@ -43,6 +47,7 @@ def create_default_admin():
             """,
             ("System Admin", default_email, hashed_password, admin_role_id),
         )
+        record_user_created(cursor, "admin")
 
         conn.commit()
         print(f"✅ Default admin created: {default_email} / {default_password}")
@@ -71,4 +76,106 @@ def validate_user(email, password):
     # If user found, check password
     if user and check_password_hash(user["password_hash"], password):
         return user
-    return None
\ No newline at end of file
+    return None
+
+
+# -------------------------------
+# Bulk status / role changes
+# -------------------------------
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def find_user_ids(cursor, role=None, created_before=None):
+    """Return the ids of users matching a role name and/or created before a date."""
+    query = "SELECT u.user_id FROM users u LEFT JOIN roles r ON u.role_id = r.role_id"
+    conditions, params = [], []
+    if role:
+        conditions.append("r.role_name = %s")
+        params.append(role)
+    if created_before:
+        conditions.append("u.created_at < %s")
+        params.append(created_before)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    cursor.execute(query + " ORDER BY u.user_id", params)
+    return [row["user_id"] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+
+
+def bulk_update_users(cursor, user_ids, status=None, role=None, protected_ids=(),
+                      chunk_size=BULK_CHUNK_SIZE):
+    """
+    Set ``status`` and/or ``role`` (a role name) for every id in
+    ``user_ids`` using chunked ``UPDATE ... WHERE user_id IN (...)``.
+    Runs on the caller's cursor; the caller commits or rolls back.
+
+    Returns (results, affected) where results maps each requested id to
+    'updated', 'unchanged', 'not_found' or 'skipped' (in ``protected_ids``).
+    Raises ValueError for an unknown status or role.
+    """
+    if status is not None and status not in USER_STATUSES:
+        raise ValueError(f"Invalid status '{status}'.")
+
+    role_id = None
+    if role is not None:
+        cursor.execute("SELECT role_id FROM roles WHERE role_name = %s", (role,))
+        row = cursor.fetchone()
+        if not row:
+            raise ValueError(f"Unknown role '{role}'.")
+        role_id = row["role_id"] if isinstance(row, dict) else row[0]
+
+    user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+    results = {user_id: "not_found" for user_id in user_ids}
+    protected = set(protected_ids)
+
+    # Current state, so unchanged rows are reported and role counters stay right
+    to_update, role_moves = [], {}
+    for chunk in chunked(user_ids, chunk_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"""
+            SELECT u.user_id, u.status, u.role_id, r.role_name
+            FROM users u LEFT JOIN roles r ON u.role_id = r.role_id
+            WHERE u.user_id IN ({placeholders})
+        """, chunk)
+        for row in cursor.fetchall():
+            if not isinstance(row, dict):
+                row = dict(zip(("user_id", "status", "role_id", "role_name"), row))
+            user_id = row["user_id"]
+            if user_id in protected:
+                results[user_id] = "skipped"
+                continue
+            status_changes = status is not None and row["status"] != status
+            role_changes = role_id is not None and row["role_id"] != role_id
+            if not (status_changes or role_changes):
+                results[user_id] = "unchanged"
+                continue
+            to_update.append(user_id)
+            if role_changes:
+                role_moves[row["role_name"]] = role_moves.get(row["role_name"], 0) + 1
+
+    assignments, values = [], []
+    if status is not None:
+        assignments.append("status = %s")
+        values.append(status)
+    if role_id is not None:
+        assignments.append("role_id = %s")
+        values.append(role_id)
+
+    affected = 0
+    for chunk in chunked(to_update, chunk_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(
+            f"UPDATE users SET {', '.join(assignments)} WHERE user_id IN ({placeholders})",
+            values + chunk
+        )
+        affected += cursor.rowcount
+        for user_id in chunk:
+            results[user_id] = "updated"
+
+    for old_role, n in role_moves.items():
+        if old_role:
+            bump(cursor, f"users.role.{old_role}", -n)
+        bump(cursor, f"users.role.{role}", n)
+
+    return results, affected
@@ -0,0 +1,229 @@
+"""
+In-process prefix index over active volunteers, for the organizer's
+typeahead picker.
+
+Every searchable term -- each word of the name, the full name, the email
+and its local part, each skill -- is stored lowercased in one sorted list
+of ``(term, user_id)`` pairs. A prefix lookup is a ``bisect`` to the
+first term >= the prefix followed by a short forward scan, so a search
+never touches the database and costs microseconds even with thousands of
+volunteers.
+
+The index is built lazily on the first search and rebuilt from scratch
+every ``Config.VOLUNTEER_INDEX_TTL`` seconds, which also picks up changes
+made by other worker processes. Write paths in this process call
+``refresh_volunteers`` after they commit so their own changes show up
+immediately.
+"""
+import time
+import heapq
+import threading
+from bisect import bisect_left, insort
+
+from config import Config
+from models.db import get_db_connection
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 25
+_REFRESH_CHUNK = 500
+
+_VOLUNTEER_SELECT = """
+    SELECT user_id, name, email, skills
+    FROM users
+    WHERE is_volunteer = TRUE AND status = 'active'
+"""
+
+
+def _terms(volunteer):
+    """Lowercased search terms for one volunteer row."""
+    name = (volunteer.get("name") or "").lower()
+    email = (volunteer.get("email") or "").lower()
+    terms = set(name.split())
+    if name:
+        terms.add(" ".join(name.split()))
+    if email:
+        terms.add(email)
+        terms.add(email.split("@", 1)[0])
+    for skill in (volunteer.get("skills") or "").lower().split(","):
+        skill = skill.strip()
+        if skill:
+            terms.add(skill)
+            terms.update(skill.split())
+    return terms
+
+
+class VolunteerIndex:
+    """Sorted (term, user_id) list plus the rows it points at."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []      # sorted [(term, user_id), ...]
+        self._volunteers = {}   # user_id -> {"id", "name", "email", "skills"}
+        self._terms = {}        # user_id -> terms currently in _entries
+        self._loaded_at = None
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    # -------------------------------
+    # Building
+    # -------------------------------
+    def load(self, rows):
+        """Replace the whole index with ``rows`` (dicts from _VOLUNTEER_SELECT)."""
+        entries, volunteers, terms = [], {}, {}
+        for row in rows:
+            user_id = row["user_id"]
+            volunteers[user_id] = self._public(row)
+            terms[user_id] = _terms(row)
+            entries.extend((term, user_id) for term in terms[user_id])
+        entries.sort()
+        with self._lock:
+            self._entries, self._volunteers, self._terms = entries, volunteers, terms
+            self._loaded_at = time.monotonic()
+
+    def upsert(self, row):
+        user_id = row["user_id"]
+        new_terms = _terms(row)
+        with self._lock:
+            old_terms = self._terms.get(user_id, set())
+            for term in old_terms - new_terms:
+                self._remove_entry(term, user_id)
+            for term in new_terms - old_terms:
+                insort(self._entries, (term, user_id))
+            self._terms[user_id] = new_terms
+            self._volunteers[user_id] = self._public(row)
+
+    def remove(self, user_id):
+        with self._lock:
+            for term in self._terms.pop(user_id, ()):
+                self._remove_entry(term, user_id)
+            self._volunteers.pop(user_id, None)
+
+    def _remove_entry(self, term, user_id):
+        i = bisect_left(self._entries, (term, user_id))
+        if i < len(self._entries) and self._entries[i] == (term, user_id):
+            del self._entries[i]
+
+    @staticmethod
+    def _public(row):
+        return {
+            "id": row["user_id"],
+            "name": row.get("name") or "",
+            "email": row.get("email") or "",
+            "skills": row.get("skills") or "",
+        }
+
+    def is_stale(self, ttl):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > ttl
+
+    # -------------------------------
+    # Lookup
+    # -------------------------------
+    def _ids_with_prefix(self, prefix):
+        ids = set()
+        i = bisect_left(self._entries, (prefix,))
+        entries = self._entries
+        while i < len(entries) and entries[i][0].startswith(prefix):
+            ids.add(entries[i][1])
+            i += 1
+        return ids
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Volunteers matching every word of ``query`` as a prefix of one of
+        their terms, best first: names starting with the whole query, then
+        names with a word starting with it, then the rest; ties by name.
+        """
+        words = query.lower().split()
+        if not words:
+            return []
+        with self._lock:
+            ids = None
+            # Longest word first: it usually matches the fewest volunteers
+            for word in sorted(words, key=len, reverse=True):
+                matches = self._ids_with_prefix(word)
+                ids = matches if ids is None else ids & matches
+                if not ids:
+                    return []
+            candidates = [self._volunteers[user_id] for user_id in ids]
+
+        phrase = " ".join(words)
+
+        def rank(volunteer):
+            name = volunteer["name"].lower()
+            if name.startswith(phrase):
+                tier = 0
+            elif any(part.startswith(words[0]) for part in name.split()):
+                tier = 1
+            else:
+                tier = 2
+            return tier, name, volunteer["id"]
+
+        return heapq.nsmallest(limit, candidates, key=rank)
+
+
+_index = VolunteerIndex()
+_build_lock = threading.Lock()
+
+
+def _fetch(where=None, params=()):
+    conn = get_db_connection()
+    if conn is None:
+        raise RuntimeError("No DB connection.")
+    cursor = conn.cursor(dictionary=True)
+    try:
+        sql = _VOLUNTEER_SELECT + (f" AND {where}" if where else "")
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _ensure_loaded():
+    if not _index.is_stale(Config.VOLUNTEER_INDEX_TTL):
+        return
+    with _build_lock:
+        # Another thread may have rebuilt it while we waited
+        if _index.is_stale(Config.VOLUNTEER_INDEX_TTL):
+            _index.load(_fetch())
+            print(f"ℹ️ Volunteer index built ({len(_index._volunteers)} volunteers)")
+
+
+# -------------------------------
+# Public API
+# -------------------------------
+def search_volunteers(query, limit=DEFAULT_LIMIT):
+    """Top ``limit`` active volunteers matching ``query`` (see VolunteerIndex.search)."""
+    _ensure_loaded()
+    return _index.search(query, max(1, min(limit, MAX_LIMIT)))
+
+
+def refresh_volunteers(user_ids):
+    """
+    Re-read ``user_ids`` and add, update or drop them in the index. Call
+    after committing a change to a user's name, email, skills, status or
+    volunteer flag. Does nothing until the index has been built.
+    """
+    if not _index.loaded:
+        return
+    user_ids = [int(user_id) for user_id in user_ids if user_id is not None]
+    if not user_ids:
+        return
+    rows = []
+    try:
+        for start in range(0, len(user_ids), _REFRESH_CHUNK):
+            chunk = user_ids[start:start + _REFRESH_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            rows.extend(_fetch(f"user_id IN ({placeholders})", chunk))
+    except Exception as e:
+        # The periodic rebuild will catch up
+        print(f"❌ Volunteer index refresh failed: {e}")
+        return
+    found = set()
+    for row in rows:
+        _index.upsert(row)
+        found.add(row["user_id"])
+    for user_id in set(user_ids) - found:
+        _index.remove(user_id)
@@ -0,0 +1,193 @@
+"""
+Bulk creation of volunteer tasks.
+
+Both the multi-volunteer assign form and the CSV import turn into a list
+of row dicts that go through ``assign_tasks``: every row is checked
+against the organizer's events and the eligible volunteers with a
+handful of set-based lookups, valid rows are inserted with
+``executemany`` in chunks of ``BULK_CHUNK_SIZE``, and the caller gets a
+per-row error report back. Everything runs on the caller's cursor; the
+caller commits.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from models.stats import record_task
+from models.user import BULK_CHUNK_SIZE, chunked
+
+CSV_COLUMNS = ("description", "volunteer_email", "event", "hours")
+MAX_IMPORT_ROWS = 5000
+MAX_HOURS = Decimal("999.99")
+
+
+class TaskImportError(Exception):
+    pass
+
+
+# Column order of the user lookups, for non-dictionary cursors
+_USER_COLUMNS = ("user_id", "email", "is_volunteer", "status")
+
+
+def _row_value(row, key):
+    return row[key] if isinstance(row, dict) else row[_USER_COLUMNS.index(key)]
+
+
+def parse_task_csv(data):
+    """
+    Read CSV bytes or text with the CSV_COLUMNS header into row dicts
+    carrying their 1-based ``line`` number (the header is line 1).
+    Raises TaskImportError for a missing header or too many rows.
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise TaskImportError("The file must be UTF-8 encoded CSV.")
+    reader = csv.DictReader(io.StringIO(data))
+    header = [(name or "").strip().lower() for name in (reader.fieldnames or [])]
+    missing = [column for column in CSV_COLUMNS if column not in header]
+    if missing:
+        raise TaskImportError(f"Missing column(s): {', '.join(missing)}. "
+                              f"Expected header: {','.join(CSV_COLUMNS)}")
+    reader.fieldnames = header
+
+    rows = []
+    for record in reader:
+        if not any((value or "").strip() for value in record.values() if isinstance(value, str)):
+            continue  # blank line
+        if len(rows) >= MAX_IMPORT_ROWS:
+            raise TaskImportError(f"Too many rows; import at most {MAX_IMPORT_ROWS} at a time.")
+        rows.append({
+            "line": reader.line_num,
+            "description": (record.get("description") or "").strip(),
+            "volunteer_email": (record.get("volunteer_email") or "").strip().lower(),
+            "event": (record.get("event") or "").strip(),
+            "hours": (record.get("hours") or "").strip(),
+        })
+    return rows
+
+
+def _parse_hours(raw):
+    try:
+        hours = Decimal(str(raw).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    if not hours.is_finite() or hours < 0 or hours > MAX_HOURS:
+        return None
+    return hours.quantize(Decimal("0.01"))
+
+
+def _organizer_events(cursor, organizer_id):
+    """({event_id: title}, {lowercased title: [event_id, ...]}) for the organizer's events."""
+    cursor.execute("SELECT event_id, title FROM events WHERE organizer_id = %s AND deleted_at IS NULL",
+                   (organizer_id,))
+    by_id, by_title = {}, {}
+    for row in cursor.fetchall():
+        event_id, title = (row["event_id"], row["title"]) if isinstance(row, dict) else row
+        by_id[event_id] = title
+        by_title.setdefault((title or "").strip().lower(), []).append(event_id)
+    return by_id, by_title
+
+
+def _users_by(cursor, column, values, chunk_size):
+    found = {}
+    for chunk in chunked(list(values), chunk_size):
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(f"""
+            SELECT user_id, email, is_volunteer, status FROM users
+            WHERE {column} IN ({placeholders})
+        """, chunk)
+        for row in cursor.fetchall():
+            key = _row_value(row, column)
+            found[key.lower() if isinstance(key, str) else key] = row
+    return found
+
+
+def assign_tasks(cursor, organizer_id, rows, skip_invalid=False,
+                 chunk_size=BULK_CHUNK_SIZE):
+    """
+    Create one 'assigned' task per valid row.
+
+    Each row has ``line``, ``description``, ``hours``, either
+    ``volunteer_id`` or ``volunteer_email``, and optionally ``event_id``
+    or ``event`` (an id or an exact title of one of the organizer's
+    events). Returns (assigned, errors): assigned lists the inserted
+    (description, volunteer_id, event_id, hours) tuples, errors is
+    [{"line": n, "error": "..."}]. Unless ``skip_invalid`` is set, any
+    error means nothing is inserted.
+    """
+    events_by_id, events_by_title = _organizer_events(cursor, organizer_id)
+
+    ids = {int(row["volunteer_id"]) for row in rows
+           if str(row.get("volunteer_id") or "").strip().isdigit()}
+    emails = {row["volunteer_email"].lower() for row in rows if row.get("volunteer_email")}
+    users_by_id = _users_by(cursor, "user_id", ids, chunk_size) if ids else {}
+    users_by_email = _users_by(cursor, "email", emails, chunk_size) if emails else {}
+
+    valid, errors = [], []
+    for row in rows:
+        problems = []
+
+        description = (row.get("description") or "").strip()
+        if not description:
+            problems.append("description is required")
+
+        hours = _parse_hours(row.get("hours") or "")
+        if hours is None:
+            problems.append(f"hours must be a number between 0 and {MAX_HOURS}")
+
+        event_id = None
+        event_ref = str(row.get("event_id") or row.get("event") or "").strip()
+        if event_ref:
+            if event_ref.isdigit() and int(event_ref) in events_by_id:
+                event_id = int(event_ref)
+            else:
+                matches = events_by_title.get(event_ref.lower(), [])
+                if len(matches) == 1:
+                    event_id = matches[0]
+                elif matches:
+                    problems.append(f"event '{event_ref}' is ambiguous; use its id "
+                                    f"({', '.join(str(m) for m in matches)})")
+                else:
+                    problems.append(f"event '{event_ref}' is not one of your events")
+
+        volunteer = None
+        if row.get("volunteer_id"):
+            ref = str(row["volunteer_id"]).strip()
+            volunteer = users_by_id.get(int(ref)) if ref.isdigit() else None
+        elif row.get("volunteer_email"):
+            ref = row["volunteer_email"]
+            volunteer = users_by_email.get(ref.lower())
+        else:
+            ref = None
+        if ref is None:
+            problems.append("volunteer is required")
+        elif volunteer is None:
+            problems.append(f"no user '{ref}'")
+        elif not _row_value(volunteer, "is_volunteer"):
+            problems.append(f"'{ref}' is not a volunteer")
+        elif _row_value(volunteer, "status") != "active":
+            problems.append(f"volunteer '{ref}' is inactive")
+
+        if problems:
+            errors.append({"line": row.get("line"), "error": "; ".join(problems)})
+        else:
+            valid.append((description, _row_value(volunteer, "user_id"), event_id, hours))
+
+    if errors and not skip_invalid:
+        return [], errors
+
+    for chunk in chunked(valid, chunk_size):
+        cursor.executemany("""
+            INSERT INTO volunteer_tasks (task_description, volunteer_id, event_id, hours_contributed, status)
+            VALUES (%s, %s, %s, %s, 'assigned')
+        """, chunk)
+
+    per_event = {}
+    for _, _, event_id, _ in valid:
+        per_event[event_id] = per_event.get(event_id, 0) + 1
+    for event_id, n in per_event.items():
+        record_task(cursor, "assigned", n, event_id=event_id)
+
+    return valid, errors
@@ -2,34 +2,35 @@
 
 from flask import (
     Blueprint, render_template, session, flash, redirect,
-    url_for, request, current_app, jsonify
+    url_for, request, jsonify, Response
 )
 from models.db import get_db_connection
+from models.fanout import Query, fetch_concurrently
+from models.pagination import paginate
+from models.search import event_search_params, refresh_organizer_request_search, search_events
+from models.volunteer_index import search_volunteers, DEFAULT_LIMIT as VOLUNTEER_SEARCH_LIMIT
+from models.volunteer_tasks import TaskImportError, assign_tasks, parse_task_csv
+from models.images import enqueue_event_image
+from models.notifications import (
+    notify, unread_count, forget_unread, mark_read, mark_all_read, clear_all
+)
+from models.notification_stream import hub as notification_hub
+from models.broadcasts import EVENT_DELETED, EVENT_UPDATED, broadcast_event, start_broadcast
+from models.events import get_deletion, soft_delete_event, start_event_deletion
+from models.storage import StorageError, acquire, replace as replace_upload, store_upload
+from models.stats import (
+    record_event_created, record_event_changed,
+    record_task, record_task_status_changed, record_task_moved
+)
+from config import Config
 from datetime import date, datetime
 import functools
-import os
-from werkzeug.utils import secure_filename
+import json
+import queue
 from werkzeug.security import generate_password_hash, check_password_hash
 
 organizer_bp = Blueprint("organizer", __name__, template_folder="templates")
 
-# -------------------------
-# Helper to create notifications
-# -------------------------
-def create_notification(user_id, message, event_id=None):
-    conn, cursor = get_db_connection(), None
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO notifications (user_id, event_id, message, is_read, created_at) VALUES (%s, %s, %s, FALSE, NOW())",
-            (user_id, event_id, message)
-        )
-        conn.commit()
-    except Exception as e:
-        print(f"DEBUG: Failed to create notification: {e}")
-    finally:
-        if cursor: cursor.close()
-        if conn: conn.close()
 
 
 
@@ -62,148 +63,101 @@ def allowed_file(filename):
 @organizer_bp.route("/dashboard")
 @organizer_required
 def dashboard():
-    conn, cursor = None, None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
         user_id = session.get('user_id')
-
-        # Get organizer stats
-        cursor.execute(
-            "SELECT COUNT(*) as total_events FROM events WHERE organizer_id=%s",
-            (user_id,)
-        )
-        total_events = cursor.fetchone()['total_events']
-
         today = date.today()
-        cursor.execute(
-            "SELECT COUNT(*) as upcoming_events FROM events WHERE organizer_id=%s AND event_date >= %s",
-            (user_id, today)
-        )
-        upcoming_events = cursor.fetchone()['upcoming_events']
 
-        cursor.execute("""
-            SELECT COUNT(DISTINCT r.participant_id) as total_participants 
-            FROM registrations r 
-            JOIN events e ON r.event_id = e.event_id 
-            WHERE e.organizer_id=%s
-        """, (user_id,))
-        total_participants = cursor.fetchone()['total_participants']
-
-        # Get active volunteers count
-        cursor.execute("""
-            SELECT COUNT(*) as active_volunteers 
-            FROM users 
-            WHERE is_volunteer = TRUE AND status='active'
-        """)
-        active_volunteers = cursor.fetchone()['active_volunteers']
-
-        # Get recent events
-        cursor.execute("""
-            SELECT e.event_id, e.title, e.event_date, e.event_time, e.location, 
-                   e.total_tickets,
-                   COUNT(r.reg_id) as registrations_count
-            FROM events e 
-            LEFT JOIN registrations r ON e.event_id = r.event_id
-            WHERE e.organizer_id = %s
-            GROUP BY e.event_id, e.title, e.event_date, e.event_time, e.location, e.total_tickets
-            ORDER BY e.event_date DESC
-            LIMIT 5
-        """, (user_id,))
-        recent_events = cursor.fetchall()
-
-        # Get recent participants
-        cursor.execute("""
-            SELECT u.name, u.email, e.title as event_name, r.registered_at
-            FROM registrations r
-            JOIN users u ON r.participant_id = u.user_id
-            JOIN events e ON r.event_id = e.event_id
-            WHERE e.organizer_id = %s
-            ORDER BY r.registered_at DESC
-            LIMIT 5
-        """, (user_id,))
-        recent_participants = cursor.fetchall()
-
-        # Get assigned tasks with volunteer and event details
-        # In your dashboard route, replace the assigned_tasks query with this:
-        cursor.execute("""
-    SELECT vt.task_id AS id,
-           vt.task_description AS description,
-           vt.created_at,
-           vt.status,
-           u.name AS volunteer_name,
-           e.title AS event_name,
-           vt.hours_contributed
-    FROM volunteer_tasks vt
-    LEFT JOIN users u ON vt.volunteer_id = u.user_id
-    LEFT JOIN events e ON vt.event_id = e.event_id
-    WHERE e.organizer_id = %s
-    ORDER BY vt.created_at DESC
-""", (user_id,))
-
-
-        assigned_tasks = cursor.fetchall()
-
-        # Get volunteers for task assignment dropdown
-        cursor.execute("""
-            SELECT user_id as id, name, email 
-            FROM users 
-            WHERE is_volunteer = TRUE AND status = 'active'
-            ORDER BY name
-        """)
-        volunteers = cursor.fetchall()
-
-        # Get events for task assignment dropdown
-        cursor.execute("""
-            SELECT event_id, title, event_date 
-            FROM events 
-            WHERE organizer_id = %s AND event_date >= CURDATE()
-            ORDER BY event_date
-        """, (user_id,))
-        events = cursor.fetchall()
-
-        # Get current user details
-        cursor.execute("SELECT * FROM users WHERE user_id=%s", (user_id,))
-        user = cursor.fetchone()
+        # Independent queries run side by side on pooled connections
+        results = fetch_concurrently({
+            # Organizer stats
+            "total_events": Query(
+                "SELECT COUNT(*) as total_events FROM events WHERE organizer_id=%s AND deleted_at IS NULL",
+                (user_id,), one=True
+            ),
+            "upcoming_events": Query(
+                "SELECT COUNT(*) as upcoming_events FROM events "
+                "WHERE organizer_id=%s AND event_date >= %s AND deleted_at IS NULL",
+                (user_id, today), one=True
+            ),
+            "total_participants": Query("""
+                SELECT COUNT(DISTINCT r.participant_id) as total_participants 
+                FROM registrations r 
+                JOIN events e ON r.event_id = e.event_id 
+                WHERE e.organizer_id=%s AND e.deleted_at IS NULL
+            """, (user_id,), one=True),
+            # Active volunteers count
+            "active_volunteers": Query("""
+                SELECT COUNT(*) as active_volunteers 
+                FROM users 
+                WHERE is_volunteer = TRUE AND status='active'
+            """, one=True),
+            # Recent events
+            "recent_events": Query("""
+                SELECT e.event_id, e.title, e.event_date, e.event_time, e.location, 
+                       e.total_tickets,
+                       e.registered_count as registrations_count
+                FROM events e 
+                WHERE e.organizer_id = %s AND e.deleted_at IS NULL
+                ORDER BY e.event_date DESC
+                LIMIT 5
+            """, (user_id,)),
+            # Recent participants
+            "recent_participants": Query("""
+                SELECT u.name, u.email, e.title as event_name, r.registered_at
+                FROM registrations r
+                JOIN users u ON r.participant_id = u.user_id
+                JOIN events e ON r.event_id = e.event_id
+                WHERE e.organizer_id = %s AND e.deleted_at IS NULL
+                ORDER BY r.registered_at DESC
+                LIMIT 5
+            """, (user_id,)),
+            # Events for task assignment dropdown
+            "events": Query("""
+                SELECT event_id, title, event_date 
+                FROM events 
+                WHERE organizer_id = %s AND event_date >= CURDATE() AND deleted_at IS NULL
+                ORDER BY event_date
+            """, (user_id,)),
+            # Current user details
+            "user": Query("SELECT * FROM users WHERE user_id=%s", (user_id,), one=True),
+            # Events per Month (includes year)
+            "events_per_month": Query("""
+                SELECT DATE_FORMAT(event_date, '%Y-%m') as month, COUNT(*) as total
+                FROM events
+                WHERE organizer_id = %s AND deleted_at IS NULL
+                GROUP BY month
+                ORDER BY month
+            """, (user_id,)),
+            # Participant Registrations Trend
+            "participants_trend": Query("""
+                SELECT DATE(registered_at) as reg_date, COUNT(*) as total
+                FROM registrations r
+                JOIN events e ON r.event_id = e.event_id
+                WHERE e.organizer_id = %s AND e.deleted_at IS NULL
+                GROUP BY DATE(registered_at)
+                ORDER BY DATE(registered_at)
+            """, (user_id,)),
+        })
 
         stats = {
-            'total_events': total_events,
-            'upcoming_events': upcoming_events,
-            'total_participants': total_participants,
-            'active_volunteers': active_volunteers
+            'total_events': results["total_events"]['total_events'],
+            'upcoming_events': results["upcoming_events"]['upcoming_events'],
+            'total_participants': results["total_participants"]['total_participants'],
+            'active_volunteers': results["active_volunteers"]['active_volunteers']
         }
-       # In your dashboard route, replace the chart data queries with these:
+        user = results["user"]
+        recent_events = results["recent_events"]
+        recent_participants = results["recent_participants"]
+        events = results["events"]
+        events_per_month_data = results["events_per_month"]
+        participants_trend_data = results["participants_trend"]
 
-# Events per Month (Improved to include year)
-        cursor.execute("""
-            SELECT DATE_FORMAT(event_date, '%Y-%m') as month, COUNT(*) as total
-            FROM events
-            WHERE organizer_id = %s
-            GROUP BY month
-            ORDER BY month
-        """, (user_id,))
-        events_per_month_data = cursor.fetchall()
-
-        # Participant Registrations Trend (Corrected GROUP BY)
-        cursor.execute("""
-            SELECT DATE(registered_at) as reg_date, COUNT(*) as total
-            FROM registrations r
-            JOIN events e ON r.event_id = e.event_id
-            WHERE e.organizer_id = %s
-            GROUP BY DATE(registered_at)
-            ORDER BY DATE(registered_at)
-        """, (user_id,))
-        participants_trend_data = cursor.fetchall()
-        # The rest of the function remains the same...
         return render_template(
             "organizer_dashboard.html",
             stats=stats,
             user=user,
             recent_events=recent_events,
             recent_participants=recent_participants,
-            assigned_tasks=assigned_tasks,
-            volunteers=volunteers,
             events=events,
             events_per_month=events_per_month_data, # Pass the corrected data
             participants_trend=participants_trend_data # Pass the corrected data
@@ -223,15 +177,111 @@ def dashboard():
             user={},
             recent_events=[],
             recent_participants=[],
-            assigned_tasks=[],
-            volunteers=[],
             events=[]
         )
+
+# -------------------------
+# Dashboard task panel (loaded after first paint)
+# -------------------------
+TASK_PANEL_PER_PAGE = 10
+TASK_STATUSES = ("assigned", "completed")
+TASK_SORTS = {
+    # sort key -> keyset order; the last column makes it unique
+    "created": [("vt.created_at", "created_at"), ("vt.task_id", "id")],
+    "hours": [("vt.hours_contributed", "hours_contributed"), ("vt.task_id", "id")],
+    "event_date": [("e.event_date", "event_date"), ("vt.task_id", "id")],
+}
+
+
+@organizer_bp.route("/dashboard/tasks")
+@organizer_required
+def dashboard_tasks():
+    """
+    One page of the organizer's volunteer tasks, as an HTML fragment for
+    the dashboard panel or as JSON with ``?format=json``.
+    """
+    user_id = session.get('user_id')
+    status = request.args.get('status', 'all')
+    sort = request.args.get('sort', 'created')
+    direction = request.args.get('dir', 'desc')
+    if sort not in TASK_SORTS:
+        sort = 'created'
+    if direction not in ('asc', 'desc'):
+        direction = 'desc'
+
+    where, params = ["e.organizer_id = %s", "e.deleted_at IS NULL"], [user_id]
+    if status in TASK_STATUSES:
+        where.append("vt.status = %s")
+        params.append(status)
+    else:
+        status = 'all'
+
+    cursor = get_db_connection().cursor(dictionary=True)
+    try:
+        tasks_page = paginate(
+            cursor,
+            """
+            SELECT vt.task_id AS id,
+                   vt.task_description AS description,
+                   vt.created_at,
+                   vt.status,
+                   vt.hours_contributed,
+                   u.name AS volunteer_name,
+                   e.title AS event_name,
+                   e.event_date
+            FROM volunteer_tasks vt
+            JOIN events e ON vt.event_id = e.event_id
+            LEFT JOIN users u ON vt.volunteer_id = u.user_id
+            """,
+            order_by=TASK_SORTS[sort],
+            where=where, params=params,
+            page=request.args.get('page', 1, type=int),
+            cursor_token=request.args.get('cursor'),
+            per_page=TASK_PANEL_PER_PAGE, descending=(direction == 'desc')
+        )
     finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+        cursor.close()
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "tasks": [
+                dict(task, hours_contributed=float(task["hours_contributed"] or 0),
+                     created_at=task["created_at"].isoformat() if task["created_at"] else None,
+                     event_date=task["event_date"].isoformat() if task["event_date"] else None)
+                for task in tasks_page.items
+            ],
+            "page": tasks_page.page,
+            "total": tasks_page.total,
+            "next_cursor": tasks_page.next_cursor,
+            "prev_cursor": tasks_page.prev_cursor,
+        })
+
+    return render_template(
+        "_organizer_tasks_panel.html",
+        tasks_page=tasks_page,
+        status=status, sort=sort, direction=direction,
+        statuses=TASK_STATUSES
+    )
+
+
+# -------------------------
+# Volunteer typeahead
+# -------------------------
+@organizer_bp.route("/volunteers/search")
+@organizer_required
+def search_volunteers_route():
+    """JSON list of active volunteers whose name, email or skills start with ``q``."""
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", VOLUNTEER_SEARCH_LIMIT, type=int)
+    if not query:
+        return jsonify({"volunteers": []})
+    try:
+        volunteers = search_volunteers(query, limit)
+    except Exception as e:
+        print(f"❌ Volunteer search failed: {e}")
+        return jsonify({"volunteers": [], "message": "Search unavailable"}), 503
+    return jsonify({"volunteers": volunteers})
+
 
 # In organizer/routes.py
 
@@ -266,13 +316,22 @@ def assign_task():
         if event_id:
             cursor.execute("""
                 SELECT * FROM events 
-                WHERE event_id = %s AND organizer_id = %s
+                WHERE event_id = %s AND organizer_id = %s AND deleted_at IS NULL
             """, (event_id, user_id))
             event = cursor.fetchone()
             if not event:
                 flash("Invalid event selection.", "danger")
                 return redirect(url_for("organizer.dashboard"))
 
+        # volunteer_id comes from the typeahead's hidden field; make sure it is an active volunteer
+        cursor.execute("""
+            SELECT user_id FROM users
+            WHERE user_id = %s AND is_volunteer = TRUE AND status = 'active'
+        """, (volunteer_id,))
+        if not cursor.fetchone():
+            flash("Invalid volunteer selection.", "danger")
+            return redirect(url_for("organizer.dashboard"))
+
         cursor.execute("""
             INSERT INTO volunteer_tasks (task_description, volunteer_id, event_id,hours_contributed, status)
             VALUES (%s, %s, %s, %s, %s)
@@ -283,8 +342,10 @@ def assign_task():
             hours_contributed,
             "assigned"  # default status
         ))
+        record_task(cursor, "assigned", event_id=event_id)
          
         conn.commit()
+        notify(volunteer_id, f"New task assigned: {description}", event_id)
         flash("Task assigned successfully!", "success")
         print("DEBUG: Task assigned successfully")
         
@@ -297,6 +358,122 @@ def assign_task():
 
     return redirect(url_for("organizer.dashboard"))
 
+# -------------------------
+# Bulk task assignment / CSV import
+# -------------------------
+TASK_REPORT_FLASH_ERRORS = 5
+
+
+def _is_xhr():
+    return request.headers.get("X-Requested-With") == "XMLHttpRequest"
+
+
+def _task_report(created, errors, total, skip_invalid=True):
+    """JSON report for XHR callers, otherwise a flash summary and back to the dashboard."""
+    if _is_xhr():
+        return jsonify({
+            "success": created > 0 or not errors,
+            "rows": total,
+            "created": created,
+            "errors": errors,
+        })
+    if created:
+        flash(f"{created} task(s) assigned.", "success")
+    if errors:
+        shown = "; ".join(f"#{e['line']}: {e['error']}" for e in errors[:TASK_REPORT_FLASH_ERRORS])
+        more = len(errors) - TASK_REPORT_FLASH_ERRORS
+        prefix = "Skipped" if skip_invalid else "Nothing imported -"
+        flash(f"{prefix} {len(errors)} invalid row(s): {shown}"
+              + (f" (and {more} more)" if more > 0 else ""), "danger")
+    return redirect(url_for("organizer.dashboard"))
+
+
+def _notify_assigned(assigned):
+    """Tell each volunteer about their new task; queued, so hundreds cost one batch insert."""
+    for description, volunteer_id, event_id, _ in assigned:
+        notify(volunteer_id, f"New task assigned: {description}", event_id)
+
+
+@organizer_bp.route("/assign_tasks/bulk", methods=["POST"])
+@organizer_required
+def bulk_assign_tasks():
+    """One task definition assigned to every volunteer in ``volunteer_ids``."""
+    volunteer_ids = list(dict.fromkeys(request.form.getlist("volunteer_ids")))
+    if not volunteer_ids:
+        flash("Choose at least one volunteer.", "danger")
+        return redirect(url_for("organizer.dashboard"))
+
+    description = request.form.get("description")
+    event_id = request.form.get("event_id") or None
+    hours = request.form.get("hours_contributed")
+    rows = [
+        {"line": i, "description": description, "volunteer_id": volunteer_id,
+         "event_id": event_id, "hours": hours}
+        for i, volunteer_id in enumerate(volunteer_ids, 1)
+    ]
+
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        # Volunteers that turn out ineligible are reported, not fatal to the rest
+        assigned, errors = assign_tasks(cursor, session.get("user_id"), rows, skip_invalid=True)
+        conn.commit()
+    except Exception as e:
+        if conn: conn.rollback()
+        print(f"❌ Bulk task assignment failed: {e}")
+        flash("Error assigning tasks.", "danger")
+        return redirect(url_for("organizer.dashboard"))
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+    _notify_assigned(assigned)
+    return _task_report(len(assigned), errors, len(rows))
+
+
+@organizer_bp.route("/tasks/import", methods=["POST"])
+@organizer_required
+def import_tasks():
+    """
+    Create tasks from an uploaded CSV (description, volunteer_email, event,
+    hours). Any invalid row cancels the import unless ``skip_invalid`` is set.
+    """
+    upload = request.files.get("tasks_csv")
+    skip_invalid = bool(request.form.get("skip_invalid"))
+    if not upload or not upload.filename:
+        flash("Choose a CSV file to import.", "danger")
+        return redirect(url_for("organizer.dashboard"))
+
+    try:
+        rows = parse_task_csv(upload.read())
+    except TaskImportError as e:
+        if _is_xhr():
+            return jsonify({"success": False, "message": str(e)}), 400
+        flash(str(e), "danger")
+        return redirect(url_for("organizer.dashboard"))
+
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        assigned, errors = assign_tasks(cursor, session.get("user_id"), rows, skip_invalid=skip_invalid)
+        conn.commit()
+    except Exception as e:
+        if conn: conn.rollback()
+        print(f"❌ Task import failed: {e}")
+        if _is_xhr():
+            return jsonify({"success": False, "message": "Error importing tasks."}), 500
+        flash("Error importing tasks.", "danger")
+        return redirect(url_for("organizer.dashboard"))
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+    _notify_assigned(assigned)
+    return _task_report(len(assigned), errors, len(rows), skip_invalid)
+
+
 # -------------------------
 # Organizer Profile
 # -------------------------
@@ -318,18 +495,18 @@ def profile():
         if "profile_picture" in request.files:
             file = request.files["profile_picture"]
             if file and file.filename:
-                filename = secure_filename(file.filename)
-                # Create upload directory if it doesn't exist
-                upload_folder = os.path.join(current_app.root_path, 'static', 'uploads', 'profiles')
-                os.makedirs(upload_folder, exist_ok=True)
-                filepath = os.path.join(upload_folder, filename)
-                file.save(filepath)
-                profile_picture = f"/static/uploads/profiles/{filename}"  # Save as relative path for template
+                try:
+                    profile_picture = "/static/" + store_upload(file)  # Save as URL for template
+                except StorageError as e:
+                    flash(str(e), "danger")
+                    return redirect(url_for("organizer.profile"))
 
         # Update DB
         conn = get_db_connection()
         cursor = conn.cursor()
         if profile_picture:
+            cursor.execute("SELECT profile_picture FROM users WHERE user_id = %s", (user_id,))
+            replace_upload(cursor, (cursor.fetchone() or (None,))[0], profile_picture)
             cursor.execute("""
                 UPDATE users
                 SET name = %s, email = %s, phone = %s, organization = %s, bio = %s,
@@ -342,6 +519,7 @@ def profile():
                 SET name = %s, email = %s, phone = %s, organization = %s, bio = %s
                 WHERE user_id = %s
             """, (name, email, phone, organization, bio, user_id))
+        refresh_organizer_request_search(cursor, user_id)
         conn.commit()
         cursor.close()
         conn.close()
@@ -354,7 +532,8 @@ def profile():
     cursor = conn.cursor(dictionary=True)
     cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
     user = cursor.fetchone()
-    cursor.execute("SELECT COUNT(*) AS total_events FROM events WHERE organizer_id = %s", (user_id,))
+    cursor.execute("SELECT COUNT(*) AS total_events FROM events WHERE organizer_id = %s AND deleted_at IS NULL",
+                   (user_id,))
     stats = cursor.fetchone()
     cursor.close()
     conn.close()
@@ -365,6 +544,9 @@ def profile():
 # -------------------------
 # All Events
 # -------------------------
+EVENTS_PER_PAGE = 20
+
+
 @organizer_bp.route("/events")
 @organizer_required
 def all_events():
@@ -375,51 +557,28 @@ def all_events():
 
         user_id = session.get('user_id')
 
-        # Get filter parameters
-        status_filter = request.args.get('status', 'all')
-        search_query = request.args.get('q', '')
-
-        # Build query with participant count
-        query = """
-            SELECT e.event_id, e.title, e.description, e.location, e.event_date, e.event_time,
-                   e.category, e.total_tickets, e.image_url,
-                   COUNT(r.reg_id) AS participant_count
-            FROM events e
-            LEFT JOIN registrations r ON e.event_id = r.event_id
-            WHERE e.organizer_id = %s
-        """
-        params = [user_id]
-
-        if search_query:
-            query += " AND (e.title LIKE %s OR e.description LIKE %s OR e.location LIKE %s)"
-            params.extend([f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"])
-
-        if status_filter == 'upcoming':
-            query += " AND e.event_date >= CURDATE()"
-        elif status_filter == 'past':
-            query += " AND e.event_date < CURDATE()"
-
-        query += " GROUP BY e.event_id ORDER BY e.event_date DESC"
-
-        cursor.execute(query, params)
-        events = cursor.fetchall()
+        search = search_events(
+            cursor, event_search_params(request.args),
+            organizer_id=user_id, facets=("category",),
+            page=request.args.get("page", 1, type=int),
+            cursor_token=request.args.get("cursor"),
+            per_page=EVENTS_PER_PAGE, newest_first=True
+        )
 
         cursor.execute("SELECT * FROM users WHERE user_id=%s", (user_id,))
         user = cursor.fetchone()
 
         return render_template("organizer_events.html",
-                               events=events,
+                               search=search,
+                               events=search.page.items,
                                user=user,
-                               status_filter=status_filter,
-                               search_query=search_query,
                                current_date=date.today())
     except Exception as e:
         flash(f"An error occurred: {e}", "danger")
         return render_template("organizer_events.html",
+                               search=None,
                                events=[],
                                user={},
-                               status_filter='all',
-                               search_query='',
                                current_date=date.today())
     finally:
         if cursor: cursor.close()
@@ -476,22 +635,23 @@ def create_event_post():
         if 'event_image' in request.files:
             file = request.files['event_image']
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                unique_filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
-                upload_folder = os.path.join(current_app.root_path, 'static', 'uploads','events')
-                os.makedirs(upload_folder, exist_ok=True)
-                file_path = os.path.join(upload_folder, unique_filename)
-                file.save(file_path)
-                image_url = f"/static/uploads/events/{unique_filename}"
+                try:
+                    image_url = "/static/" + store_upload(file)
+                except StorageError as e:
+                    flash(str(e), "danger")
+                    return redirect(url_for('organizer.create_event'))
 
         cursor.execute("""
             INSERT INTO events (organizer_id, title, description, event_date, event_time, location, category, total_tickets,  image_url)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (user_id, title, description, event_date, event_time, location, category, total_tickets, image_url))
         event_id = cursor.lastrowid  # get new event ID
+        acquire(cursor, image_url)
+        record_event_created(cursor, event_date, event_id=event_id)
+        # Notification commits with the event itself
+        notify(user_id, f"You have successfully created the event: {title}", event_id, cursor=cursor)
         conn.commit()
-        # Create notification
-        create_notification(user_id, f"You have successfully created the event: {title}", event_id)
+        enqueue_event_image(event_id, image_url)
         flash("Event created successfully!", "success")
         return redirect(url_for('organizer.all_events'))
 
@@ -516,7 +676,8 @@ def edit_event(event_id):
 
         user_id = session.get('user_id')
 
-        cursor.execute("SELECT * FROM events WHERE event_id=%s AND organizer_id=%s", (event_id, user_id))
+        cursor.execute("SELECT * FROM events WHERE event_id=%s AND organizer_id=%s AND deleted_at IS NULL",
+                       (event_id, user_id))
         event = cursor.fetchone()
 
         if not event:
@@ -549,7 +710,8 @@ def edit_event_post(event_id):
 
         user_id = session.get('user_id')
 
-        cursor.execute("SELECT * FROM events WHERE event_id=%s AND organizer_id=%s", (event_id, user_id))
+        cursor.execute("SELECT * FROM events WHERE event_id=%s AND organizer_id=%s AND deleted_at IS NULL",
+                       (event_id, user_id))
         event = cursor.fetchone()
 
         if not event:
@@ -569,23 +731,37 @@ def edit_event_post(event_id):
         if 'event_image' in request.files:
             file = request.files['event_image']
             if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                unique_filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
-                upload_folder = os.path.join(current_app.root_path, 'static', 'uploads', 'events')
-                os.makedirs(upload_folder, exist_ok=True)
-                file_path = os.path.join(upload_folder, unique_filename)
-                file.save(file_path)
-                image_url = f"/static/uploads/events/{unique_filename}"
+                try:
+                    image_url = "/static/" + store_upload(file)
+                except StorageError as e:
+                    flash(str(e), "danger")
+                    return redirect(url_for('organizer.edit_event', event_id=event_id))
 
         cursor.execute("""
             UPDATE events 
             SET title=%s, description=%s, event_date=%s, event_time=%s, location=%s, category=%s, total_tickets=%s,  image_url=%s
             WHERE event_id=%s
         """, (title, description, event_date, event_time, location, category, total_tickets,  image_url, event_id))
+        image_changed = image_url != event['image_url']
+        if image_changed:
+            replace_upload(cursor, event['image_url'], image_url)
+            # Old variants no longer match; templates use the original until the new ones exist
+            cursor.execute("UPDATE events SET image_variants = NULL WHERE event_id = %s", (event_id,))
+        status = event['status'] or 'upcoming'
+        record_event_changed(cursor, event['event_date'], status, event_date, status)
+        # Notification commits with the update itself
+        notify(user_id, f"You have updated the event: {title}", event_id, cursor=cursor)
+        # Participants and volunteers are told by a background worker
+        broadcast_id = broadcast_event(
+            cursor, event_id, EVENT_UPDATED,
+            f"The event '{title}' has been updated. Please check the latest details.",
+            created_by=user_id
+        )
 
         conn.commit()
-        # Create notification
-        create_notification(user_id, f"You have updated the event: {title}", event_id)
+        start_broadcast(broadcast_id)
+        if image_changed:
+            enqueue_event_image(event_id, image_url)
         flash("Event updated successfully!", "success")
         return redirect(url_for('organizer.all_events'))
 
@@ -611,21 +787,32 @@ def delete_event(event_id):
         user_id = session.get('user_id')
 
         # Check if the event belongs to the organizer
-        cursor.execute("SELECT * FROM events WHERE event_id=%s AND organizer_id=%s", (event_id, user_id))
+        cursor.execute("SELECT * FROM events WHERE event_id=%s AND organizer_id=%s AND deleted_at IS NULL",
+                       (event_id, user_id))
         event = cursor.fetchone()
 
         if not event:
             flash("Event not found or you don't have permission to delete it.", "danger")
             return redirect(url_for('organizer.all_events'))
 
-        # First delete related notifications
-        cursor.execute("DELETE FROM notifications WHERE event_id=%s", (event_id,))
-
-        # Now delete the event
-        cursor.execute("DELETE FROM events WHERE event_id=%s", (event_id,))
+        # Hide it now; its rows are purged in the background once the
+        # broadcast has told everyone registered (it finds them through them)
+        if not soft_delete_event(cursor, event, requested_by=user_id):
+            flash("Event not found or you don't have permission to delete it.", "danger")
+            return redirect(url_for('organizer.all_events'))
+        broadcast_id = broadcast_event(
+            cursor, event_id, EVENT_DELETED,
+            f"The event '{event['title']}' on {event['event_date']} has been cancelled.",
+            created_by=user_id
+        )
         conn.commit()
+        if broadcast_id:
+            start_broadcast(broadcast_id)  # starts the purge when done
+        else:
+            start_event_deletion(event_id)
 
-        flash("Event deleted successfully!", "success")
+        flash("Event deleted. Registered participants and volunteers are being notified "
+              "and its data will be removed shortly.", "success")
         return redirect(url_for('organizer.all_events'))
 
     except Exception as e:
@@ -636,6 +823,23 @@ def delete_event(event_id):
         if conn: conn.close()
 
 
+@organizer_bp.route("/events/<int:event_id>/deletion")
+@organizer_required
+def event_deletion_status(event_id):
+    """Progress of an event's background purge, for polling."""
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        deletion = get_deletion(cursor, event_id, organizer_id=session.get('user_id'))
+        if not deletion:
+            return jsonify({"error": "No deletion for this event."}), 404
+        return jsonify(deletion)
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
+
+
 # -------------------------
 # Task Management Routes
 # -------------------------
@@ -689,7 +893,7 @@ def edit_task(task_id):
         cursor.execute("""
             SELECT vt.* FROM volunteer_tasks vt
             JOIN events e ON vt.event_id = e.event_id
-            WHERE vt.task_id = %s AND e.organizer_id = %s
+            WHERE vt.task_id = %s AND e.organizer_id = %s AND e.deleted_at IS NULL
         """, (task_id, user_id))
         
         task = cursor.fetchone()
@@ -712,7 +916,7 @@ def edit_task(task_id):
         if event_id:
             cursor.execute("""
                 SELECT * FROM events 
-                WHERE event_id = %s AND organizer_id = %s
+                WHERE event_id = %s AND organizer_id = %s AND deleted_at IS NULL
             """, (event_id, user_id))
             
             event = cursor.fetchone()
@@ -727,6 +931,8 @@ def edit_task(task_id):
                 status = %s
             WHERE task_id = %s
         """, (volunteer_id, event_id, description, status, task_id))
+        record_task_status_changed(cursor, task['status'], status)
+        record_task_moved(cursor, task['event_id'], event_id)
         
         conn.commit()
         flash("Task updated successfully!", "success")
@@ -754,7 +960,7 @@ def delete_task(task_id):
         cursor.execute("""
             SELECT vt.* FROM volunteer_tasks vt
             JOIN events e ON vt.event_id = e.event_id
-            WHERE vt.task_id = %s AND e.organizer_id = %s
+            WHERE vt.task_id = %s AND e.organizer_id = %s AND e.deleted_at IS NULL
         """, (task_id, user_id))
         
         task = cursor.fetchone()
@@ -764,6 +970,7 @@ def delete_task(task_id):
         
         # Delete task
         cursor.execute("DELETE FROM volunteer_tasks WHERE task_id = %s", (task_id,))
+        record_task(cursor, task['status'], delta=-1, event_id=task['event_id'])
         conn.commit()
         
         flash("Task deleted successfully!", "success")
@@ -823,47 +1030,108 @@ def get_task(task_id):
 # -------------------------
 # Notifications
 # -------------------------
+NOTIFICATIONS_PER_PAGE = 20
+
+
+@organizer_bp.context_processor
+def inject_unread_notifications():
+    """Navbar badge count, from the cached per-user counter."""
+    user_id = session.get('user_id')
+    if not user_id or session.get('role') != 'organizer':
+        return {}
+    try:
+        return {"unread_notifications": unread_count(user_id)}
+    except Exception as e:
+        print(f"❌ Unread count unavailable: {e}")
+        return {"unread_notifications": None}
+
+
 @organizer_bp.route('/notifications')
 @organizer_required
 def notifications_page():
     conn, cursor = None, None
+    unread_only = request.args.get('show') == 'unread'
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
         user_id = session.get('user_id')
 
-        cursor.execute("""
-            SELECT * FROM notifications 
-            WHERE user_id = %s 
-            ORDER BY created_at DESC
-        """, (user_id,))
-        notifications = cursor.fetchall()
+        where, params = ["n.user_id = %s"], [user_id]
+        if unread_only:
+            where.append("n.is_read = FALSE")
+        pagination = paginate(
+            cursor,
+            "SELECT n.notif_id, n.event_id, n.message, n.is_read, n.created_at FROM notifications n",
+            order_by=[("n.notif_id", "notif_id")],
+            where=where, params=params,
+            page=request.args.get('page', 1, type=int),
+            cursor_token=request.args.get('cursor'),
+            per_page=NOTIFICATIONS_PER_PAGE, descending=True, total=None,
+        )
 
-        cursor.execute("""
-            UPDATE notifications 
-            SET is_read = TRUE 
-            WHERE user_id = %s AND is_read = FALSE
-        """, (user_id,))
-        conn.commit()
+        # Only what is on screen counts as seen
+        seen = [n['notif_id'] for n in pagination.items if not n['is_read']]
+        if seen:
+            mark_read(cursor, user_id, seen)
+            conn.commit()
+            forget_unread([user_id])
 
         cursor.execute("SELECT * FROM users WHERE user_id=%s", (user_id,))
         user = cursor.fetchone()
 
         return render_template("notifications.html",
-                               notifications=notifications,
+                               notifications=pagination.items,
+                               pagination=pagination,
+                               unread_only=unread_only,
                                user=user)
 
     except Exception as e:
         flash(f"An error occurred: {e}", "danger")
         return render_template("notifications.html",
                                notifications=[],
+                               pagination=None,
+                               unread_only=unread_only,
                                user={})
     finally:
         if cursor: cursor.close()
         if conn: conn.close()
 
 
+@organizer_bp.route('/notifications/unread_count')
+@organizer_required
+def unread_notifications_count():
+    return jsonify({"count": unread_count(session.get('user_id'))})
+
+
+@organizer_bp.route('/notifications/stream')
+@organizer_required
+def notifications_stream():
+    """Server-Sent Events: new notifications and unread-count changes."""
+    user_id = session.get('user_id')
+    unread = unread_count(user_id)
+
+    def generate():
+        events = notification_hub.subscribe(user_id, unread)
+        try:
+            yield "retry: 5000\n\n"
+            yield f"event: unread\ndata: {json.dumps({'count': unread})}\n\n"
+            while True:
+                try:
+                    kind, data = events.get(timeout=Config.NOTIFY_STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            notification_hub.unsubscribe(user_id, events)
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # let nginx pass events straight through
+    })
+
+
 @organizer_bp.route('/mark_notification_read', methods=['POST'])
 @organizer_required
 def mark_notification_read():
@@ -875,12 +1143,9 @@ def mark_notification_read():
         notification_id = request.json.get('notification_id')
         user_id = session.get('user_id')
 
-        cursor.execute("""
-            UPDATE notifications 
-            SET is_read = TRUE 
-            WHERE notif_id = %s AND user_id = %s
-        """, (notification_id, user_id))
+        mark_read(cursor, user_id, [notification_id])
         conn.commit()
+        forget_unread([user_id])
 
         return jsonify({"success": True})
     except Exception as e:
@@ -893,32 +1158,34 @@ def mark_notification_read():
 @organizer_bp.route('/mark_all_notifications_read', methods=['POST'])
 @organizer_required
 def mark_all_notifications_read():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    user_id = session.get('user_id')
-
-    # Mark all as read for the current user
-    cursor.execute("UPDATE notifications SET is_read = TRUE WHERE user_id = %s", (user_id,))
-    conn.commit()
-
-    cursor.close()
-    conn.close()
-    return jsonify({"success": True})
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        # Chunked, one short transaction per chunk
+        changed = mark_all_read(conn, cursor, session.get('user_id'))
+        return jsonify({"success": True, "updated": changed})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
 
 
 @organizer_bp.route('/clear_all_notifications', methods=['POST'])
 @organizer_required
 def clear_all_notifications():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    user_id = session.get('user_id')
-
-    cursor.execute("DELETE FROM notifications WHERE user_id = %s", (user_id,))
-    conn.commit()
-
-    cursor.close()
-    conn.close()
-    return jsonify({"success": True})
+    conn, cursor = None, None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        deleted = clear_all(conn, cursor, session.get('user_id'))
+        return jsonify({"success": True, "deleted": deleted})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+    finally:
+        if cursor: cursor.close()
+        if conn: conn.close()
 
 
 #==================================
@@ -985,9 +1252,10 @@ def view_event(event_id):
     cursor.execute("""
         SELECT 
             event_id, title, description, event_date, event_time, 
-            location, total_tickets, status, image_url
+            location, total_tickets, status, image_url,
+            tickets_sold AS participant_count
         FROM events
-        WHERE event_id = %s
+        WHERE event_id = %s AND deleted_at IS NULL
     """, (event_id,))
     event = cursor.fetchone()
 
@@ -1002,22 +1270,13 @@ def view_event(event_id):
         from datetime import datetime
         event['event_date'] = datetime.strptime(event['event_date'], '%Y-%m-%d').date()
 
-    # 2️⃣ Get participant count
-    cursor.execute("""
-        SELECT IFNULL(SUM(ticket_count), 0) AS participant_count
-        FROM registrations
-        WHERE event_id = %s
-    """, (event_id,))
-    participant_data = cursor.fetchone()
-    event['participant_count'] = participant_data['participant_count']
-
-    # 3️⃣ Ensure status is a string
+    # 2️⃣ Ensure status is a string
     if event['status'] is None:
         event['status'] = 'upcoming'
     else:
         event['status'] = str(event['status'])
 
-    # 4️⃣ Fetch user info for navbar
+    # 3️⃣ Fetch user info for navbar
     cursor.execute("SELECT name, profile_picture FROM users WHERE user_id = %s", (user_id,))
     user = cursor.fetchone()
 
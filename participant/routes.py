@@ -1,5 +1,8 @@
 from flask import Blueprint, render_template, session, redirect, url_for, flash,request
 from models.db import get_db_connection
+from models.fanout import Query, fetch_concurrently
+from models.search import event_search_params, search_events
+from models.stats import record_registration
 from datetime import date
 from datetime import date
 
@@ -11,57 +14,58 @@ participant_bp = Blueprint("participant", __name__, template_folder="templates")
 # ------------------------
 @participant_bp.route("/dashboard")
 def dashboard():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
     user_id = session.get("user_id")
 
-    # Get logged-in participant details
-    cursor.execute("SELECT user_id, name, email, phone, organization, profile_picture FROM users WHERE user_id=%s", (user_id,))
-    user = cursor.fetchone()
-
-    # Total registered events (only for upcoming/future events)
-    cursor.execute("""
-    SELECT COUNT(*) AS registered_count
-    FROM registrations r
-    JOIN events e ON r.event_id = e.event_id
-    WHERE r.participant_id = %s AND e.event_date >= CURDATE()
-""", (user_id,))
-    registered_events_count = cursor.fetchone()["registered_count"]
-
-
-    # Attended events
-    cursor.execute("""
-        SELECT COUNT(*) AS attended_count 
-        FROM registrations 
-        WHERE participant_id=%s AND status='attended'
-    """, (user_id,))
-    attended_events_count = cursor.fetchone()["attended_count"]
+    # Independent queries run side by side on pooled connections
+    results = fetch_concurrently({
+        # Get logged-in participant details
+        "user": Query("SELECT user_id, name, email, phone, organization, profile_picture FROM users WHERE user_id=%s", (user_id,), one=True),
+
+        # Total registered events (only for upcoming/future events)
+        "registered": Query("""
+            SELECT COUNT(*) AS registered_count
+            FROM registrations r
+            JOIN events e ON r.event_id = e.event_id
+            WHERE r.participant_id = %s AND e.event_date >= CURDATE() AND e.deleted_at IS NULL
+        """, (user_id,), one=True),
+
+        # Attended events
+        "attended": Query("""
+            SELECT COUNT(*) AS attended_count 
+            FROM registrations 
+            WHERE participant_id=%s AND status='attended'
+        """, (user_id,), one=True),
+
+        # Upcoming events count
+        "upcoming_count": Query("""
+            SELECT COUNT(*) AS upcoming_count 
+            FROM events 
+            WHERE event_date >= CURDATE() AND deleted_at IS NULL
+        """, one=True),
+
+        # Upcoming events list
+        "upcoming_events": Query("""
+            SELECT e.event_id, e.title, e.event_date, e.location,
+                   (SELECT COUNT(*) FROM registrations r 
+                    WHERE r.event_id = e.event_id AND r.participant_id = %s) > 0 AS registered
+            FROM events e
+            WHERE e.event_date >= %s AND e.deleted_at IS NULL
+            ORDER BY e.event_date ASC
+            LIMIT 5
+        """, (user_id, date.today())),
+    })
+
+    user = results["user"]
+    registered_events_count = results["registered"]["registered_count"]
+    attended_events_count = results["attended"]["attended_count"]
 
     # Attendance %
     attendance_percentage = 0
     if registered_events_count > 0:
         attendance_percentage = round((attended_events_count / registered_events_count) * 100, 2)
 
-    # Upcoming events count
-    cursor.execute("""
-    SELECT COUNT(*) AS upcoming_count 
-    FROM events 
-    WHERE event_date >= CURDATE()
-""")
-    upcoming_events_count = cursor.fetchone()["upcoming_count"]  
-    # Upcoming events list
-    cursor.execute("""
-    SELECT e.event_id, e.title, e.event_date, e.location,
-           (SELECT COUNT(*) FROM registrations r 
-            WHERE r.event_id = e.event_id AND r.participant_id = %s) > 0 AS registered
-    FROM events e
-    WHERE e.event_date >= %s
-    ORDER BY e.event_date ASC
-    LIMIT 5
-""", (user_id, today))
-    upcoming_events = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    upcoming_events_count = results["upcoming_count"]["upcoming_count"]
+    upcoming_events = results["upcoming_events"]
 
     return render_template("dashboard.html",
                            user=user,   # ✅ Pass user here
@@ -74,6 +78,9 @@ def dashboard():
 # ------------------------
 # List all events
 # ------------------------
+EVENTS_PER_PAGE = 24
+
+
 @participant_bp.route("/events")
 def events():
     conn = get_db_connection()
@@ -84,14 +91,35 @@ def events():
     cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
     user = cursor.fetchone()
 
-    # fetch events
-    cursor.execute("SELECT * FROM events ORDER BY event_date ASC")
-    events = cursor.fetchall()
+    # search events; the page opens on upcoming ones, soonest first (it used
+    # to list every event), and ?when=all brings back the completed ones
+    params = event_search_params(request.args)
+    if "when" not in request.args:
+        params["when"] = "upcoming"
+    search = search_events(
+        cursor, params, facets=("category", "organizer"),
+        page=request.args.get("page", 1, type=int),
+        cursor_token=request.args.get("cursor"),
+        per_page=EVENTS_PER_PAGE, newest_first=params.get("when") == "past"
+    )
+    events = search.page.items
+
+    # mark the ones on this page the participant is already registered for
+    if events and user_id:
+        placeholders = ", ".join(["%s"] * len(events))
+        cursor.execute(f"""
+            SELECT event_id FROM registrations
+            WHERE participant_id = %s AND event_id IN ({placeholders})
+        """, [user_id] + [event["event_id"] for event in events])
+        registered = {row["event_id"] for row in cursor.fetchall()}
+        for event in events:
+            event["is_registered"] = event["event_id"] in registered
 
     cursor.close()
     conn.close()
 
-    return render_template("events.html", events=events, user=user,today=today)
+    return render_template("events.html", events=events, search=search, user=user,
+                           today=date.today())
 
 
 @participant_bp.route("/event/<int:event_id>/attendance", methods=["GET", "POST"])
@@ -130,6 +158,13 @@ def register_event(event_id):
 
     user_id = session.get("user_id")
 
+    cursor.execute("SELECT 1 FROM events WHERE event_id=%s AND deleted_at IS NULL", (event_id,))
+    if not cursor.fetchone():
+        cursor.close()
+        conn.close()
+        flash("This event is no longer available.", "warning")
+        return redirect(url_for("participant.events"))
+
     # Prevent duplicate registration
     cursor.execute("""
         SELECT reg_id FROM registrations 
@@ -142,6 +177,7 @@ def register_event(event_id):
             INSERT INTO registrations (event_id, participant_id, status) 
             VALUES (%s, %s, 'registered')
         """, (event_id, user_id))
+        record_registration(cursor, event_id=event_id)
         conn.commit()
         flash("You have successfully registered for the event.", "success")
     else:
@@ -168,7 +204,7 @@ def registrations():
         SELECT r.reg_id, e.title, e.event_date, r.status AS reg_status
         FROM registrations r
         JOIN events e ON r.event_id = e.event_id
-        WHERE r.participant_id=%s
+        WHERE r.participant_id=%s AND e.deleted_at IS NULL
         ORDER BY e.event_date DESC
     """, (user_id,))
     registrations = cursor.fetchall()
@@ -2,9 +2,12 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import mysql.connector
-import os
-from werkzeug.utils import secure_filename
 from models.db import get_db_connection
+from models.fanout import Query, fetch_concurrently
+from models.pagination import paginate
+from models.stats import record_user_created, record_task_status_changed
+from models.volunteer_index import refresh_volunteers
+from models.storage import StorageError, replace as replace_upload, store_upload
 import functools
 volunteer_bp = Blueprint(
     "volunteer", __name__, 
@@ -31,77 +34,71 @@ def dashboard():
     
     user_id = session['user_id']
     
-    # Connect to database
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    
-    # =========================
-    # Volunteer Stats
-    # =========================
-    cursor.execute("""
-        SELECT 
-            (SELECT COUNT(*) FROM volunteer_tasks 
-             WHERE volunteer_id = %s AND status = 'assigned') AS upcoming_tasks,
-            (SELECT COALESCE(SUM(hours_contributed), 0) FROM volunteer_tasks 
-             WHERE volunteer_id = %s AND status = 'completed') AS total_hours,
-            (SELECT COUNT(DISTINCT event_id) FROM volunteer_tasks 
-             WHERE volunteer_id = %s AND status = 'completed') AS events_participated,
-            (SELECT COALESCE(SUM(hours_contributed), 0) FROM volunteer_tasks 
-             WHERE volunteer_id = %s AND status = 'completed' AND DATE(created_at) >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)) AS weekly_hours,
-            (SELECT COALESCE(SUM(hours_contributed), 0) FROM volunteer_tasks 
-             WHERE volunteer_id = %s AND status = 'completed' AND MONTH(created_at) = MONTH(CURDATE())) AS monthly_hours
-    """, (user_id, user_id, user_id, user_id, user_id))
-    stats = cursor.fetchone()
-    
-    # Completion rate and task stats for the chart
-    cursor.execute("""
-        SELECT 
-            COUNT(*) AS total_tasks,
-            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed_tasks
-        FROM volunteer_tasks 
-        WHERE volunteer_id = %s
-    """, (user_id,))
-    
-    task_stats = cursor.fetchone()
+    # Independent queries run side by side on pooled connections
+    results = fetch_concurrently({
+        # =========================
+        # Volunteer Stats
+        # =========================
+        "stats": Query("""
+            SELECT 
+                (SELECT COUNT(*) FROM volunteer_tasks 
+                 WHERE volunteer_id = %s AND status = 'assigned') AS upcoming_tasks,
+                (SELECT COALESCE(SUM(hours_contributed), 0) FROM volunteer_tasks 
+                 WHERE volunteer_id = %s AND status = 'completed') AS total_hours,
+                (SELECT COUNT(DISTINCT event_id) FROM volunteer_tasks 
+                 WHERE volunteer_id = %s AND status = 'completed') AS events_participated,
+                (SELECT COALESCE(SUM(hours_contributed), 0) FROM volunteer_tasks 
+                 WHERE volunteer_id = %s AND status = 'completed' AND DATE(created_at) >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)) AS weekly_hours,
+                (SELECT COALESCE(SUM(hours_contributed), 0) FROM volunteer_tasks 
+                 WHERE volunteer_id = %s AND status = 'completed' AND MONTH(created_at) = MONTH(CURDATE())) AS monthly_hours
+        """, (user_id, user_id, user_id, user_id, user_id), one=True),
+    
+        # Completion rate and task stats for the chart
+        "task_stats": Query("""
+            SELECT 
+                COUNT(*) AS total_tasks,
+                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed_tasks
+            FROM volunteer_tasks 
+            WHERE volunteer_id = %s
+        """, (user_id,), one=True),
+    
+        # =========================
+        # Upcoming Tasks (assigned + event not completed)
+        # =========================
+        "upcoming_tasks": Query("""
+            SELECT vt.task_id, vt.task_description, vt.status, vt.hours_contributed,
+                   e.event_id, e.title AS event_title, e.event_date
+            FROM volunteer_tasks vt
+            JOIN events e ON vt.event_id = e.event_id
+            WHERE vt.volunteer_id = %s 
+              AND vt.status = 'assigned'
+              AND e.status IN ('upcoming', 'ongoing')
+              AND e.deleted_at IS NULL
+            ORDER BY e.event_date ASC
+            LIMIT 5
+        """, (user_id,)),
+    
+        # =========================
+        # Upcoming Events
+        # =========================
+        "upcoming_events": Query("""
+            SELECT e.*, e.volunteer_count AS volunteers_registered
+            FROM events e
+            WHERE e.event_date >= CURDATE() 
+              AND e.status = 'upcoming'
+              AND e.deleted_at IS NULL
+            ORDER BY e.event_date ASC
+            LIMIT 3
+        """),
+    })
+    
+    stats = results["stats"]
+    task_stats = results["task_stats"]
     stats['completion_rate'] = round(
         (task_stats['completed_tasks'] / task_stats['total_tasks'] * 100), 2
     ) if task_stats['total_tasks'] > 0 else 0
-    
-    # =========================
-    # Upcoming Tasks (assigned + event not completed)
-    # =========================
-    cursor.execute("""
-        SELECT vt.task_id, vt.task_description, vt.status, vt.hours_contributed,
-               e.event_id, e.title AS event_title, e.event_date
-        FROM volunteer_tasks vt
-        JOIN events e ON vt.event_id = e.event_id
-        WHERE vt.volunteer_id = %s 
-          AND vt.status = 'assigned'
-          AND e.status IN ('upcoming', 'ongoing')
-        ORDER BY e.event_date ASC
-        LIMIT 5
-    """, (user_id,))
-    
-    upcoming_tasks = cursor.fetchall()
-    
-    # =========================
-    # Upcoming Events
-    # =========================
-    cursor.execute("""
-        SELECT e.*, 
-               (SELECT COUNT(*) FROM volunteer_tasks 
-                WHERE event_id = e.event_id) AS volunteers_registered
-        FROM events e
-        WHERE e.event_date >= CURDATE() 
-          AND e.status = 'upcoming'
-        ORDER BY e.event_date ASC
-        LIMIT 3
-    """)
-    
-    upcoming_events = cursor.fetchall()
-    
-    cursor.close()
-    conn.close()
+    upcoming_tasks = results["upcoming_tasks"]
+    upcoming_events = results["upcoming_events"]
     
     return render_template(
         'volunteer_dashboard.html', 
@@ -163,8 +160,11 @@ def signup():
             INSERT INTO users (name, email, password_hash, role_id, phone,skills, is_volunteer)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """, (name, email, hashed_password, role['role_id'], phone,skills_str, True))
+        user_id = cursor.lastrowid
+        record_user_created(cursor, "volunteer")
         
         conn.commit()
+        refresh_volunteers([user_id])
         cursor.close()
         conn.close()
         
@@ -226,47 +226,35 @@ def events():
 
     user_id = session['user_id']
 
-    # Pagination parameters
-    page = request.args.get('page', 1, type=int)
-    per_page = 6  # number of events per page
-    offset = (page - 1) * per_page
-
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
 
-    # Count total upcoming events
-    cursor.execute("""
-        SELECT COUNT(*) as total_events
-        FROM events
-        WHERE event_date >= CURDATE() AND status = 'upcoming'
-    """)
-    total_events = cursor.fetchone()['total_events']
-
-    # Fetch events for current page
-    cursor.execute("""
-        SELECT e.*, 
-               (SELECT COUNT(*) FROM volunteer_tasks 
-                WHERE event_id = e.event_id) as volunteers_registered,
+    # Keyset pagination over upcoming events; total comes back with the page
+    pagination = paginate(
+        cursor,
+        """
+        SELECT e.*, e.volunteer_count as volunteers_registered,
                EXISTS(SELECT 1 FROM volunteer_tasks 
                       WHERE event_id = e.event_id AND volunteer_id = %s) as is_registered
         FROM events e
-        WHERE e.event_date >= CURDATE() AND e.status = 'upcoming'
-        ORDER BY e.event_date ASC
-        LIMIT %s OFFSET %s
-    """, (user_id, per_page, offset))
+        """,
+        order_by=[("e.event_date", "event_date"), ("e.event_id", "event_id")],
+        where=["e.event_date >= CURDATE()", "e.status = 'upcoming'", "e.deleted_at IS NULL"],
+        params=[user_id],
+        page=request.args.get('page', 1, type=int),
+        cursor_token=request.args.get('cursor'),
+        per_page=6  # number of events per page
+    )
 
-    events = cursor.fetchall()
     cursor.close()
     conn.close()
 
-    # Calculate total pages
-    total_pages = (total_events + per_page - 1) // per_page
-
     return render_template(
         'volunteer_events.html',
-        events=events,
-        page=page,
-        total_pages=total_pages
+        events=pagination.items,
+        page=pagination.page,
+        total_pages=pagination.pages,
+        pagination=pagination
     )
 
 # Mark Task as Complete
@@ -300,6 +288,7 @@ def complete_task(task_id):
         SET status = 'completed', updated_at = NOW() 
         WHERE task_id = %s
     """, (task_id,))
+    record_task_status_changed(cursor, task['status'], 'completed')
     
     conn.commit()
     cursor.close()
@@ -322,10 +311,10 @@ def tasks():
     # Get all tasks for the volunteer with event details
     cursor.execute("""
         SELECT vt.*, e.title as event_title, e.event_date, e.event_time, e.location,
-               e.image_url as event_image
+               e.image_url as event_image, e.image_variants as event_image_variants
         FROM volunteer_tasks vt
         JOIN events e ON vt.event_id = e.event_id
-        WHERE vt.volunteer_id = %s
+        WHERE vt.volunteer_id = %s AND e.deleted_at IS NULL
         ORDER BY e.event_date ASC, vt.status
     """, (user_id,))
     
@@ -344,11 +333,6 @@ def tasks():
 
 
 # Volunteer Profile
-import os
-from werkzeug.utils import secure_filename
-
-UPLOAD_FOLDER = "static/uploads/profile_pictures"
-
 @volunteer_bp.route("/profile", methods=["GET", "POST"])
 @volunteer_required
 def volunteer_profile():
@@ -364,20 +348,19 @@ def volunteer_profile():
         if "profile_picture" in request.files:
             file = request.files["profile_picture"]
             if file and file.filename:
-                filename = secure_filename(file.filename)
-
-                # Absolute path from this file → static/uploads/profile_pictures
-                base_dir = os.path.dirname(os.path.dirname(__file__))  # go up one level from /volunteer
-                upload_folder = os.path.join(base_dir, "static", "uploads", "profile_pictures")
-                os.makedirs(upload_folder, exist_ok=True)
-
-                filepath = os.path.join(upload_folder, filename)
-                file.save(filepath)
-
-                profile_picture = f"uploads/profile_pictures/{filename}"
+                try:
+                    # Stored by content hash, relative to static/ for url_for
+                    profile_picture = store_upload(file)
+                except StorageError as e:
+                    flash(str(e), "danger")
+                    cursor.close()
+                    conn.close()
+                    return redirect(url_for("volunteer.volunteer_profile"))
 
         # Update DB
         if profile_picture:
+            cursor.execute("SELECT profile_picture FROM users WHERE user_id = %s", (session["user_id"],))
+            replace_upload(cursor, (cursor.fetchone() or {}).get("profile_picture"), profile_picture)
             cursor.execute("""
                 UPDATE users 
                 SET name = %s, phone = %s, skills = %s, profile_picture = %s
@@ -391,6 +374,7 @@ def volunteer_profile():
             """, (name, phone, ",".join(skills), session["user_id"]))
 
         conn.commit()
+        refresh_volunteers([session["user_id"]])
 
     # Fetch updated user
     cursor.execute("SELECT * FROM users WHERE user_id = %s", (session["user_id"],))
@@ -420,10 +404,10 @@ def event_detail(event_id):
         SELECT 
             e.*, 
             u.name as organizer_name,
-            (SELECT COUNT(*) FROM registrations r WHERE r.event_id = e.event_id) as volunteers_registered
+            e.volunteer_count as volunteers_registered
         FROM events e 
         JOIN users u ON e.organizer_id = u.user_id 
-        WHERE e.event_id = %s
+        WHERE e.event_id = %s AND e.deleted_at IS NULL
     """, (event_id,))
     event = cursor.fetchone()
 
@@ -461,7 +445,7 @@ def history():
         SELECT e.title AS event_name, e.event_date, e.location, vt.status
         FROM volunteer_tasks vt
         JOIN events e ON vt.event_id = e.event_id
-        WHERE vt.volunteer_id = %s AND vt.status = 'completed'
+        WHERE vt.volunteer_id = %s AND vt.status = 'completed' AND e.deleted_at IS NULL
         ORDER BY e.event_date DESC
     """, (user_id,))
     